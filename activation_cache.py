@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from config import activation_cache_ttl, catalog_cache_dir, eams_url
+
+ENTRY = ""  # Key of the stdElectCourse.action visit among a session's profiles
+
+
+def session_key(cookies: dict | None) -> str:
+    """Stable, non-reversible key of a cookie set on this server: the cookies themselves never reach the disk."""
+    text = "\n".join([eams_url] + [f"{name}={value}" for name, value in sorted((cookies or {}).items())])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class ActivationCache:
+    """
+    When each session (cookie set) last passed the entry page and each profile's
+    defaultPage, plus the lesson IDs that page listed as selected. Entries younger than
+    `ttl` seconds are trusted without a request; a 302 during selection invalidates the
+    session's entries so the next run warms it up again.
+    Stored as JSON in .cache/activation.json, shared by every command.
+    """
+
+    def __init__(self, path: Path | None = None, ttl: float = activation_cache_ttl):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.sessions: dict[str, dict[str, dict]] = {}
+
+    @classmethod
+    def load(cls, path: Path, ttl: float = activation_cache_ttl) -> "ActivationCache":
+        cache = cls(path, ttl)
+        try:
+            with open(path, encoding="utf-8") as f:
+                sessions = json.load(f)
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError) as e:
+            print(f"[Session] Ignoring unreadable activation cache {path}: {e}")
+            return cache
+        if isinstance(sessions, dict):
+            cache.sessions = {key: value for key, value in sessions.items() if isinstance(value, dict)}
+        cache.prune()
+        return cache
+
+    def prune(self, now: float | None = None):
+        """Forget the entries that are no longer fresh."""
+        now = time.time() if now is None else now
+        for key in list(self.sessions):
+            profiles = {pid: entry for pid, entry in self.sessions[key].items() if now - entry.get("at", 0) < self.ttl}
+            if profiles:
+                self.sessions[key] = profiles
+            else:
+                del self.sessions[key]
+
+    def fresh(self, cookies: dict, profile_id: str = ENTRY) -> dict | None:
+        """The cached activation of a profile (or of the entry page) if still fresh."""
+        if self.ttl <= 0:
+            return None
+        entry = self.sessions.get(session_key(cookies), {}).get(str(profile_id))
+        if entry is None or time.time() - entry.get("at", 0) >= self.ttl:
+            return None
+        return entry
+
+    def record(self, cookies: dict, profile_id: str = ENTRY, elected: set[int] | None = None):
+        entry = {"at": time.time()}
+        if elected is not None:
+            entry["elected"] = sorted(elected)
+        self.sessions.setdefault(session_key(cookies), {})[str(profile_id)] = entry
+
+    def invalidate(self, cookies: dict):
+        """The server dropped this session (302): warm it up again next time."""
+        if self.sessions.pop(session_key(cookies), None) is not None:
+            self.save()
+
+    def save(self) -> bool:
+        if self.path is None:
+            return False
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.sessions, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Session] Failed to write {self.path}: {e}")
+            return False
+        return True
+
+
+def activation_cache_path() -> Path:
+    return Path(catalog_cache_dir) / "activation.json"
+
+
+_cache: ActivationCache | None = None
+
+
+def activation_cache() -> ActivationCache:
+    """The process-wide cache, loaded from disk on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ActivationCache.load(activation_cache_path())
+    return _cache
+
+
+def use_activation_cache(cache: ActivationCache):
+    """Use `cache` instead of the on-disk one (e.g. ActivationCache(ttl=0): always activate)."""
+    global _cache
+    _cache = cache
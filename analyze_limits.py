@@ -1,92 +1,146 @@
+"""
+Measure the request limits of the EAMS server for the inquiry account and save them as a
+limit model (.cache/limit_model.json) that every request path then paces itself by.
+
+Phase 1 hits each endpoint alone until it is limited (its quota), then waits until it
+answers again (its window). Phase 2 cycles ENTRY -> DEFAULT -> DATA until one is limited:
+far fewer hits than the endpoints take alone means the server counts one shared pool.
+
+    uv run analyze_limits.py [--max-hits 30] [--spacing 0.1] [--dry-run]
+"""
+import argparse
 import asyncio
+import time
+
 import aiohttp
-from aiohttp_socks import ProxyConnector
-from config_loader import INQUIRY_USER_DATA, USE_PROXY, proxies
-from config import headers
 
-# URLs & Configuration
-BASE = "https://jw.shiep.edu.cn/eams/stdElectCourse"
-PID = INQUIRY_USER_DATA.get("profileId")[0] if isinstance(INQUIRY_USER_DATA.get("profileId"), list) else INQUIRY_USER_DATA.get("profileId")
-URLS = {
-    "ENTRY": f"{BASE}.action",
-    "DEFAULT": f"{BASE}!defaultPage.action?electionProfile.id={PID}",
-    "DATA": f"{BASE}!data.action?profileId={PID}",
-}
+from config import eams_url, headers
+from config_loader import INQUIRY_USER_DATA
+from limit_model import EndpointLimit, LimitModel, infer_limit_model, limit_model_path, save_limit_model
+from utils import build_connector
+
+MAX_RECOVERY_WAIT = 120.0  # Seconds a limited endpoint is waited for at most
+
 
+def endpoint_urls(base: str, profile_id: str) -> dict[str, str]:
+    """The probed endpoints, named like the request paths that pace by them."""
+    return {
+        "entry": f"{base}.action",
+        "defaultPage": f"{base}!defaultPage.action?electionProfile.id={profile_id}",
+        "data": f"{base}!data.action?profileId={profile_id}",
+    }
 
-async def hit(session, url):
+
+async def hit(session: aiohttp.ClientSession, url: str, cookies: dict) -> bool:
     """Single request, returns whether rate-limited"""
     try:
-        async with session.get(url, headers=headers, cookies=INQUIRY_USER_DATA["cookies"], ssl=False, timeout=5) as resp:
-            return "过快" in await resp.text() or resp.status == 503
+        async with session.get(url, headers=headers, cookies=cookies, ssl=False, timeout=5, allow_redirects=False) as resp:
+            return "过快" in await resp.text() or resp.status in (429, 503)
     except Exception:
         return True
 
 
-async def main():
-    connector = ProxyConnector.from_url(proxies.get("all")) if USE_PROXY and proxies.get("all") else None
-    async with aiohttp.ClientSession(connector=connector) as session:
-        print(f"Testing ProfileID: {PID}\n")
-
-        # --- Phase 1: Baselines ---
-        baselines = {}
-        for key, url in URLS.items():
-            print(f"[Phase 1] Establishing baseline for {key}...")
-            count = 0
-            while count < 30:
-                if await hit(session, url):
-                    break
-                count += 1
-                await asyncio.sleep(0.1)
-            baselines[key] = count
-            print(f"  > {key} can take {count} hits alone.\n")
-            await asyncio.sleep(5)  # Cooldown
-
-        # --- Phase 2: Group Iteration ---
-        print("[Phase 2] Testing FULL GROUP cycles (ENTRY -> DEFAULT -> DATA) repeatedly...")
-        cycles = 0
-        cycle_failed_at = None
-
-        while cycles < 30:
-            current_cycle = cycles + 1
-            print(f"  Cycle {current_cycle:02d}: ", end="", flush=True)
-
-            # Request each in this group sequentially
-            for key, url in URLS.items():
-                if await hit(session, url):
-                    cycle_failed_at = key
-                    break
-                print(f"{key} ", end="", flush=True)
-
-            if cycle_failed_at:
-                print(f"-> 🚫 {cycle_failed_at} LIMITED")
+async def hit_until_limited(
+    session: aiohttp.ClientSession, urls: dict[str, str], cookies: dict, max_hits: int, spacing: float, log=print
+) -> tuple[int, float, str | None]:
+    """
+    Cycle over `urls` until one is limited or `max_hits` were accepted.
+    Returns (accepted hits, time of the first hit, name of the limited endpoint or None).
+    """
+    started = time.monotonic()
+    hits = 0
+    while hits < max_hits:
+        for name, url in urls.items():
+            if await hit(session, url, cookies):
+                return hits, started, name
+            hits += 1
+            log(f"{name} ", end="", flush=True)
+            if hits >= max_hits:
                 break
+            await asyncio.sleep(spacing)
+    return hits, started, None
+
+
+async def wait_for_recovery(session: aiohttp.ClientSession, url: str, cookies: dict, started: float, spacing: float) -> float:
+    """Seconds from `started` (the first accepted hit) until `url` is accepted again: the window."""
+    wait = spacing
+    while True:
+        await asyncio.sleep(wait)
+        elapsed = time.monotonic() - started
+        if not await hit(session, url, cookies) or elapsed > MAX_RECOVERY_WAIT:
+            return elapsed
+        wait = min(wait * 1.5, 5.0)
+
+
+async def probe_limits(
+    session: aiohttp.ClientSession, urls: dict[str, str], cookies: dict, max_hits: int = 30, spacing: float = 0.1, log=print
+) -> LimitModel:
+    """Run both phases against `urls` and infer the limit model from them."""
+    baselines: dict[str, EndpointLimit] = {}
+    for name, url in urls.items():
+        log(f"[Phase 1] Establishing baseline for {name}: ", end="", flush=True)
+        hits, started, limited = await hit_until_limited(session, {name: url}, cookies, max_hits, spacing, log=lambda *a, **k: None)
+        if limited is None:
+            log(f"not limited within {hits} hits.")
+            continue
+        window = await wait_for_recovery(session, url, cookies, started, spacing)
+        baselines[name] = EndpointLimit(hits, window)
+        log(f"{hits} hits per {window:.1f}s.")
+        await asyncio.sleep(window)  # Cooldown: the whole window drains
+
+    limited_urls = {name: url for name, url in urls.items() if name in baselines}
+    if not limited_urls:
+        return LimitModel({})
+
+    log("[Phase 2] Testing FULL GROUP cycles repeatedly: ", end="", flush=True)
+    cycle_hits, started, limited = await hit_until_limited(session, limited_urls, cookies, max_hits * len(limited_urls), spacing, log)
+    cycle_window = None
+    if limited is None:
+        log("-> OK")
+    else:
+        log(f"-> {limited} LIMITED after {cycle_hits} hits")
+        cycle_window = await wait_for_recovery(session, limited_urls[limited], cookies, started, spacing)
+    return infer_limit_model(baselines, cycle_hits, cycle_window)
 
-            print("-> ✅ OK")
-            cycles += 1
-            # await asyncio.sleep(0.2)  # Simulate real operation interval
-
-        # --- Analysis ---
-        print("\n" + "=" * 55)
-        print("ANALYSIS COMPLETE")
-        print(f"  Min individual baseline: {min(baselines.values())} hits")
-        print(f"  Total successful cycles: {cycles}")
-
-        # Core logic judgement
-        # If total cycles * 3 approaches or equals max single-endpoint threshold, indicates global sharing
-        if cycle_failed_at:
-            print(f"  Failed at: {cycle_failed_at}")
-
-        print("-" * 55)
-        if cycles < min(baselines.values()):
-            print("  Conclusion: SHARED POOL DETECTED")
-            print("  The entire sequence consumes a global session quota.")
-            print("  STRATEGY: Minimize requests in utils.py (KEEP COMMENTED).")
-        else:
-            print("  Conclusion: NO GLOBAL POOL INTERFERENCE")
-            print("  APIs are likely independent or the pool is large enough.")
-            print("  STRATEGY: Safe to use, but keep data.action commented to save quota.")
-        print("=" * 55)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure the EAMS request limits and save a limit model")
+    parser.add_argument("--max-hits", type=int, default=30, help="Hits per endpoint after which it counts as unlimited")
+    parser.add_argument("--spacing", type=float, default=0.1, help="Seconds between probe hits")
+    parser.add_argument("--dry-run", action="store_true", help="Print the model without saving it")
+    args = parser.parse_args()
+
+    cookies = INQUIRY_USER_DATA.get("cookies")
+    profile_id = INQUIRY_USER_DATA.get("profileId")
+    profile_id = profile_id[0] if isinstance(profile_id, list) else profile_id
+    if not cookies or not profile_id:
+        print("Error: analyze_limits.py probes with the INQUIRY_USER_DATA cookies and profileId. Please configure them.")
+        return
+
+    async with aiohttp.ClientSession(connector=build_connector("Limits")) as session:
+        print(f"Testing ProfileID: {profile_id}\n")
+        model = await probe_limits(session, endpoint_urls(eams_url, profile_id), cookies, args.max_hits, args.spacing)
+    model.base_url = eams_url
+
+    print("\n" + "=" * 55)
+    print("ANALYSIS COMPLETE")
+    for name, limit in model.endpoints.items():
+        print(f"  {name}: {limit.quota} hits per {limit.window:.1f}s alone")
+    print("-" * 55)
+    if not model.endpoints:
+        print("  Conclusion: NO LIMIT FOUND")
+    elif model.shared:
+        print("  Conclusion: SHARED POOL DETECTED")
+        print(f"  The endpoints consume one session quota of {model.pool.quota} hits per {model.pool.window:.1f}s.")
+    else:
+        print("  Conclusion: NO GLOBAL POOL INTERFERENCE")
+        print("  APIs are limited independently.")
+    print("=" * 55)
+
+    if args.dry_run:
+        return
+    if save_limit_model(model):
+        print(f"Saved the limit model to {limit_model_path()}; requests are paced by it from the next run on.")
 
 
 if __name__ == "__main__":
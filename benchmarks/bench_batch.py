@@ -0,0 +1,73 @@
+"""
+Round trips of --start: one course per batchOperator request vs. several (operator0..N).
+
+Runs the selection loop of one user against identically seeded local emulators, once
+per batch size. Some lessons are full and some conflict, so the per-course results of
+a packed response must come out the same as those of single requests: both runs have
+to select and fail the same courses.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_batch [courses] [batch sizes, e.g. 1,2,4,8]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+async def run(courses: int, batch_size: int, port: int) -> dict:
+    emulator = EamsEmulator(EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.3, seed=3, latency=0.02))
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import main_select_courses
+    import activation_cache
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+
+    lessons = emulator.profile_lessons[PROFILE][:courses]
+    emulator.options.conflict_ids = tuple(lesson["id"] for lesson in lessons[::7])
+    course_ids = [str(lesson["id"]) for lesson in lessons]
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": f"bench-{batch_size}"}, "tables": [{"profileId": PROFILE, "course_ids": course_ids}]}
+
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = batch_size
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        failed = await main_select_courses.run_loop_for_single_user(user_config)
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+
+    selected = {lesson_id for session in emulator.sessions.values() for lesson_id in session.selected}
+    return {
+        "selected": sorted(selected),
+        "failed": sorted(int(failure["course_id"]) for failure in failed),
+        "requests": emulator.stats.get("batchOperator", 0),
+        "elapsed": elapsed,
+        "port": emulator.port,
+    }
+
+
+async def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    sizes = [int(s) for s in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 2, 4, 8]
+    print(f"{courses} course(s) of one profile, 30% full, every 7th conflicting\n")
+    print(f"{'batch':>6} {'selected':>9} {'failed':>7} {'requests':>9} {'time':>8}")
+    port, reference = 0, None
+    for size in sizes:
+        result = await run(courses, size, port)
+        port = result["port"]
+        outcome = (result["selected"], result["failed"])
+        if reference is None:
+            reference = outcome
+        assert outcome == reference, f"batch size {size} selected/failed other courses than batch size {sizes[0]}"
+        print(f"{size:>6} {len(result['selected']):>9} {len(result['failed']):>7} {result['requests']:>9} {result['elapsed']:>7.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
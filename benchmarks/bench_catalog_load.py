@@ -0,0 +1,67 @@
+"""
+Loading a cached catalog: JSON cache + key_mapping rename vs. the memory-mapped
+columnar file.
+
+  json     - load_catalog_cache() and rebuild the renamed list of dicts (old --inquire path)
+  mmap     - open_catalog_view() only, what --inquire does for a fresh cache
+  mmap+scan - open the view and read one field of every row (first search query)
+
+Run from the project root:
+    uv run python -m benchmarks.bench_catalog_load [sizes...]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import catalog_cache
+from catalog_cache import CatalogCacheEntry, load_catalog_cache, open_catalog_view, save_catalog_cache
+from catalog_store import COURSE_KEY_MAPPING
+from benchmarks.synthetic import make_lessons
+
+
+def load_json():
+    entry = load_catalog_cache("bench", "1")
+    return [{new: course.get(old, "") for old, new in COURSE_KEY_MAPPING.items()} for course in entry.courses]
+
+
+def load_view():
+    return open_catalog_view("bench", "1")
+
+
+def scan_view():
+    view = open_catalog_view("bench", "1")
+    for course in view:
+        course.get("name")
+    return view
+
+
+def measure(func) -> tuple[float, int]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if hasattr(result, "close"):
+        result.close()
+    return elapsed, peak
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        catalog_cache.catalog_cache_dir = cache_dir
+        print(f"{'lessons':>8} {'json':>22} {'mmap':>22} {'mmap+scan':>22}")
+        for size in sizes:
+            save_catalog_cache(CatalogCacheEntry("bench", "1", make_lessons(size), time.time()))
+            row = [f"{size:>8}"]
+            for func in (load_json, load_view, scan_view):
+                elapsed, peak = measure(func)
+                row.append(f"{elapsed * 1000:>10.2f}ms {peak / 1e6:>8.2f}MB")
+            print(" ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+batchOperator response classification: the original any()-chain vs. response_classifier.
+
+Accuracy: every response in benchmarks/fixtures/batch_operator_responses.json must get its
+labelled Outcome, and randomly generated bodies (markers mixed with filler, overlapping
+markers included) must get the same Outcome as a plain marker-by-marker reference.
+Speed: the original chain on the decoded text vs. one scan of the raw bytes.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_classifier [rounds]
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from config import error_words, failed_words, full_words
+from response_classifier import _PRECEDENCE, LARGE_BODY, Outcome, default_classifier
+
+CORPUS = Path(__file__).parent / "fixtures" / "batch_operator_responses.json"
+ORIGINAL_FAILED_WORDS = full_words + failed_words
+FILLER = ["<div>", "</br>\n", "选课", "高等数学", "课程", "已经", "过", "快", "达", "fai", "50", " ", "操作"]
+
+
+def reference_status(status: int, body: bytes) -> str:
+    """The original attempt_single_course_selection logic, on the decoded text (it counted full as failed)."""
+    response_text = body.decode("utf-8")
+    if status == 200:
+        if "已经选过" in response_text or not (any(word in response_text for word in ORIGINAL_FAILED_WORDS) or any(word in response_text for word in error_words)):
+            return "success"
+        elif any(word in response_text for word in ORIGINAL_FAILED_WORDS):
+            return "failed"
+        return "error"
+    elif status == 302:
+        return "redirect"
+    return "error"
+
+
+def reference_outcome(body: bytes) -> Outcome:
+    """Configured markers checked one by one, in precedence order."""
+    for outcome in _PRECEDENCE:
+        if any(word.encode("utf-8") in body for word in default_classifier.markers[outcome]):
+            return outcome
+    return Outcome.SUCCESS
+
+
+def random_bodies(count: int, seed: int = 0) -> list[bytes]:
+    rng = random.Random(seed)
+    markers = [word for outcome in _PRECEDENCE for word in default_classifier.markers[outcome]]
+    return ["".join(rng.choice(markers if rng.random() < 0.15 else FILLER) for _ in range(rng.randint(0, 30))).encode("utf-8")
+            for _ in range(count)]
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    corpus = json.loads(CORPUS.read_text(encoding="utf-8"))
+    responses = [(entry["status"], entry["body"].encode("utf-8")) for entry in corpus]
+
+    wrong = 0
+    for entry, (status, body) in zip(corpus, responses):
+        outcome = default_classifier.classify(status, body)
+        if outcome.value != entry["outcome"] or outcome.status != entry["expected"]:
+            wrong += 1
+            print(f"  MISCLASSIFIED {entry['label']!r}: {outcome.value} (expected {entry['outcome']})")
+        elif reference_status(status, body) != ("failed" if entry["expected"] == "full" else entry["expected"]):
+            print(f"  fixed: {entry['label']!r} was {reference_status(status, body)!r}, now {outcome.status!r}")
+    print(f"Corpus: {len(corpus) - wrong}/{len(corpus)} classified as labelled")
+
+    bodies = random_bodies(20_000)
+    bodies += [body * (LARGE_BODY // len(body) + 1) for body in bodies[:2000] if body]  # Large-body path
+    mismatches = sum(default_classifier.classify(200, body) != reference_outcome(body) for body in bodies)
+    print(f"Random bodies: {len(bodies) - mismatches}/{len(bodies)} agree with the marker-by-marker reference")
+
+    def original():
+        for status, body in responses:
+            reference_status(status, body)
+
+    def single_pass():
+        for status, body in responses:
+            default_classifier.classify(status, body)
+
+    per = len(responses) * rounds
+    before = best_of(lambda: [original() for _ in range(rounds)]) / per
+    after = best_of(lambda: [single_pass() for _ in range(rounds)]) / per
+    print(f"\nPer response: original {before * 1e6:.2f}us, single pass {after * 1e6:.2f}us ({before / after:.2f}x)")
+
+    large = [(status, body * 50) for status, body in responses]
+    before = best_of(lambda: [reference_status(s, b) for s, b in large]) / len(large)
+    after = best_of(lambda: [default_classifier.classify(s, b) for s, b in large]) / len(large)
+    print(f"50x bodies:   original {before * 1e6:.2f}us, single pass {after * 1e6:.2f}us ({before / after:.2f}x)")
+    if wrong or mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Ranked fuzzy search ("key~value") over the CourseIndex.
+
+Each query is first checked against an exhaustive scan that scores every course
+with the same rules (substring, pinyin initials, full pinyin, edit distance), so
+the q-gram candidate filter must not drop any match. Times are per query (best of
+several runs). Pinyin rules are skipped when pypinyin is not installed.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_fuzzy [sizes...]
+"""
+import heapq
+import sys
+import time
+
+from course_index import EDIT, EXACT, INITIALS, PINYIN, CourseIndex, lazy_pinyin, max_edits, parse_query, substring_distance, to_pinyin
+from inquire_course_info import rename_courses
+from benchmarks.synthetic import make_lessons
+
+QUERIES = ["~gdsx", "~dianlixitong", "~dianlxitong", "~shujujiegou", "~电力系通", "~原理", "teacher~wang", "~zzzz"]
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def exhaustive(index: CourseIndex, keyword: str) -> list[int]:
+    """Reference ranking: score every row without any index."""
+    key, value, _ = parse_query(keyword)
+    edits = max_edits(len(value))
+    compact = value.replace(" ", "")
+    use_pinyin = lazy_pinyin is not None and value.isascii() and value
+    scores = {}
+    for row, course in enumerate(index.courses):
+        text = str(course.get(key, "")).lower()
+        candidates = []
+        if value in text:
+            candidates.append((EXACT, 0))
+        if edits and substring_distance(value, text, edits) <= edits:
+            candidates.append((EDIT, substring_distance(value, text, edits)))
+        if use_pinyin:
+            full, initials = to_pinyin(text)
+            if compact in initials:
+                candidates.append((INITIALS, 0))
+            if compact in full:
+                candidates.append((PINYIN, 0))
+            if edits and substring_distance(compact, full, edits) <= edits:
+                candidates.append((EDIT, substring_distance(compact, full, edits)))
+        if candidates:
+            scores[row] = min(candidates)
+    return heapq.nsmallest(len(scores), scores, key=lambda row: (scores[row], index._rank[row]))
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [2_000, 20_000]
+    if lazy_pinyin is None:
+        print("pypinyin not installed: pinyin and initials matching disabled")
+
+    for size in sizes:
+        index = CourseIndex(rename_courses(make_lessons(size)))
+        t0 = time.perf_counter()
+        for field in ("name", "teacher"):
+            index.pinyin_fields(field)
+        print(f"\n{size} lessons: pinyin indexes built in {(time.perf_counter() - t0) * 1000:.0f}ms")
+        print(f"{'query':>16} {'matches':>8} {'exhaustive':>11} {'index':>10} {'speedup':>8}")
+
+        for query in QUERIES:
+            key, value, _ = parse_query(query)
+            t0 = time.perf_counter()
+            expected = exhaustive(index, query)
+            scan = time.perf_counter() - t0
+            # Only the top-k is returned; its scores must agree with the reference
+            ranked = index.search_fuzzy(key, value, limit=len(expected) or 1)
+            assert ranked == expected[:len(ranked)] and len(ranked) == len(expected), query
+            indexed = best_of(lambda: index.search(query))
+            print(f"{query:>16} {len(expected):>8} {scan * 1000:>9.0f}ms {indexed * 1000:>8.2f}ms {scan / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
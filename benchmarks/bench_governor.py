@@ -0,0 +1,99 @@
+"""
+Requests burnt on "过快点击": fixed pacing vs. the adaptive rate governor.
+
+Runs the selection loop of one user against identically seeded local emulators that
+throttle batchOperator requests of a session closer than `throttle` seconds apart.
+Throttled requests count as the session's last request too, so pacing faster than
+the limit is throttled again and again; responses carry up to `jitter` seconds of
+random latency. The fixed run paces at the old 0.2s (a governor pinned at
+5 requests/s); the adaptive run uses the configured AIMD governor. Runs are cut off
+after `limit` seconds; runs that finish must select the same courses. Goodput is the
+share of requests the server did not throttle.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_governor [courses] [throttle] [jitter] [limit]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+async def run(courses: int, throttle: float, jitter: float, limit: float, adaptive: bool, port: int) -> dict:
+    emulator = EamsEmulator(
+        EmulatorOptions(
+            lessons=200, profiles=(PROFILE,), full_ratio=0.0, seed=9, jitter=jitter,
+            throttle_interval=throttle, throttle_endpoints=("batchOperator",),
+        )
+    )
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import main_select_courses
+    import activation_cache
+    import rate_governor
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    cookies = {"JSESSIONID": f"bench-{adaptive}"}
+    user_config = {"label": "Bench", "cookies": cookies, "tables": [{"profileId": PROFILE, "course_ids": course_ids}]}
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = 1
+    main_select_courses.prevalidate_courses = False
+    governor = rate_governor.RateGovernor() if adaptive else rate_governor.RateGovernor(rate=5.0, burst=1, minimum=5.0, maximum=5.0)
+    rate_governor.use_limit_model(None)
+    rate_governor.GOVERNORS[rate_governor.governor_key(cookies, "batchOperator")] = governor
+
+    t0 = time.perf_counter()
+    finished = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            await asyncio.wait_for(main_select_courses.run_loop_for_single_user(user_config, None), limit)
+        except asyncio.TimeoutError:
+            finished = False
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+
+    requests = emulator.stats.get("batchOperator", 0)
+    throttled = emulator.stats.get("throttled", 0)
+    return {
+        "selected": sorted(lesson_id for session in emulator.sessions.values() for lesson_id in session.selected),
+        "requests": requests,
+        "throttled": throttled,
+        "finished": finished,
+        "goodput": (requests - throttled) / requests if requests else 0.0,
+        "rate": governor.rate,
+        "elapsed": elapsed,
+        "port": emulator.port,
+    }
+
+
+async def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    throttle = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    jitter = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    limit = float(sys.argv[4]) if len(sys.argv) > 4 else 30.0
+    print(f"{courses} course(s) of one profile, server throttles requests closer than {throttle}s, "
+          f"up to {jitter}s jitter, cut off after {limit:g}s\n")
+    print(f"{'pacing':>9} {'selected':>9} {'requests':>9} {'throttled':>10} {'goodput':>8} {'final rate':>11} {'time':>9}")
+    port, reference = 0, None
+    for adaptive in (False, True):
+        result = await run(courses, throttle, jitter, limit, adaptive, port)
+        port = result["port"]
+        if result["finished"]:
+            if reference is None:
+                reference = result["selected"]
+            assert result["selected"] == reference, "the governor changed which courses were selected"
+        time_text = f"{result['elapsed']:.2f}s" if result["finished"] else "cut off"
+        print(f"{'adaptive' if adaptive else 'fixed':>9} {len(result['selected']):>9} {result['requests']:>9} {result['throttled']:>10} "
+              f"{result['goodput']:>7.0%} {result['rate']:>9.2f}/s {time_text:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""
+Selection journal: cost of a record, and requests a restart saves.
+
+1. Runs the selection loop of one user against the local emulator, "crashes" it
+   once half of the courses are selected, and restarts it on the same emulator,
+   once replaying the journal and once without. The resumed run must only send
+   the outstanding courses; both must end with the same courses selected.
+   The pre-check is off here: it would also skip the courses the server lists as
+   selected, while the journal does not depend on the catalog or defaultPage.
+2. Appends records to a journal file with fsync after every record and batched,
+   and reports the time per record.
+3. Appends `records` endless-mode errors for `courses` courses and checks that
+   compaction keeps the file bounded without losing any course's attempts.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_journal [records] [courses]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+class Crash(Exception):
+    pass
+
+
+def time_records(records: int, sync_every: int, directory: Path) -> float:
+    from selection_journal import SelectionJournal
+
+    path = directory / f"journal_{sync_every}.jsonl"
+    path.unlink(missing_ok=True)
+    journal = SelectionJournal(path, sync_every)
+    t0 = time.perf_counter()
+    for i in range(records):
+        journal.record("Bench", PROFILE, 100000 + i, "failed" if i % 3 else "success")
+    journal.close()
+    elapsed = time.perf_counter() - t0
+    assert len(SelectionJournal.load(path)) == records
+    return elapsed / records
+
+
+def compaction(records: int, courses: int, directory: Path) -> tuple[int, int]:
+    from selection_journal import COMPACT_MIN, COMPACT_RATIO, SelectionJournal
+
+    path = directory / "endless.jsonl"
+    path.unlink(missing_ok=True)
+    journal = SelectionJournal(path)
+    for i in range(records):
+        journal.record("Bench", PROFILE, 100000 + i % courses, "error")
+    journal.close()
+    with open(path, "rb") as f:
+        lines = sum(1 for _ in f)
+    replayed = SelectionJournal.load(path)
+    assert lines <= max(COMPACT_MIN, COMPACT_RATIO * courses), f"{lines} records kept"
+    attempts = sorted(entry.attempts for entry in replayed.entries.values())
+    expected = sorted(records // courses + (i < records % courses) for i in range(courses))
+    assert attempts == expected, "compaction lost attempts"
+    return lines, os.path.getsize(path)
+
+
+async def run_restart(courses: int, resume: bool, port: int, directory: Path) -> dict:
+    emulator = EamsEmulator(EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.0, seed=7))
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import main_select_courses
+    import activation_cache
+    from selection_journal import SelectionJournal
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": "bench-journal"}, "tables": [{"profileId": PROFILE, "course_ids": course_ids}]}
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = 1
+    main_select_courses.prevalidate_courses = False
+
+    class CrashingJournal(SelectionJournal):
+        def record(self, user, profileId, course_id, status, detail=""):
+            super().record(user, profileId, course_id, status, detail)
+            if sum(entry.status == "success" for entry in self.entries.values()) >= courses // 2:
+                raise Crash()
+
+    path = directory / f"restart_{resume}.jsonl"
+    path.unlink(missing_ok=True)
+    first = CrashingJournal(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            await main_select_courses.run_loop_for_single_user(user_config, first)
+        except Crash:
+            pass  # The journal is not closed, as in a killed process
+    before_restart = emulator.stats.get("batchOperator", 0)
+
+    journal = SelectionJournal.load(path) if resume else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        await main_select_courses.run_loop_for_single_user(user_config, journal)
+    if journal is not None:
+        journal.close()
+    await emulator.stop()
+
+    return {
+        "selected": sorted(lesson_id for session in emulator.sessions.values() for lesson_id in session.selected),
+        "first": before_restart,
+        "restart": emulator.stats.get("batchOperator", 0) - before_restart,
+        "port": emulator.port,
+    }
+
+
+async def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    courses = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        # The emulator runs first: config.py must be imported after EAMS_BASE_URL is set
+        print(f"{courses} course(s), crash after {courses // 2} selected, then restart\n")
+        print(f"{'restart':>16} {'first run':>10} {'restarted run':>14}")
+        port, reference = 0, None
+        for resume in (False, True):
+            result = await run_restart(courses, resume, port, directory)
+            port = result["port"]
+            if reference is None:
+                reference = result["selected"]
+            assert result["selected"] == reference, "the journal changed which courses were selected"
+            print(f"{'journal replay' if resume else 'from scratch':>16} {result['first']:>10} {result['restart']:>14}")
+
+        print(f"\n{records} journal records\n")
+        print(f"{'fsync every':>11} {'per record':>11}")
+        for sync_every in (1, 16, 64):
+            print(f"{sync_every:>11} {time_records(records, sync_every, directory) * 1e6:>9.1f}us")
+
+        endless = 20 * records
+        lines, size = compaction(endless, courses, directory)
+        print(f"\n{endless} endless-mode errors for {courses} course(s): {lines} record(s) on disk ({size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Background session upkeep against emulated expiry.
+
+1. Idle expiry: runs the selection loop of one user whose table paces requests `gap`
+   seconds apart against an emulator that drops sessions idle for `idle` seconds, without
+   and with the keepalive pinging sessions idle for half of that. Without it the session
+   dies between two requests and the remaining courses are given up; with it every
+   course goes out, for a few entry page pings.
+2. Expiry prediction: the emulator drops sessions `ttl` seconds after their first
+   request. A first session is kept alive until it expires, which teaches
+   SessionLifetimes its lifetime; a second session must then be warned about before it
+   expires, `warning` seconds ahead (within a keepalive tick). One short outlier among
+   the recorded lifetimes must not move the prediction.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_keepalive [courses] [gap] [idle] [ttl] [warning]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import aiohttp
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+async def start(port: int, **options) -> EamsEmulator:
+    emulator = EamsEmulator(EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.0, seed=17, **options))
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import activation_cache
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+    return emulator
+
+
+async def idle_run(courses: int, gap: float, idle: float, keepalive: bool, port: int) -> dict:
+    emulator = await start(port, session_idle_ttl=idle)
+    import main_select_courses
+    import session_lifetimes
+    from session_keepalive import SessionKeepalive
+    session_lifetimes.use_session_lifetimes(session_lifetimes.SessionLifetimes())
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    table = {"profileId": PROFILE, "course_ids": course_ids, "interval": gap}
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": f"idle-{keepalive}"}, "tables": [table]}
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = 1
+    main_select_courses.prevalidate_courses = False
+    upkeep = SessionKeepalive([user_config], interval=idle / 2, ping=keepalive)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        upkeep.start()
+        try:
+            failed = await main_select_courses.run_loop_for_single_user(user_config, None)
+        finally:
+            await upkeep.stop()
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+    return {
+        "selected": sorted(lesson_id for session in emulator.sessions.values() for lesson_id in session.selected),
+        "failed": len(failed),
+        "batchOperator": emulator.stats.get("batchOperator", 0),
+        "pings": upkeep.pings,
+        "elapsed": elapsed,
+        "port": emulator.port,
+    }
+
+
+async def prediction(ttl: float, warning: float, port: int) -> dict:
+    emulator = await start(port, session_ttl=ttl)
+    import session_lifetimes
+    from session_keepalive import SessionKeepalive
+    from utils import ensure_session_active
+    lifetimes = session_lifetimes.SessionLifetimes()
+    session_lifetimes.use_session_lifetimes(lifetimes)
+
+    results = {}
+    async with aiohttp.ClientSession() as session:
+        for name in ("first", "second"):
+            user_config = {"label": name, "cookies": {"JSESSIONID": f"ttl-{name}"}, "tables": [{"profileId": PROFILE, "course_ids": []}]}
+            upkeep = SessionKeepalive([user_config], interval=warning / 4, warning=warning, ping=True)
+            warned = expired = None
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                await ensure_session_active(session, user_config)  # The session starts here
+                upkeep.start()
+                while expired is None and time.perf_counter() - t0 < 2 * ttl:
+                    if warned is None and name in upkeep.warned:
+                        warned = time.perf_counter() - t0
+                    if name in upkeep.expired:
+                        expired = time.perf_counter() - t0
+                    await asyncio.sleep(0.01)
+                await upkeep.stop()
+            results[name] = {"warned": warned, "expired": expired, "pings": upkeep.pings}
+    await emulator.stop()
+    results["learned"] = lifetimes.predicted()
+    return results
+
+
+async def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    gap = float(sys.argv[2]) if len(sys.argv) > 2 else 1.5
+    idle = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    ttl = float(sys.argv[4]) if len(sys.argv) > 4 else 3.0
+    warning = float(sys.argv[5]) if len(sys.argv) > 5 else 1.0
+
+    print(f"{courses} course(s) sent {gap:g}s apart, sessions expire after {idle:g}s idle\n")
+    print(f"{'keepalive':>10} {'selected':>9} {'failed':>7} {'batchOperator':>14} {'pings':>6} {'time':>8}")
+    port = 0
+    for keepalive in (False, True):
+        result = await idle_run(courses, gap, idle, keepalive, port)
+        port = result["port"]
+        if keepalive:
+            assert result["failed"] == 0 and result["batchOperator"] == courses, "the keepalive let the session expire"
+        print(f"{'on' if keepalive else 'off':>10} {len(result['selected']):>9} {result['failed']:>7} {result['batchOperator']:>14} "
+              f"{result['pings']:>6} {result['elapsed']:>7.2f}s")
+
+    result = await prediction(ttl, warning, port)
+    first, second = result["first"], result["second"]
+    print(f"\nSessions expire {ttl:g}s after their first request, warning {warning:g}s ahead")
+    print(f"  first session:  expired after {first['expired']:.2f}s, no lifetime known yet (warned: {first['warned'] is not None})")
+    print(f"  learned lifetime: {result['learned']:.2f}s (a lower bound)")
+    assert second["warned"] is not None and second["expired"] is not None, second
+    lead = ttl - second["warned"]
+    print(f"  second session: warned after {second['warned']:.2f}s, {lead:.2f}s before its expiry")
+    assert first["warned"] is None and 0 < lead <= warning + ttl - result["learned"] + 0.1, "warning not ahead of the expiry"
+
+    from session_lifetimes import SessionLifetimes
+    outlier = SessionLifetimes()
+    outlier.lifetimes = [2 * 3600.0, 2 * 3600.0 + 60, 5.0]
+    assert outlier.predicted() == 2 * 3600.0, outlier.predicted()
+    print(f"  lifetimes 2h00m, 2h01m and 5s: predicted {outlier.predicted() / 3600:.1f}h")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+analyze_limits.py against emulated limits, and the budget the client keeps with its model.
+
+1. Probes emulators whose sessions may send `quota` requests per `window` seconds, per
+   endpoint or from one shared pool, and checks the inferred limit model: shared or not,
+   the quotas (within one hit) and the windows (within the probe's resolution).
+2. Runs the selection loop of one user against the shared-pool emulator, whose pool also
+   covers batchOperator, without a model and with the inferred one, counting "过快点击".
+   Both must select the same courses.
+3. Checks that the token bucket budgeted for a limit, burst plus a window of rate, stays
+   within limit_model_margin of its quota, for the inferred limits and a sweep of quotas.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_limits [quota] [window] [courses]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import aiohttp
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+async def start(quota: int, window: float, shared: bool, port: int) -> EamsEmulator:
+    emulator = EamsEmulator(
+        EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.0, seed=11, quota=quota, quota_window=window, quota_shared=shared)
+    )
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    return emulator
+
+
+async def probe(quota: int, window: float, shared: bool, port: int):
+    emulator = await start(quota, window, shared, port)
+    import analyze_limits
+    from config import eams_url
+
+    t0 = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        urls = analyze_limits.endpoint_urls(eams_url, PROFILE)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = await analyze_limits.probe_limits(session, urls, {"JSESSIONID": f"probe-{shared}"}, max_hits=3 * quota, spacing=0.05)
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+
+    assert model.shared == shared, f"inferred shared={model.shared}"
+    limits = [model.pool] if shared else list(model.endpoints.values())
+    assert len(model.endpoints) == 3, f"limited endpoints: {list(model.endpoints)}"
+    for limit in limits:
+        assert abs(limit.quota - quota) <= 1, f"quota {limit.quota} != {quota}"
+        assert window <= limit.window <= 1.6 * window + 0.2, f"window {limit.window:.2f}s vs {window}s"
+    check_budgets(limits)
+    return model, elapsed, emulator.port
+
+
+def check_budgets(limits):
+    from limit_model import EndpointLimit
+    from config import limit_model_margin
+
+    sweep = [EndpointLimit(quota, window) for quota in range(1, 201) for window in (0.5, 2.0, 60.0)]
+    for limit in limits + sweep:
+        for margin in (0.5, 0.8, 0.9, 1.0, limit_model_margin):
+            if margin * limit.quota <= 1:
+                continue  # Only the one request of burst fits (see EndpointLimit.budget)
+            rate, burst = limit.budget(margin)
+            assert rate > 0 and burst >= 1, f"{limit}: rate {rate}, burst {burst}"
+            assert burst + rate * limit.window <= margin * limit.quota + 1e-9, \
+                f"{limit} at margin {margin}: burst {burst} + {rate * limit.window:.2f} per window"
+
+
+async def select(quota: int, window: float, courses: int, model, port: int) -> dict:
+    emulator = await start(quota, window, True, port)
+    import main_select_courses
+    import activation_cache
+    import rate_governor
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": f"select-{model is not None}"}, "tables": [{"profileId": PROFILE, "course_ids": course_ids}]}
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = 1
+    main_select_courses.prevalidate_courses = False
+    rate_governor.use_limit_model(model)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await main_select_courses.run_loop_for_single_user(user_config, None)
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+    return {
+        "selected": sorted(lesson_id for session in emulator.sessions.values() for lesson_id in session.selected),
+        "requests": sum(emulator.stats.get(endpoint, 0) for endpoint in ("entry", "defaultPage", "batchOperator")),
+        "throttled": emulator.stats.get("throttled", 0),
+        "elapsed": elapsed,
+    }
+
+
+async def main():
+    quota = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    window = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    courses = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    print(f"Emulated limit: {quota} requests per {window:g}s and session\n")
+    print(f"{'pool':>12} {'inferred model':<60} {'probe time':>10}")
+    port, shared_model = 0, None
+    for shared in (False, True):
+        model, elapsed, port = await probe(quota, window, shared, port)
+        if shared:
+            shared_model = model
+        print(f"{'shared' if shared else 'per endpoint':>12} {model.describe():<60} {elapsed:>9.1f}s")
+
+    print(f"\n{courses} course(s) against the shared pool\n")
+    print(f"{'pacing':>12} {'selected':>9} {'requests':>9} {'throttled':>10} {'time':>8}")
+    reference = None
+    for model in (None, shared_model):
+        result = await select(quota, window, courses, model, port)
+        if reference is None:
+            reference = result["selected"]
+        assert result["selected"] == reference, "the limit model changed which courses were selected"
+        print(f"{'limit model' if model else 'default':>12} {len(result['selected']):>9} {result['requests']:>9} "
+              f"{result['throttled']:>10} {result['elapsed']:>7.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Event-loop lag while a catalog is parsed next to running selection loops.
+
+Simulated users tick every 0.2 s (the run_loop_for_single_user pacing) while one
+data.action body is parsed chunk by chunk, the way get_course_data does it:
+  inline  - LiteralStream.feed on the loop (the old behaviour)
+  thread  - feed_async on the thread pool
+  process - the cut on the loop, the parse in a worker process (dropped from
+            course_parser: pickling the lessons back costs more than it saves)
+LoopLagMonitor reports how late the loop woke up, and the tick drift column shows
+how far the simulated selection attempts slipped from their schedule.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_loop_lag [lessons]
+"""
+import asyncio
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from course_parser import LiteralStream, STREAM_CHUNK_SIZE, _parse_literal
+from loop_monitor import LoopLagMonitor
+from benchmarks.synthetic import make_catalog_payload
+
+USERS = 8
+TICK = 0.2
+
+
+async def selection_loop(stop: asyncio.Event, drifts: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        drifts.append(loop.time() - expected)
+
+
+async def parse(body: bytes, mode: str, executor) -> int:
+    stream = LiteralStream("[")
+    count = 0
+    for i in range(0, len(body), STREAM_CHUNK_SIZE):
+        chunk = body[i:i + STREAM_CHUNK_SIZE]
+        if mode == "inline":
+            count += len(stream.feed(chunk))
+        elif mode == "process":
+            literal = stream._cut(stream._decoder.decode(chunk))
+            if literal:
+                value, stream._standard = await asyncio.get_running_loop().run_in_executor(
+                    executor, _parse_literal, literal, stream._standard
+                )
+                count += len(stream._items(value))
+        else:
+            count += len(await stream.feed_async(chunk, executor))
+        await asyncio.sleep(0)  # Next chunk "arrives"
+    return count
+
+
+async def run(body: bytes, mode: str, executor) -> tuple[LoopLagMonitor, list, float, int]:
+    monitor = LoopLagMonitor()
+    stop = asyncio.Event()
+    drifts = []
+    monitor.start()
+    users = [asyncio.create_task(selection_loop(stop, drifts)) for _ in range(USERS)]
+    await asyncio.sleep(0.5)  # Baseline ticks
+
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    count = await parse(body, mode, executor)
+    elapsed = loop.time() - t0
+
+    await asyncio.sleep(0.5)
+    stop.set()
+    await asyncio.gather(*users)
+    await monitor.stop()
+    return monitor, drifts, elapsed, count
+
+
+async def main():
+    lessons = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    body = make_catalog_payload(lessons).encode()
+    print(f"Parsing {lessons} lessons ({len(body) / 1e6:.1f}MB) next to {USERS} selection loops\n")
+
+    with ThreadPoolExecutor(max_workers=2) as threads, ProcessPoolExecutor(max_workers=2) as processes:
+        for mode, executor in (("inline", None), ("thread", threads), ("process", processes)):
+            monitor, drifts, elapsed, count = await run(body, mode, executor)
+            print(
+                f"{mode:>8}: parsed {count} in {elapsed * 1000:7.1f}ms | "
+                f"{monitor.report('loop')} | tick drift max {max(drifts) * 1000:.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+"""
+fix_nonstandard_json: regex scanner vs. the original per-character loop.
+
+Every input is first checked for byte-identical output against the reference
+implementation, then both are timed on synthetic catalogs. If the optional
+pyjson5 package is installed, its direct parse is timed alongside.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_normalizer [sizes...]
+"""
+import json
+import random
+import sys
+import time
+
+from course_parser import fix_nonstandard_json, pyjson5
+from benchmarks.synthetic import make_catalog_payload, make_enrollment_payload
+
+
+def reference_fix_nonstandard_json(data_str: str) -> str:
+    """The original character-by-character implementation, kept as the equivalence oracle."""
+    out = []
+    i = 0
+    n = len(data_str)
+    stack = []
+    expect_key = False
+
+    while i < n:
+        c = data_str[i]
+
+        if c == '"' or c == "'":
+            quote = c
+            out.append('"')
+            i += 1
+            while i < n:
+                ch = data_str[i]
+                if ch == "\\" and i + 1 < n:
+                    out.append(ch)
+                    out.append(data_str[i + 1])
+                    i += 2
+                    continue
+                if ch == quote:
+                    i += 1
+                    break
+                if ch == '"':
+                    out.append('\\"')
+                    i += 1
+                    continue
+                out.append(ch)
+                i += 1
+            out.append('"')
+            expect_key = False
+            continue
+
+        if c == "{":
+            stack.append("{")
+            out.append(c)
+            expect_key = True
+            i += 1
+            continue
+        if c == "[":
+            stack.append("[")
+            out.append(c)
+            expect_key = False
+            i += 1
+            continue
+        if c == "}" or c == "]":
+            if stack:
+                stack.pop()
+            out.append(c)
+            expect_key = False
+            i += 1
+            continue
+        if c == ",":
+            out.append(c)
+            expect_key = bool(stack) and stack[-1] == "{"
+            i += 1
+            continue
+        if c == ":":
+            out.append(c)
+            expect_key = False
+            i += 1
+            continue
+        if c.isspace():
+            out.append(c)
+            i += 1
+            continue
+
+        if expect_key and (c.isalpha() or c == "_"):
+            j = i
+            while j < n and (data_str[j].isalnum() or data_str[j] == "_"):
+                j += 1
+            out.append('"' + data_str[i:j] + '"')
+            i = j
+            expect_key = False
+            continue
+
+        out.append(c)
+        i += 1
+
+    return "".join(out)
+
+
+# Hand-written edge cases: quoting, escapes, unterminated input, odd keys
+EDGE_CASES = [
+    "",
+    "[]",
+    "{}",
+    "[{id:1,name:'a'}]",
+    "[{id:1,name:\"a\"}]",
+    "{'a':1,\"b\":2,c:3}",
+    "{a:'it\\'s',b:'say \"hi\"',c:\"x\\\"y\"}",
+    "{a:'1,2:3',b:'{[]}'}",
+    "{ spaced : 1 ,\n\tnext:\r\n[ 1 , 2 ] }",
+    "{1abc:2,_x:3,x_1:4,9:5}",
+    "{-abc:1}",
+    "{ab-cd:1,ef:2}",
+    "{名称:'高等数学',教师:'张三'}",
+    "{a:true,b:false,c:null,d:-1.5e3}",
+    "[1,2,{a:[{b:{c:'d'}}]}]",
+    "}]{a:1",
+    "{a:'unterminated",
+    "{a:\"unterminated",
+    "{a:'trailing\\",
+    "{a:\"trailing\\",
+    "{a:'esc\\\"q\"'}",
+    "{a:''}",
+    "{a:\"\"}",
+    "{a:[,],b:{,}}",
+    "{½x:1}",
+    "{a:1}\u3000{b:2}",
+]
+
+
+def fuzz_cases(count: int, seed: int = 0) -> list[str]:
+    """Random strings over the scanner's alphabet to catch state-machine divergences."""
+    rng = random.Random(seed)
+    alphabet = "{}[],:'\"\\ \n_ab1é名-."
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+def check_equivalence(sizes: list[int]) -> int:
+    cases = EDGE_CASES + fuzz_cases(20000)
+    cases += [make_catalog_payload(size) for size in sizes if size <= 10_000]
+    cases.append(make_enrollment_payload(1000))
+    for case in cases:
+        expected = reference_fix_nonstandard_json(case)
+        actual = fix_nonstandard_json(case)
+        if actual != expected:
+            raise AssertionError(f"Output mismatch for input {case[:80]!r}:\n  {expected[:200]!r}\n  {actual[:200]!r}")
+    return len(cases)
+
+
+def best_of(func, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    checked = check_equivalence(sizes)
+    print(f"Equivalence: {checked} inputs identical to the reference implementation.\n")
+
+    print(f"{'lessons':>8} {'size':>10} {'reference':>12} {'scanner':>12} {'speedup':>8} {'pyjson5':>12}")
+    for size in sizes:
+        body = make_catalog_payload(size)
+        payload = body[body.index("["):body.rindex("]") + 1]  # What get_course_data hands over
+        repeat = 5 if size <= 10_000 else 2
+        ref = best_of(reference_fix_nonstandard_json, payload, repeat)
+        new = best_of(fix_nonstandard_json, payload, repeat)
+        parsed = json.loads(fix_nonstandard_json(payload))  # Output must still be valid JSON
+        if pyjson5 is not None:
+            # The optional C path skips normalization and json.loads entirely
+            assert pyjson5.decode(payload) == parsed
+            accel = f"{best_of(pyjson5.decode, payload, repeat) * 1000:>10.1f}ms"
+        else:
+            accel = f"{'n/a':>12}"
+        print(f"{size:>8} {len(payload) / 1e6:>8.2f}MB {ref * 1000:>10.1f}ms {new * 1000:>10.1f}ms {ref / new:>7.1f}x {accel}")
+
+
+if __name__ == "__main__":
+    main()
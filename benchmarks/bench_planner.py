@@ -0,0 +1,83 @@
+"""
+Course-set planner: branch and bound over slot bitsets vs. exhaustive search and rank-order greedy.
+
+Wishlists are drawn from a large synthetic catalog (random weekly schedules, so many
+entries clash) with a credit cap. For small wishlists the planner's result is checked
+against trying every subset; for all sizes its time and total weight are reported next
+to taking courses greedily in rank order.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_planner [wishlist sizes...]
+"""
+import random
+import sys
+import time
+
+from course_planner import Candidate, plan, slot_mask
+from course_validator import lesson_credits
+from benchmarks.synthetic import make_lessons
+
+CATALOG_SIZE = 20_000
+MAX_CREDITS = 20.0
+ROUNDS = 20
+EXHAUSTIVE_LIMIT = 14  # Wishlists up to this size are also solved by trying every subset
+
+
+def candidates_for(lessons: list, size: int, rng: random.Random) -> list[Candidate]:
+    return [Candidate("p", lesson["id"], rank, slot_mask(lesson), lesson_credits(lesson)) for rank, lesson in enumerate(rng.sample(lessons, size))]
+
+
+def feasible(subset: list[Candidate]) -> bool:
+    mask, credits = 0, 0.0
+    for c in subset:
+        if mask & c.mask:
+            return False
+        mask |= c.mask
+        credits += c.credits
+    return credits <= MAX_CREDITS
+
+
+def exhaustive(candidates: list[Candidate]) -> float:
+    best = 0.0
+    for bits in range(1 << len(candidates)):
+        subset = [c for i, c in enumerate(candidates) if bits >> i & 1]
+        if feasible(subset):
+            best = max(best, sum(c.weight for c in subset))
+    return best
+
+
+def greedy(candidates: list[Candidate]) -> float:
+    taken = []
+    for c in sorted(candidates, key=lambda c: c.rank):
+        if feasible(taken + [c]):
+            taken.append(c)
+    return sum(c.weight for c in taken)
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [8, 14, 30, 60, 120]
+    lessons = make_lessons(CATALOG_SIZE, seed=11)
+    rng = random.Random(0)
+    print(f"Catalog of {CATALOG_SIZE} lessons, max_credits {MAX_CREDITS:g}, {ROUNDS} wishlists per size\n")
+    print(f"{'wishlist':>8} {'planned':>8} {'mean':>9} {'worst':>9} {'weight':>8} {'greedy':>8} {'checked':>8}")
+    for size in sizes:
+        times, planned, weight, greedy_weight, checked = [], 0, 0.0, 0.0, 0
+        for _ in range(ROUNDS):
+            candidates = candidates_for(lessons, size, rng)
+            t0 = time.perf_counter()
+            chosen = plan(candidates, {"p": MAX_CREDITS})
+            times.append(time.perf_counter() - t0)
+            assert feasible(chosen)
+            total = sum(c.weight for c in chosen)
+            if size <= EXHAUSTIVE_LIMIT:
+                assert abs(total - exhaustive(candidates)) < 1e-9, "planner missed the optimum"
+                checked += 1
+            planned += len(chosen)
+            weight += total
+            greedy_weight += greedy(candidates)
+        print(f"{size:>8} {planned / ROUNDS:>8.1f} {sum(times) / ROUNDS * 1000:>7.2f}ms {max(times) * 1000:>7.2f}ms "
+              f"{weight / ROUNDS:>8.3f} {greedy_weight / ROUNDS:>8.3f} {checked:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Requests spent on certain failures: --start with and without the local pre-check.
+
+Runs the selection loop of one user against identically seeded local emulators that
+enforce timetable conflicts and a credit limit. With prevalidate_courses the client
+skips the courses its catalog shows cannot succeed (and drops the ones a selection
+made impossible), so both runs must end with the same selected courses, the
+pre-checked one with fewer batchOperator requests. A last pre-checked run starts from an
+activation cache that wrongly lists `stale` of the courses as selected (as a cache up to
+activation_cache_ttl old can): the selected lessons are read again before anything is
+skipped, so it must select the same courses.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_prevalidate [courses] [credit limit] [stale]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import aiohttp
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+async def run(courses: int, credit_limit: float, prevalidate: bool, port: int, stale: int = 0) -> dict:
+    emulator = EamsEmulator(EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.0, seed=5, credit_limit=credit_limit))
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import main_select_courses
+    import activation_cache
+    import course_validator
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    table = {"profileId": PROFILE, "course_ids": course_ids, "max_credits": credit_limit}
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": f"bench-{prevalidate}-{stale}"}, "tables": [table]}
+    if stale:
+        # A warm session whose cached activation lists courses it never selected
+        from utils import ensure_session_active
+        cache = activation_cache.ActivationCache()
+        activation_cache.use_activation_cache(cache)
+        async with aiohttp.ClientSession() as session:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await ensure_session_active(session, user_config)
+        cache.record(user_config["cookies"], PROFILE, {int(course_id) for course_id in course_ids[:stale]})
+
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = 1  # One request per attempted course
+    main_select_courses.prevalidate_courses = prevalidate
+    course_validator.load_catalog_cache = lambda semester_id, profile_id: None  # Always fetch from this emulator
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await main_select_courses.run_loop_for_single_user(user_config)
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+
+    return {
+        "selected": sorted(lesson_id for session in emulator.sessions.values() for lesson_id in session.selected),
+        "batchOperator": emulator.stats.get("batchOperator", 0),
+        "data": emulator.stats.get("data", 0),
+        "elapsed": elapsed,
+        "port": emulator.port,
+    }
+
+
+async def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    credit_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 25.0
+    stale = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    print(f"{courses} course(s) of one profile with random schedules, credit limit {credit_limit:g}\n")
+    print(f"{'pre-check':>16} {'selected':>9} {'batchOperator':>14} {'data.action':>12} {'time':>8}")
+    port, reference = 0, None
+    for name, prevalidate, stale_elected in (("off", False, 0), ("on", True, 0), (f"on, {stale} stale", True, stale)):
+        result = await run(courses, credit_limit, prevalidate, port, stale_elected)
+        port = result["port"]
+        if reference is None:
+            reference = result["selected"]
+        assert result["selected"] == reference, "the pre-check changed which courses were selected"
+        print(f"{name:>16} {len(result['selected']):>9} {result['batchOperator']:>14} "
+              f"{result['data']:>12} {result['elapsed']:>7.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
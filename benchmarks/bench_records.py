@@ -0,0 +1,64 @@
+"""
+Memory and build time of the --inquire catalog and enrollment structures:
+renamed dicts vs. Course records, and dict-of-dicts vs. EnrollmentTable.
+
+Both representations must hold the same values before they are measured.
+Memory is the tracemalloc peak while building from already parsed lessons.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_records [sizes...]
+"""
+import sys
+import time
+import tracemalloc
+
+from catalog_store import COURSE_KEY_MAPPING
+from course_parser import parse_course_json
+from enrollment_table import EnrollmentTable
+from inquire_course_info import rename_courses
+from benchmarks.synthetic import make_enrollment_payload, make_lessons
+
+
+def rename_to_dicts(courses: list) -> list[dict]:
+    """The original rename_courses: one dict per lesson."""
+    return [{new_key: course.get(old_key, "") for old_key, new_key in COURSE_KEY_MAPPING.items()} for course in courses]
+
+
+def measure(build, *args) -> tuple[object, float, int]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'lessons':>8} {'structure':>16} {'build':>10} {'memory':>10}")
+
+    for size in sizes:
+        lessons = make_lessons(size)
+        body = make_enrollment_payload(size)
+        counts = parse_course_json(body[body.index("{"):])
+
+        dicts, dict_time, dict_mem = measure(rename_to_dicts, lessons)
+        records, record_time, record_mem = measure(rename_courses, lessons)
+        assert [record.to_dict() for record in records] == dicts
+
+        table, table_time, table_mem = measure(EnrollmentTable.from_counts, counts)
+        nested, nested_time, nested_mem = measure(lambda: {k: dict(v) for k, v in counts.items()})
+        assert all(table.get(k) == (int(v["sc"]), int(v["lc"])) for k, v in nested.items())
+
+        for name, elapsed, memory in (
+            ("course dicts", dict_time, dict_mem),
+            ("Course records", record_time, record_mem),
+            ("count dicts", nested_time, nested_mem),
+            ("EnrollmentTable", table_time, table_mem),
+        ):
+            print(f"{size:>8} {name:>16} {elapsed * 1000:>8.1f}ms {memory / 2**20:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
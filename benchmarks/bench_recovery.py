@@ -0,0 +1,118 @@
+"""
+What a transient loss of the election context costs: giving up vs. re-activating.
+
+1. Runs the selection loop of one user against identically seeded local emulators whose
+   sessions lose their activation every `every`-th batchOperator request (302 until
+   !defaultPage is visited again): once without context loss (the reference), then with
+   it, first giving up on the first 302 as before (session_recovery_attempts = 0), then
+   with the configured recovery. The recovering run must select what the reference did,
+   with one warm-up (entry + defaultPage) per loss. A last run also throttles the entry
+   page to one request per `quota_window` seconds, so warm-ups fail with "过快" and are
+   retried with backoff: nothing may be given up.
+2. Lets `waiters` coroutines that saw the same redirect recover one session at once:
+   they must share a single warm-up.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_recovery [courses] [every] [waiters]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import aiohttp
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+async def start(every: int, port: int, **options) -> EamsEmulator:
+    emulator = EamsEmulator(EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.0, seed=13, context_loss_every=every, **options))
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import activation_cache
+    import session_lifetimes
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+    session_lifetimes.use_session_lifetimes(session_lifetimes.SessionLifetimes())  # Nothing learned from emulated expiry
+    return emulator
+
+
+async def run(courses: int, every: int, attempts: int, port: int, **options) -> dict:
+    emulator = await start(every, port, **options)
+    import main_select_courses
+    import session_recovery
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    cookies = {"JSESSIONID": f"bench-{every}-{attempts}-{bool(options)}"}
+    user_config = {"label": "Bench", "cookies": cookies, "tables": [{"profileId": PROFILE, "course_ids": course_ids}]}
+    main_select_courses.ENDLESS = False
+    main_select_courses.batch_operator_size = 1
+    main_select_courses.prevalidate_courses = False
+    recovery = session_recovery.RECOVERIES[tuple(cookies.items())] = session_recovery.SessionRecovery(attempts)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        failed = await main_select_courses.run_loop_for_single_user(user_config, None)
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+    return {
+        "selected": sorted(lesson_id for session in emulator.sessions.values() for lesson_id in session.selected),
+        "failed": len(failed),
+        "batchOperator": emulator.stats.get("batchOperator", 0),
+        "redirects": emulator.stats.get("302", 0),
+        "warmups": emulator.stats.get("entry", 0),
+        "throttled": emulator.stats.get("throttled", 0),
+        "recoveries": recovery.recoveries,
+        "elapsed": elapsed,
+        "port": emulator.port,
+    }
+
+
+async def coalesce(waiters: int, port: int) -> dict:
+    emulator = await start(0, port)
+    import session_recovery
+
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": "bench-coalesce"}, "tables": [{"profileId": PROFILE, "course_ids": []}]}
+    recovery = session_recovery.SessionRecovery()
+    async with aiohttp.ClientSession() as session:
+        generation = recovery.generation  # Every waiter sent its request before the loss
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await asyncio.gather(*(recovery.recover(session, user_config, generation) for _ in range(waiters)))
+    await emulator.stop()
+    return {"recovered": sum(results), "warmups": emulator.stats.get("entry", 0), "defaultPage": emulator.stats.get("defaultPage", 0)}
+
+
+async def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    every = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    waiters = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    print(f"{courses} course(s) of one profile, the session loses its context every {every} batchOperator request(s)\n")
+    print(f"{'run':>16} {'selected':>9} {'failed':>7} {'batchOperator':>14} {'302':>5} {'warm-ups':>9} {'time':>8}")
+    port, reference = 0, None
+    throttled_entry = {"throttle_endpoints": ("entry",), "quota": 1, "quota_window": 4.0}
+    runs = (("no context loss", 0, 0, {}), ("give up on 302", every, 0, {}), ("re-activate", every, 3, {}),
+            ("throttled warm-up", every, 3, throttled_entry))
+    for name, loss, attempts, options in runs:
+        result = await run(courses, loss, attempts, port, **options)
+        port = result["port"]
+        if reference is None:
+            reference, reference_failed = result["selected"], result["failed"]
+        elif attempts:
+            assert result["selected"] == reference, "recovery changed which courses were selected"
+            assert result["failed"] == reference_failed, "a course was given up"
+            if not options:
+                assert result["recoveries"] == result["redirects"], "more than one warm-up per context loss"
+        print(f"{name:>16} {len(result['selected']):>9} {result['failed']:>7} {result['batchOperator']:>14} "
+              f"{result['redirects']:>5} {result['warmups']:>9} {result['elapsed']:>7.2f}s")
+
+    result = await coalesce(waiters, port)
+    assert result["recovered"] == waiters and result["warmups"] == 1, result
+    print(f"\n{waiters} concurrent recoveries of one redirect: {result['warmups']} entry and {result['defaultPage']} defaultPage request(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
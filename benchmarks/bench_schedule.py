@@ -0,0 +1,72 @@
+"""
+Polling cost vs. reaction time: fixed watch_interval vs. the adaptive PollSchedule.
+
+Simulates a selection day on a clock (no requests are sent): watched lessons change
+rarely for a long quiet stretch, then often during a busy window, then rarely again.
+Reports how many queryStdCount polls each strategy sends and how long a change
+stays unseen on average and at worst.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_schedule [hours]
+"""
+import bisect
+import random
+import sys
+
+from config import watch_interval
+from poll_schedule import PollSchedule
+
+LESSONS = [str(100000 + i) for i in range(8)]
+PROFILES = {"11": LESSONS[:5], "22": LESSONS[5:]}
+
+
+class SimulatedDiff:
+    """The parts of an EnrollmentDiff a PollSchedule reads."""
+
+    def __init__(self, interval: float, changed: list[int]):
+        self.interval = interval
+        self.changed = changed
+
+
+def make_events(hours: float, rng: random.Random) -> list[tuple[float, int]]:
+    """(time, lesson id) changes: 2/h quiet, one every 20s during a 20 min busy window in the middle."""
+    end = hours * 3600
+    busy_start, busy_end = end / 2, end / 2 + 20 * 60
+    events = []
+    for start, stop, rate in ((0, busy_start, 2 / 3600), (busy_start, busy_end, 1 / 20), (busy_end, end, 2 / 3600)):
+        t = start + rng.expovariate(rate)
+        while t < stop:
+            events.append((t, int(rng.choice(LESSONS))))
+            t += rng.expovariate(rate)
+    return events
+
+
+def simulate(events: list[tuple[float, int]], end: float, adaptive: bool) -> tuple[int, float, float]:
+    """Polls sent, mean and worst seconds from a change until the poll that sees it."""
+    schedule = PollSchedule(LESSONS)
+    times = [t for t, _ in events]
+    polls, delays = 0, []
+    last, t = 0.0, 0.0
+    while t < end:
+        polls += 1
+        lo, hi = bisect.bisect_right(times, last), bisect.bisect_right(times, t)
+        delays += [t - times[i] for i in range(lo, hi)]
+        if polls > 1:
+            schedule.observe(SimulatedDiff(t - last, [lesson for _, lesson in events[lo:hi]]), t)
+        last = t
+        t += schedule.next_interval(PROFILES, t) if adaptive else watch_interval
+    return polls, sum(delays) / max(1, len(delays)), max(delays, default=0.0)
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 6.0
+    events = make_events(hours, random.Random(0))
+    print(f"{hours:g} h simulated, {len(events)} changes of {len(LESSONS)} watched lessons\n")
+    print(f"{'strategy':>10} {'polls':>8} {'mean unseen':>12} {'worst unseen':>13}")
+    for name, adaptive in (("fixed", False), ("adaptive", True)):
+        polls, mean, worst = simulate(events, hours * 3600, adaptive)
+        print(f"{name:>10} {polls:>8} {mean:>11.1f}s {worst:>12.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+filter_courses: linear scan vs. the prebuilt CourseIndex.
+
+Both paths must return identical results for every query before they are timed.
+Times are per query (best of several runs) and include building the result dicts.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_search [sizes...]
+"""
+import sys
+import time
+
+from course_index import CourseIndex
+from course_parser import parse_course_json
+from enrollment_table import EnrollmentTable
+from inquire_course_info import filter_courses, rename_courses
+from benchmarks.synthetic import make_enrollment_payload, make_lessons
+
+QUERIES = ["数", "高等", "原理(", "电力系统分析", "teacher=王", "type=专业选修", "no=12", "id=100123", "credits=2.5", "zzz"]
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [10_000, 100_000]
+
+    for size in sizes:
+        courses = rename_courses(make_lessons(size))
+        body = make_enrollment_payload(size)
+        enrollments = EnrollmentTable.from_counts(parse_course_json(body[body.index("{"):]))
+
+        t0 = time.perf_counter()
+        index = CourseIndex(courses)
+        build = time.perf_counter() - t0
+        print(f"\n{size} lessons: index built in {build * 1000:.0f}ms")
+        print(f"{'query':>16} {'matches':>8} {'linear':>10} {'index':>10} {'speedup':>8}")
+
+        for query in QUERIES:
+            expected = [match.to_dict() for match in filter_courses(courses, query, enrollments)]
+            assert [match.to_dict() for match in filter_courses(index, query, enrollments)] == expected, query
+            linear = best_of(lambda: filter_courses(courses, query, enrollments))
+            indexed = best_of(lambda: filter_courses(index, query, enrollments))
+            print(f"{query:>16} {len(expected):>8} {linear * 1000:>8.2f}ms {indexed * 1000:>8.3f}ms {linear / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
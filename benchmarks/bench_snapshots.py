@@ -0,0 +1,83 @@
+"""
+Enrollment snapshot diffing: walking {id: {sc, lc}} dicts vs. EnrollmentHistory's aligned arrays.
+
+Each case changes a share of lessons (seats taken and freed, some limits raised)
+and diffs the new table against the previous one. Both paths must report the same
+seats freed / limits raised / newly full lessons before they are timed.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_snapshots [sizes...]
+"""
+import random
+import sys
+import time
+
+from course_parser import parse_course_json
+from enrollment_history import EnrollmentHistory
+from enrollment_table import EnrollmentTable
+from benchmarks.synthetic import make_enrollment_payload
+
+CHANGED_SHARES = (0.0, 0.001, 0.01)  # Quiet poll, a few seats moving, a busy moment
+
+
+def dict_diff(old: dict, new: dict) -> tuple[list, list, list]:
+    """The straightforward way: walk every lesson of both dicts."""
+    seats_freed, limits_raised, newly_full = [], [], []
+    for lesson_id, counts in new.items():
+        previous = old.get(lesson_id)
+        if previous is None or previous == counts:
+            continue
+        before = previous["lc"] - previous["sc"]
+        after = counts["lc"] - counts["sc"]
+        if after > 0 and after > before:
+            seats_freed.append((int(lesson_id), before, after))
+        if counts["lc"] > previous["lc"]:
+            limits_raised.append((int(lesson_id), previous["lc"], counts["lc"]))
+        if before > 0 and after <= 0:
+            newly_full.append(int(lesson_id))
+    return seats_freed, limits_raised, newly_full
+
+
+def mutate(counts: dict, share: float, rng: random.Random) -> dict:
+    new = {lesson_id: dict(c) for lesson_id, c in counts.items()}
+    for lesson_id in rng.sample(list(new), int(len(new) * share)):
+        c = new[lesson_id]
+        if rng.random() < 0.1:
+            c["lc"] += 10
+        else:
+            c["sc"] = max(0, min(c["lc"], c["sc"] + rng.choice((-2, -1, 1, 2))))
+    return new
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [10_000, 100_000]
+    rng = random.Random(0)
+    print(f"{'lessons':>8} {'changed':>8} {'dict walk':>10} {'arrays':>10} {'speedup':>8} {'append':>9}")
+
+    for size in sizes:
+        body = make_enrollment_payload(size)
+        old = parse_course_json(body[body.index("{"):])
+        for share in CHANGED_SHARES:
+            new = mutate(old, share, rng)
+            history = EnrollmentHistory()
+            history.append(EnrollmentTable.from_counts(old), 0.0)
+            table = EnrollmentTable.from_counts(new)
+
+            t0 = time.perf_counter()
+            diff = history.append(table, 1.0)
+            append = time.perf_counter() - t0
+            assert (diff.seats_freed, diff.limits_raised, diff.newly_full) == dict_diff(old, new)
+
+            walk = min(timed(lambda: dict_diff(old, new)) for _ in range(5))
+            arrays = min(timed(lambda: history.diff()) for _ in range(5))
+            print(f"{size:>8} {len(diff.changed):>8} {walk * 1000:>8.2f}ms {arrays * 1000:>8.3f}ms {walk / arrays:>7.1f}x {append * 1000:>7.2f}ms")
+
+
+def timed(func) -> float:
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Buffered vs. streaming parse of data.action / queryStdCount.action bodies.
+
+The buffered path parses the whole body in one call (parse_literal_body), the
+streaming path feeds LiteralStream in STREAM_CHUNK_SIZE pieces. read_literal, which
+get_course_data and get_enrollment_data use, buffers bodies up to STREAM_THRESHOLD
+and streams larger ones; the last column shows its choice and checks that it returns
+the same elements.
+Peak memory is measured with tracemalloc and excludes the response body itself.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_stream [sizes...]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from course_parser import LiteralStream, STREAM_CHUNK_SIZE, STREAM_THRESHOLD, parse_literal_body, read_literal, shutdown_parse_executor
+from benchmarks.synthetic import make_catalog_payload, make_enrollment_payload
+
+
+def buffered(body: bytes, container: str):
+    items = parse_literal_body(body, container)
+    return dict(items) if container == "{" else items
+
+
+def streamed(body: bytes, container: str):
+    stream = LiteralStream(container)
+    items = []
+    for i in range(0, len(body), STREAM_CHUNK_SIZE):
+        items.extend(stream.feed(body[i:i + STREAM_CHUNK_SIZE]))
+    items.extend(stream.close())
+    return dict(items) if container == "{" else items
+
+
+async def chunks_of(body: bytes):
+    for i in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[i:i + STREAM_CHUNK_SIZE]
+
+
+def client(body: bytes, container: str):
+    """read_literal on a chunked body (no Content-Length)."""
+    items = asyncio.run(read_literal(chunks_of(body), container))
+    return dict(items) if container == "{" else items
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 10_000, 50_000]
+
+    print(f"Bodies above {STREAM_THRESHOLD / 1e6:.1f}MB are streamed\n")
+    print(f"{'payload':>22} {'size':>9} {'buffered':>20} {'streamed':>20} {'client':>8}")
+    for size in sizes:
+        for name, body, container in (
+            (f"data.action x{size}", make_catalog_payload(size).encode(), "["),
+            (f"queryStdCount x{size}", make_enrollment_payload(size).encode(), "{"),
+        ):
+            expected, t_buf, m_buf = measure(buffered, body, container)
+            actual, t_str, m_str = measure(streamed, body, container)
+            assert actual == expected
+            assert client(body, container) == expected
+            print(
+                f"{name:>22} {len(body) / 1e6:>7.2f}MB "
+                f"{t_buf * 1000:>8.1f}ms {m_buf / 1e6:>7.1f}MB "
+                f"{t_str * 1000:>8.1f}ms {m_str / 1e6:>7.1f}MB "
+                f"{'streamed' if len(body) > STREAM_THRESHOLD else 'buffered':>8}"
+            )
+    shutdown_parse_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Request volume and time to select: --start --endless vs. --start --watch, against the local emulator.
+
+All watched lessons start full; the emulator's churn frees and takes seats at random.
+Both modes run on identically seeded emulators until every course is selected (or the
+time limit passes), and the emulator's counters give the requests each one sent.
+A last watch run makes the inquiry session lose its election context every
+`loss_every`-th poll (queryStdCount answers 302): it must re-activate that session and
+still select every course. In the "conflict" run the server answers the first course
+with a time conflict: the watch loop must give it up instead of waiting for a seat, and
+end once the others are selected.
+
+Run from the project root:
+    uv run python -m benchmarks.bench_watch [courses] [time limit seconds] [loss_every]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+from benchmarks.eams_server import EamsEmulator, EmulatorOptions
+
+PROFILE = "114514"
+
+
+def emulator_options(loss_every: int = 0) -> EmulatorOptions:
+    return EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=1.0, churn_interval=0.5, churn=10, seed=7,
+                           poll_context_loss_every=loss_every)
+
+
+async def run_mode(mode: str, courses: int, limit: float, port: int, loss_every: int = 0, conflicts: int = 0) -> dict:
+    emulator = EamsEmulator(emulator_options(loss_every))
+    emulator.options.conflict_ids = {lesson["id"] for lesson in emulator.profile_lessons[PROFILE][:conflicts]}  # Answered with a time conflict
+    await emulator.start(port=port)
+    # config.py reads EAMS_BASE_URL once, at import time: every run reuses the same port
+    os.environ["EAMS_BASE_URL"] = emulator.base_url
+    import main_select_courses
+    import activation_cache
+    import session_lifetimes
+    from config_loader import ENROLLMENT_DATA_API_PARAMS
+    from selection_journal import journal_path
+    from watch_courses import watch_courses
+    activation_cache.use_activation_cache(activation_cache.ActivationCache(ttl=0))  # Each emulator starts without sessions
+    session_lifetimes.use_session_lifetimes(session_lifetimes.SessionLifetimes())  # Nothing learned from emulated sessions
+    # The journal is kept per server URL; an earlier invocation may have been given the same port
+    journal_path(ENROLLMENT_DATA_API_PARAMS.get("semesterId", "")).unlink(missing_ok=True)
+
+    course_ids = [str(lesson["id"]) for lesson in emulator.profile_lessons[PROFILE][:courses]]
+    user_config = {"label": "Bench", "cookies": {"JSESSIONID": f"bench-{mode}"}, "tables": [{"profileId": PROFILE, "course_ids": course_ids}]}
+    inquiry_user = {"label": "BenchInquiry", "cookies": {"JSESSIONID": f"inquiry-{mode}-{loss_every}-{conflicts}"}, "profileId": [PROFILE]}
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "endless":
+            main_select_courses.ENDLESS = True
+            run = main_select_courses.run_loop_for_single_user(user_config)
+        else:
+            run = watch_courses(interval=0.5, user_configs=[user_config], inquiry_user=inquiry_user)
+        try:
+            await asyncio.wait_for(run, limit)
+        except asyncio.TimeoutError:
+            pass
+    elapsed = time.perf_counter() - t0
+    await emulator.stop()
+
+    selected = sum(len(session.selected) for session in emulator.sessions.values())
+    return {"mode": mode, "selected": selected, "elapsed": elapsed, "stats": dict(emulator.stats), "port": emulator.port}
+
+
+async def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    limit = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    print(f"{courses} full course(s), seats freed by random churn, time limit {limit:.0f}s\n")
+    loss_every = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    print(f"{'mode':>8} {'selected':>9} {'time':>8} {'batchOperator':>14} {'queryStdCount':>14} {'302':>5} {'warm-ups':>9}")
+    port = 0  # First run picks a free port
+    runs = (("endless", "endless", 0, 0), ("watch", "watch", 0, 0), ("watch302", "watch", loss_every, 0), ("conflict", "watch", 0, 1))
+    for name, mode, loss, conflicts in runs:
+        result = await run_mode(mode, courses, limit, port, loss, conflicts)
+        port = result["port"]
+        stats = result["stats"]
+        if loss:
+            assert result["selected"] == courses, "the watch loop did not recover its inquiry session"
+            assert stats.get("302", 0) == stats.get("context_lost", 0), "more than one redirected poll per context loss"
+        if conflicts:
+            assert result["selected"] == courses - conflicts, "the watch loop selected a conflicting course"
+            assert result["elapsed"] < limit, "the watch loop kept waiting for a course that failed with a conflict"
+        print(f"{name:>8} {result['selected']:>6}/{courses:<2} {result['elapsed']:>7.1f}s "
+              f"{stats.get('batchOperator', 0):>14} {stats.get('queryStdCount', 0):>14} {stats.get('302', 0):>5} {stats.get('entry', 0):>9}")
+    print(f"\nwatch302: queryStdCount of the inquiry session answers 302 every {loss_every}th poll until re-activated")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,414 @@
+"""
+Local stand-in for the EAMS course selection endpoints, for offline end-to-end runs and benchmarks.
+
+Serves stdElectCourse.action, !defaultPage.action, !data.action (JS-literal lessons),
+!queryStdCount.action and !batchOperator.action over a synthetic catalog, with
+configurable latency, session expiry (302 to the login page; absolute or after idling), transient loss of the
+election context (302 until !defaultPage is visited again), "过快点击" throttling
+(minimum interval or sliding-window quota, per endpoint or shared),
+full lessons, timetable conflicts and a per-profile credit limit. Any JSESSIONID cookie is accepted as a new session.
+GET /__stats returns per-endpoint request counters as JSON.
+
+Run from the project root, then point the client at it:
+    uv run python -m benchmarks.eams_server --port 8080 [options]
+    EAMS_BASE_URL=http://127.0.0.1:8080 uv run main.py --start
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from collections import deque
+
+from aiohttp import web
+
+from benchmarks.synthetic import js_literal, make_lessons
+
+PREFIX = "/eams/stdElectCourse"
+
+
+class EmulatorOptions:
+    """Behaviour knobs of the emulator; every one can also be set from the command line."""
+
+    def __init__(
+        self,
+        lessons: int = 2000,
+        profiles: tuple = ("114514",),
+        seed: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        session_ttl: float = 0.0,
+        session_idle_ttl: float = 0.0,
+        context_loss_every: int = 0,
+        poll_context_loss_every: int = 0,
+        throttle_interval: float = 0.0,
+        throttle_endpoints: tuple = (),
+        quota: int = 0,
+        quota_window: float = 10.0,
+        quota_shared: bool = False,
+        full_ratio: float = 0.1,
+        conflict_ids: tuple = (),
+        closed: bool = False,
+        require_activation: bool = True,
+        churn_interval: float = 0.0,
+        churn: int = 20,
+        credit_limit: float = 0.0,
+    ):
+        self.lessons = lessons
+        self.profiles = tuple(str(p) for p in profiles)
+        self.seed = seed
+        self.latency = latency  # Seconds added to every response
+        self.jitter = jitter  # Up to this many extra seconds, uniformly random
+        self.session_ttl = session_ttl  # Seconds a session lives after its first request (0 = forever)
+        self.session_idle_ttl = session_idle_ttl  # Seconds without a request after which a session expires (0 = never)
+        self.context_loss_every = context_loss_every  # Every Nth batchOperator of a session loses its activation: 302 (0 = never)
+        self.poll_context_loss_every = poll_context_loss_every  # The same for every Nth queryStdCount of a session
+        self.throttle_interval = throttle_interval  # Minimum seconds between two requests of a session (0 = off)
+        self.throttle_endpoints = set(throttle_endpoints)  # Endpoints the throttle applies to (empty = all)
+        self.quota = quota  # Accepted requests of a session per endpoint in any quota_window seconds (0 = off)
+        self.quota_window = quota_window
+        self.quota_shared = quota_shared  # One quota for all endpoints instead of one each
+        self.full_ratio = full_ratio  # Share of lessons that start full
+        self.conflict_ids = {int(i) for i in conflict_ids}  # Lessons that always report a time conflict
+        self.closed = closed  # Selection not open: batchOperator answers "当前选课不开放"
+        self.require_activation = require_activation  # data/batchOperator need !defaultPage first
+        self.churn_interval = churn_interval  # Seconds between random sc changes by "other students" (0 = off)
+        self.churn = churn  # Lessons changed per churn step
+        self.credit_limit = credit_limit  # Maximum credits a session may select per profile (0 = no limit)
+
+
+class EamsSession:
+    __slots__ = ("created", "seen", "expired", "last_request", "activated", "selected", "slots", "hits", "operations", "polls")
+
+    def __init__(self):
+        self.created = self.seen = time.monotonic()
+        self.expired = False
+        self.last_request = 0.0
+        self.activated: set[str] = set()
+        self.selected: set[int] = set()
+        self.slots: set[tuple] = set()  # (weekDay, unit) taken by selected lessons
+        self.hits: dict[str, deque] = {}  # Quota pool -> times of the accepted requests in the window
+        self.operations = 0  # batchOperator requests that got past the guard
+        self.polls = 0  # The same for queryStdCount
+
+
+class EamsEmulator:
+    """State and aiohttp handlers of one emulated EAMS instance."""
+
+    def __init__(self, options: EmulatorOptions | None = None):
+        self.options = options or EmulatorOptions()
+        opts = self.options
+        rng = random.Random(opts.seed + 1)
+        self.lessons = make_lessons(opts.lessons, opts.seed)
+        self.by_id = {lesson["id"]: lesson for lesson in self.lessons}
+        # Lessons are dealt to profiles round-robin; each profile serves its own catalog
+        self.profile_lessons = {pid: self.lessons[i::len(opts.profiles)] for i, pid in enumerate(opts.profiles)}
+        self.profile_of = {lesson["id"]: pid for pid, lessons in self.profile_lessons.items() for lesson in lessons}
+        self.counts: dict[int, list[int]] = {}
+        for lesson in self.lessons:
+            lc = rng.choice([30, 60, 90, 120])
+            sc = lc if rng.random() < opts.full_ratio else rng.randint(0, lc - 1)
+            self.counts[lesson["id"]] = [sc, lc]
+        self.sessions: dict[str, EamsSession] = {}
+        self.stats: dict[str, int] = {}
+        self._catalogs: dict[str, tuple[bytes, str]] = {}
+        self._rng = random.Random(opts.seed + 2)
+        self._churn_task = None
+
+    # --- Helpers ---
+
+    def slots_of(self, lesson: dict) -> set[tuple]:
+        return {(a["weekDay"], unit) for a in lesson.get("arrangeInfo", []) for unit in range(a["startUnit"], a["endUnit"] + 1)}
+
+    def catalog(self, profile_id: str) -> tuple[bytes, str]:
+        """data.action body of a profile and its ETag, rendered once."""
+        cached = self._catalogs.get(profile_id)
+        if cached is None:
+            body = ("var lessonJSONs = " + js_literal(self.profile_lessons.get(profile_id, [])) + ";\n").encode("utf-8")
+            cached = self._catalogs[profile_id] = (body, '"' + hashlib.md5(body).hexdigest() + '"')
+        return cached
+
+    def enrollment_payload(self) -> str:
+        entries = ",".join(f"'{lesson_id}':{{sc:{sc},lc:{lc}}}" for lesson_id, (sc, lc) in self.counts.items())
+        return "window.lessonId2Counts={" + entries + "}"
+
+    async def _delay(self):
+        opts = self.options
+        delay = opts.latency + (self._rng.uniform(0, opts.jitter) if opts.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _session(self, request: web.Request) -> EamsSession | None:
+        """Session of the request, or None if it has no cookie or has expired."""
+        key = request.cookies.get("JSESSIONID")
+        if not key:
+            return None
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = EamsSession()
+        ttl, idle_ttl = self.options.session_ttl, self.options.session_idle_ttl
+        now = time.monotonic()
+        if session.expired or (ttl and now - session.created > ttl) or (idle_ttl and now - session.seen > idle_ttl):
+            session.expired = True  # Like a logged-out session, it stays gone
+            return None
+        session.seen = now
+        return session
+
+    def _throttled(self, session: EamsSession, endpoint: str) -> bool:
+        if self.options.throttle_endpoints and endpoint not in self.options.throttle_endpoints:
+            return False
+        opts = self.options
+        now = time.monotonic()
+        throttled = bool(opts.throttle_interval) and now - session.last_request < opts.throttle_interval
+        session.last_request = now
+        if opts.quota and not throttled:
+            hits = session.hits.setdefault("shared" if opts.quota_shared else endpoint, deque())
+            while hits and now - hits[0] >= opts.quota_window:
+                hits.popleft()
+            if len(hits) >= opts.quota:
+                return True  # Refused requests do not use up the quota
+            hits.append(now)
+        return throttled
+
+    @staticmethod
+    def _html(text: str, status: int = 200) -> web.Response:
+        return web.Response(text=text, status=status, content_type="text/html", charset="utf-8")
+
+    async def _guard(self, request: web.Request, endpoint: str):
+        """Common pre-processing: stats, latency, expiry and throttling. Returns (session, early response)."""
+        self.stats[endpoint] = self.stats.get(endpoint, 0) + 1
+        await self._delay()
+        session = self._session(request)
+        if session is None:
+            self.stats["302"] = self.stats.get("302", 0) + 1
+            return None, web.Response(status=302, headers={"Location": "/eams/login.action"})
+        if self._throttled(session, endpoint):
+            self.stats["throttled"] = self.stats.get("throttled", 0) + 1
+            return session, self._html("请不要过快点击")
+        return session, None
+
+    # --- Handlers ---
+
+    async def entry(self, request: web.Request) -> web.Response:
+        session, early = await self._guard(request, "entry")
+        if early is not None:
+            return early
+        links = "".join(f'<a href="stdElectCourse!defaultPage.action?electionProfile.id={pid}">选课轮次 {pid}</a>' for pid in self.options.profiles)
+        return self._html(f"<html><body><h2>学生选课</h2>{links}</body></html>")
+
+    async def default_page(self, request: web.Request) -> web.Response:
+        session, early = await self._guard(request, "defaultPage")
+        if early is not None:
+            return early
+        pid = request.query.get("electionProfile.id", "")
+        if pid not in self.options.profiles:
+            return self._html("操作失败:选课轮次不存在")
+        session.activated.add(pid)
+        # Like EAMS, the page script lists the lessons the student already has
+        elected = "".join(f'electedIds["l{lesson_id}"] = true;\n' for lesson_id in sorted(session.selected) if self.profile_of.get(lesson_id) == pid)
+        return self._html(f"<html><body>选课轮次 {pid}<script>\nvar electedIds = {{}};\n{elected}</script></body></html>")
+
+    async def data(self, request: web.Request) -> web.Response:
+        session, early = await self._guard(request, "data")
+        if early is not None:
+            return early
+        pid = request.query.get("profileId", "")
+        if self.options.require_activation and pid not in session.activated:
+            return self._html("参数错误")
+        body, etag = self.catalog(pid)
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="text/javascript", charset="utf-8", headers={"ETag": etag})
+
+    async def query_std_count(self, request: web.Request) -> web.Response:
+        session, early = await self._guard(request, "queryStdCount")
+        if early is not None:
+            return early
+        session.polls += 1
+        if self.options.poll_context_loss_every:
+            if session.polls % self.options.poll_context_loss_every == 0:
+                session.activated.clear()
+                self.stats["context_lost"] = self.stats.get("context_lost", 0) + 1
+            if not session.activated:
+                self.stats["302"] = self.stats.get("302", 0) + 1
+                return web.Response(status=302, headers={"Location": "/eams/stdElectCourse.action"})
+        return web.Response(text=self.enrollment_payload(), content_type="text/javascript", charset="utf-8")
+
+    def select(self, session: EamsSession, lesson_id: int) -> str:
+        """Outcome message of one election operation."""
+        lesson = self.by_id.get(lesson_id)
+        if lesson is None:
+            return "选课失败:课程不存在或不在本轮次"
+        name = lesson["name"]
+        if lesson_id in session.selected:
+            return f"{name} 你已经选过该课程了"
+        if lesson_id in self.options.conflict_ids:
+            return f"{name} 选课失败:与已选课程时间冲突"
+        slots = self.slots_of(lesson)
+        if slots & session.slots:
+            return f"{name} 选课失败:与已选课程时间冲突"
+        if self.options.credit_limit:
+            pid = self.profile_of.get(lesson_id)
+            taken = sum(self.by_id[i]["credits"] for i in session.selected if self.profile_of.get(i) == pid)
+            if taken + lesson["credits"] > self.options.credit_limit:
+                return f"{name} 选课失败:学分已达上限"
+        counts = self.counts[lesson_id]
+        if counts[0] >= counts[1]:
+            return f"{name} 选课失败:已经达到选课上限"
+        counts[0] += 1
+        session.selected.add(lesson_id)
+        session.slots |= slots
+        return f"{name} 选课成功"
+
+    async def batch_operator(self, request: web.Request) -> web.Response:
+        session, early = await self._guard(request, "batchOperator")
+        if early is not None:
+            return early
+        session.operations += 1
+        if self.options.context_loss_every and session.operations % self.options.context_loss_every == 0:
+            # The server forgot the election context (not the login): 302 until it is activated again
+            session.activated.clear()
+            self.stats["context_lost"] = self.stats.get("context_lost", 0) + 1
+        pid = request.query.get("profileId", "")
+        if self.options.context_loss_every and pid not in session.activated:
+            self.stats["302"] = self.stats.get("302", 0) + 1
+            return web.Response(status=302, headers={"Location": "/eams/stdElectCourse.action"})
+        if self.options.require_activation and pid not in session.activated:
+            return self._html("参数错误")
+        if self.options.closed:
+            return self._html("操作失败:当前选课不开放")
+
+        form = await request.post()
+        messages = []
+        i = 0
+        while f"operator{i}" in form:  # operator<i> = "<lessonId>:<elect true/false>:<0>"
+            lesson_id, _, _ = str(form[f"operator{i}"]).partition(":")
+            try:
+                key = int(lesson_id)
+            except ValueError:
+                key = None
+            if key is None or self.profile_of.get(key) != pid:
+                messages.append("选课失败:课程不存在或不在本轮次")
+            else:
+                messages.append(self.select(session, key))
+            i += 1
+        if not messages:
+            return self._html("参数错误")
+        results = "</br>\n".join(messages)
+        return self._html(f'<table><tr><td><div style="width:85%;text-align:left;margin:auto;">\n{results}</br>\n</div></td></tr></table>')
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    # --- Lifecycle ---
+
+    async def _churn(self):
+        """Other students taking and dropping seats, so enrollment counts move."""
+        ids = list(self.counts)
+        while True:
+            await asyncio.sleep(self.options.churn_interval)
+            for lesson_id in self._rng.sample(ids, min(self.options.churn, len(ids))):
+                counts = self.counts[lesson_id]
+                counts[0] = max(0, min(counts[1], counts[0] + self._rng.choice((-1, 1))))
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(f"{PREFIX}.action", self.entry)
+        app.router.add_get(f"{PREFIX}!defaultPage.action", self.default_page)
+        app.router.add_get(f"{PREFIX}!data.action", self.data)
+        app.router.add_get(f"{PREFIX}!queryStdCount.action", self.query_std_count)
+        app.router.add_post(f"{PREFIX}!batchOperator.action", self.batch_operator)
+        app.router.add_get("/__stats", self.stats_handler)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Serve in the running loop; port 0 picks a free port (see self.base_url)."""
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound = runner.addresses[0]
+        self.port = bound[1]
+        self.base_url = f"http://{bound[0]}:{bound[1]}"
+        if self.options.churn_interval:
+            self._churn_task = asyncio.create_task(self._churn())
+        self._runner = runner
+        return runner
+
+    async def stop(self):
+        if self._churn_task is not None:
+            self._churn_task.cancel()
+        await self._runner.cleanup()
+
+
+def parse_args(argv=None) -> tuple[argparse.Namespace, EmulatorOptions]:
+    parser = argparse.ArgumentParser(description="Local EAMS course selection emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--lessons", type=int, default=2000, help="Number of synthetic lessons")
+    parser.add_argument("--profiles", default="114514", help="Comma-separated profileIds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--session-ttl", type=float, default=0.0, help="Seconds until a session answers 302 (0 = never)")
+    parser.add_argument("--session-idle-ttl", type=float, default=0.0, help="Seconds without a request until a session answers 302 (0 = never)")
+    parser.add_argument("--context-loss-every", type=int, default=0, help="Every Nth batchOperator of a session loses its activation and answers 302 (0 = never)")
+    parser.add_argument("--poll-context-loss-every", type=int, default=0, help="The same for every Nth queryStdCount of a session (0 = never)")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Minimum seconds between requests of a session (0 = off)")
+    parser.add_argument("--throttle-endpoints", default="", help="Comma-separated endpoints the throttle applies to, e.g. batchOperator (default: all)")
+    parser.add_argument("--quota", type=int, default=0, help="Accepted requests per endpoint and session in --quota-window (0 = off)")
+    parser.add_argument("--quota-window", type=float, default=10.0, help="Seconds of the sliding quota window")
+    parser.add_argument("--quota-shared", action="store_true", help="One quota shared by all endpoints")
+    parser.add_argument("--full-ratio", type=float, default=0.1, help="Share of lessons that start full")
+    parser.add_argument("--conflict-ids", default="", help="Comma-separated lesson ids that always conflict")
+    parser.add_argument("--closed", action="store_true", help="Answer batchOperator with 当前选课不开放")
+    parser.add_argument("--no-activation", action="store_true", help="Do not require !defaultPage before data/batchOperator")
+    parser.add_argument("--churn-interval", type=float, default=0.0, help="Seconds between random enrollment changes (0 = off)")
+    parser.add_argument("--churn", type=int, default=20, help="Lessons changed per churn step")
+    parser.add_argument("--credit-limit", type=float, default=0.0, help="Maximum credits selected per profile (0 = no limit)")
+    args = parser.parse_args(argv)
+    options = EmulatorOptions(
+        lessons=args.lessons,
+        profiles=tuple(p.strip() for p in args.profiles.split(",") if p.strip()),
+        seed=args.seed,
+        latency=args.latency,
+        jitter=args.jitter,
+        session_ttl=args.session_ttl,
+        session_idle_ttl=args.session_idle_ttl,
+        context_loss_every=args.context_loss_every,
+        poll_context_loss_every=args.poll_context_loss_every,
+        throttle_interval=args.throttle,
+        throttle_endpoints=tuple(e.strip() for e in args.throttle_endpoints.split(",") if e.strip()),
+        quota=args.quota,
+        quota_window=args.quota_window,
+        quota_shared=args.quota_shared,
+        full_ratio=args.full_ratio,
+        conflict_ids=tuple(i for i in args.conflict_ids.split(",") if i.strip()),
+        closed=args.closed,
+        require_activation=not args.no_activation,
+        churn_interval=args.churn_interval,
+        churn=args.churn,
+        credit_limit=args.credit_limit,
+    )
+    return args, options
+
+
+async def serve(args: argparse.Namespace, options: EmulatorOptions):
+    emulator = EamsEmulator(options)
+    await emulator.start(args.host, args.port)
+    print(f"EAMS emulator listening on {emulator.base_url}")
+    print(f"  export EAMS_BASE_URL={emulator.base_url}")
+    for pid, lessons in emulator.profile_lessons.items():
+        open_ids = [str(lesson["id"]) for lesson in lessons if emulator.counts[lesson["id"]][0] < emulator.counts[lesson["id"]][1]]
+        print(f"  profileId {pid}: {len(lessons)} lessons, e.g. course_ids = {open_ids[:3]}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await emulator.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(*parse_args()))
+    except KeyboardInterrupt:
+        print("\nEmulator stopped.")
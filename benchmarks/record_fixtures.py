@@ -0,0 +1,80 @@
+"""
+Record response fixtures from the local EAMS emulator into benchmarks/fixtures/.
+
+Writes data.action and queryStdCount.action bodies exactly as served, and a corpus
+of batchOperator responses covering every outcome the emulator can produce, each
+labelled with its Outcome and the status attempt_single_course_selection should return.
+Hand-written entries (modelled on messages of the real system) are kept as they are.
+
+Run from the project root:
+    uv run python -m benchmarks.record_fixtures
+"""
+import asyncio
+import json
+from pathlib import Path
+
+import aiohttp
+
+from response_classifier import Outcome
+from benchmarks.eams_server import PREFIX, EamsEmulator, EmulatorOptions
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PROFILE = "114514"
+
+
+async def fetch(session: aiohttp.ClientSession, method: str, url: str, **kwargs) -> tuple[int, str]:
+    async with session.request(method, url, allow_redirects=False, **kwargs) as response:
+        return response.status, await response.text()
+
+
+async def record():
+    emulator = EamsEmulator(EmulatorOptions(lessons=200, profiles=(PROFILE,), full_ratio=0.2, conflict_ids=(100002,)))
+    await emulator.start()
+    base = emulator.base_url + PREFIX
+    corpus = []
+
+    def keep(label: str, outcome: Outcome, status: int, body: str):
+        corpus.append({"label": label, "source": "emulator", "expected": outcome.status, "outcome": outcome.value, "status": status, "body": body})
+
+    async def elect(session, lesson_id, cookies, profile=PROFILE):
+        return await fetch(session, "POST", f"{base}!batchOperator.action", params={"profileId": profile},
+                           data={"optype": "true", "operator0": f"{lesson_id}:true:0"}, cookies=cookies)
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            cookies = {"JSESSIONID": "fixture"}
+            keep("not activated", Outcome.ERROR, *await elect(session, 100000, cookies))
+            await fetch(session, "GET", f"{base}.action", cookies=cookies)
+            await fetch(session, "GET", f"{base}!defaultPage.action", params={"electionProfile.id": PROFILE}, cookies=cookies)
+
+            status, body = await fetch(session, "GET", f"{base}!data.action", params={"profileId": PROFILE}, cookies=cookies)
+            (FIXTURES / "data_action.txt").write_text(body, encoding="utf-8")
+            status, body = await fetch(session, "GET", f"{base}!queryStdCount.action", cookies=cookies)
+            (FIXTURES / "query_std_count.txt").write_text(body, encoding="utf-8")
+
+            open_id = next(i for i, (sc, lc) in emulator.counts.items() if sc < lc and i != 100002)
+            full_id = next(i for i, (sc, lc) in emulator.counts.items() if sc >= lc)
+            keep("selected", Outcome.SUCCESS, *await elect(session, open_id, cookies))
+            keep("already selected", Outcome.ALREADY_SELECTED, *await elect(session, open_id, cookies))
+            keep("full", Outcome.FULL, *await elect(session, full_id, cookies))
+            keep("time conflict", Outcome.FAILED, *await elect(session, 100002, cookies))
+            keep("unknown lesson", Outcome.ERROR, *await elect(session, 999, cookies))
+
+            emulator.options.throttle_interval = 60
+            keep("throttled", Outcome.THROTTLED, *await elect(session, open_id, cookies))
+            emulator.options.throttle_interval = 0
+            emulator.options.closed = True
+            keep("closed", Outcome.NOT_OPEN, *await elect(session, open_id, cookies))
+            emulator.options.closed = False
+            keep("no cookie", Outcome.REDIRECT, *await elect(session, open_id, {}))
+    finally:
+        await emulator.stop()
+
+    path = FIXTURES / "batch_operator_responses.json"
+    hand_written = [entry for entry in json.loads(path.read_text(encoding="utf-8")) if entry["source"] != "emulator"] if path.exists() else []
+    path.write_text(json.dumps(corpus + hand_written, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"Recorded {len(corpus)} batchOperator responses (+{len(hand_written)} hand-written) and 2 payloads into {FIXTURES}")
+
+
+if __name__ == "__main__":
+    asyncio.run(record())
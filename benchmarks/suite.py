@@ -0,0 +1,259 @@
+"""
+Benchmark suite for the client-side hot paths, with machine-readable results.
+
+Covers fix_nonstandard_json, parse_course_json, filter_courses, batchOperator response
+classification, task scheduling and the check_course pass, on synthetic payloads
+at several sizes and on the recorded fixtures in benchmarks/fixtures/. Each case is
+timed over several rounds; results are written as JSON so two runs can be compared.
+
+Run from the project root:
+    uv run python -m benchmarks.suite [--sizes 1000,10000] [--filter NAME] [--json results.json]
+    uv run python -m benchmarks.suite --compare baseline.json [--threshold 1.25]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from check_course import AvailabilityReport
+from course_index import CourseIndex
+from course_parser import fix_nonstandard_json, parse_course_json
+from enrollment_table import EnrollmentTable
+from inquire_course_info import filter_courses, rename_courses
+from main_select_courses import classify_selection_response
+from task_scheduler import TaskScheduler
+from benchmarks.synthetic import make_catalog_payload, make_enrollment_payload
+
+FIXTURES = Path(__file__).parent / "fixtures"
+ROUNDS = 5
+MIN_ROUND_TIME = 0.05  # Seconds; fast cases are repeated until a round takes at least this long
+
+
+class Case:
+    """One benchmark: `run` is timed, `items` is what one call processes (for per-item times)."""
+
+    def __init__(self, name: str, fixture: str, size: int, run, items: int):
+        self.name = name
+        self.fixture = fixture
+        self.size = size
+        self.run = run
+        self.items = items
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.fixture}:{self.size}]"
+
+
+def time_case(case: Case) -> dict:
+    """Best / median seconds per call over ROUNDS rounds of `number` calls each."""
+    number = 1
+    while True:  # Calibrate
+        t0 = time.perf_counter()
+        for _ in range(number):
+            case.run()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_ROUND_TIME or number >= 1 << 20:
+            break
+        number *= 2 if elapsed * 4 > MIN_ROUND_TIME else 10
+
+    rounds = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            case.run()
+        rounds.append((time.perf_counter() - t0) / number)
+    best = min(rounds)
+    return {
+        "name": case.name,
+        "fixture": case.fixture,
+        "size": case.size,
+        "items": case.items,
+        "number": number,
+        "rounds": ROUNDS,
+        "min": best,
+        "median": statistics.median(rounds),
+        "per_item": best / case.items if case.items else best,
+    }
+
+
+def literal_of(payload: str) -> str:
+    """The JS literal inside a data.action / queryStdCount.action body."""
+    start = min(i for i in (payload.find("["), payload.find("{")) if i >= 0)
+    end = max(payload.rfind("]"), payload.rfind("}")) + 1
+    return payload[start:end]
+
+
+def user_configs_for(course_ids: list, users: int = 4, tables: int = 2) -> list[dict]:
+    """USER_CONFIGS spreading course_ids over users x tables, like config.toml."""
+    configs = []
+    for u in range(users):
+        configs.append(
+            {
+                "label": f"User_{u}",
+                "tables": [
+                    {"profileId": str(t), "course_ids": course_ids[(u * tables + t)::users * tables]}
+                    for t in range(tables)
+                ],
+            }
+        )
+    return configs
+
+
+def payload_cases(fixture: str, catalog: str, counts: str) -> list[Case]:
+    catalog_literal = literal_of(catalog)
+    counts_literal = literal_of(counts)
+    size = catalog.count("id:")
+    return [
+        Case("fix_nonstandard_json", fixture, size, lambda: fix_nonstandard_json(catalog_literal), size),
+        Case("parse_course_json.catalog", fixture, size, lambda: parse_course_json(catalog_literal), size),
+        Case("parse_course_json.counts", fixture, size, lambda: parse_course_json(counts_literal), size),
+    ]
+
+
+def catalog_cases(fixture: str, lessons: list, counts: dict) -> list[Case]:
+    courses = rename_courses(lessons)
+    enrollments = EnrollmentTable.from_counts(counts)
+    index = CourseIndex(courses)
+    size = len(courses)
+    queries = ["高等", "teacher=王", "type=专业选修", "id=100123"]
+
+    def linear():
+        for query in queries:
+            filter_courses(courses, query, enrollments)
+
+    def indexed():
+        for query in queries:
+            filter_courses(index, query, enrollments)
+
+    course_ids = [str(course.id) for course in courses[::max(1, size // 200)]]
+    user_configs = user_configs_for(course_ids)
+
+    return [
+        Case("rename_courses", fixture, size, lambda: rename_courses(lessons), size),
+        Case("filter_courses.linear", fixture, size, linear, len(queries)),
+        Case("filter_courses.index", fixture, size, indexed, len(queries)),
+        Case("filter_courses.fuzzy", fixture, size, lambda: filter_courses(index, "~gdsx", enrollments), 1),
+        Case("check_course", fixture, size, lambda: AvailabilityReport(user_configs, enrollments), len(course_ids)),
+    ]
+
+
+def classification_cases() -> list[Case]:
+    corpus = json.loads((FIXTURES / "batch_operator_responses.json").read_text(encoding="utf-8"))
+    responses = [(entry["status"], entry["body"].encode("utf-8")) for entry in corpus]
+    for entry, (status, body) in zip(corpus, responses):  # Results must stay right, not only fast
+        result, _ = classify_selection_response(status, body)
+        assert result == entry["expected"], f"{entry['label']}: {result} != {entry['expected']}"
+
+    def classify():
+        for status, body in responses:
+            classify_selection_response(status, body)
+
+    return [Case("classify_selection_response", "recorded", len(responses), classify, len(responses))]
+
+
+def scheduler_cases(sizes: list[int]) -> list[Case]:
+    """Drain a scheduler of `size` tasks where attempts mostly error, like a busy selection round."""
+    outcomes = ["error"] * 7 + ["failed", "redirect", "success"]
+    cases = []
+    for size in sizes:
+        tasks = [(str(i % 4), str(100000 + i)) for i in range(size)]
+
+        def drain(tasks=tasks):
+            scheduler = TaskScheduler.from_tables([], tasks, request_gap=0.0)
+            attempts = 0
+            while scheduler:
+                batch, _ = scheduler.next_batch()
+                for task_key in batch:
+                    scheduler.finish(task_key, outcomes[attempts % len(outcomes)], False)
+                    attempts += 1
+            return attempts
+
+        cases.append(Case("task_scheduler", "synthetic", size, drain, drain()))
+    return cases
+
+
+def build_cases(sizes: list[int]) -> list[Case]:
+    cases = []
+    for size in sizes:
+        catalog = make_catalog_payload(size)
+        counts = make_enrollment_payload(size)
+        cases += payload_cases("synthetic", catalog, counts)
+        cases += catalog_cases("synthetic", parse_course_json(literal_of(catalog)), parse_course_json(literal_of(counts)))
+
+    catalog = (FIXTURES / "data_action.txt").read_text(encoding="utf-8")
+    counts = (FIXTURES / "query_std_count.txt").read_text(encoding="utf-8")
+    cases += payload_cases("recorded", catalog, counts)
+    cases += catalog_cases("recorded", parse_course_json(literal_of(catalog)), parse_course_json(literal_of(counts)))
+    cases += classification_cases()
+    cases += scheduler_cases([100, 10_000])
+    return cases
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> int:
+    """Print per-case ratios against a previous run; returns the number of regressions."""
+    baseline = {f"{r['name']}[{r['fixture']}:{r['size']}]": r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (regression above {threshold:.2f}x):")
+    for result in results:
+        key = f"{result['name']}[{result['fixture']}:{result['size']}]"
+        old = baseline.get(key)
+        if old is None:
+            continue
+        ratio = result["min"] / old["min"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"  {key:<48} {ratio:>6.2f}x {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client hot-path benchmark suite")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated synthetic catalog sizes")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--json", default="", help="Write results to this file")
+    parser.add_argument("--compare", default="", help="Baseline results file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    cases = [case for case in build_cases(sizes) if args.filter in case.name]
+    results = []
+    print(f"{'case':<48} {'min':>11} {'median':>11} {'per item':>11}")
+    for case in cases:
+        # The parsers print progress messages; keep them (and their cost) out of the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = time_case(case)
+        results.append(result)
+        print(f"{case.key:<48} {result['min'] * 1e3:>9.3f}ms {result['median'] * 1e3:>9.3f}ms {result['per_item'] * 1e6:>9.2f}us")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
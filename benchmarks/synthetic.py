@@ -0,0 +1,78 @@
+"""
+Synthetic EAMS payloads for offline benchmarking.
+Shapes follow what stdElectCourse!data.action / !queryStdCount.action actually return:
+JS object literals with bare keys and single-quoted strings.
+"""
+import random
+
+COURSE_TYPES = ["专业必修", "专业选修", "公共选修", "通识教育", "体育"]
+SURNAMES = "张王李赵刘陈杨黄周吴徐孙马朱胡郭何高林罗"
+GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚"
+SUBJECTS = ["高等数学", "大学物理", "电路原理", "程序设计", "数据结构", "电力系统分析",
+            "自动控制原理", "英语写作", "线性代数", "概率论", "机器学习", "工程制图",
+            "电机学", "热力学", "流体力学", "材料力学", "信号与系统", "通信原理",
+            "操作系统", "计算机网络", "数据库原理", "编译原理", "大学化学", "马克思主义基本原理"]
+QUALIFIERS = ["", "基础", "实验", "导论", "课程设计", "(双语)", "I", "II", "A", "B", "专题", "实践"]
+
+
+def make_lessons(count: int, seed: int = 0) -> list[dict]:
+    """Build `count` lesson dicts with the same keys as the real catalog."""
+    rng = random.Random(seed)
+    lessons = []
+    for i in range(count):
+        lesson_id = 100000 + i
+        subject = rng.choice(SUBJECTS) + rng.choice(QUALIFIERS)
+        start_unit = rng.randrange(1, 12, 2)
+        lessons.append(
+            {
+                "id": lesson_id,
+                "no": f"{rng.randint(1000, 9999)}.{i % 100:02d}",
+                "name": f"{subject}({chr(65 + i % 4)})",
+                "code": f"C{rng.randint(10000, 99999)}",
+                "credits": rng.choice([1, 1.5, 2, 2.5, 3, 4]),
+                "courseTypeName": rng.choice(COURSE_TYPES),
+                "teachers": rng.choice(SURNAMES) + rng.choice(GIVEN) + rng.choice(["", rng.choice(GIVEN)]),
+                "scheduled": True,
+                "withdrawable": rng.random() < 0.9,
+                "remark": rng.choice(["", "限本专业", "周一,1-2节: 理论"]),
+                "arrangeInfo": [
+                    {
+                        "weekDay": rng.randint(1, 7),
+                        "weekState": "0" + "1" * 16 + "0" * 36,
+                        "startUnit": start_unit,
+                        "endUnit": start_unit + 1,
+                        "rooms": f"{rng.choice('ABCDEFG')}{rng.randint(101, 512)}",
+                    }
+                ],
+            }
+        )
+    return lessons
+
+
+def js_literal(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if isinstance(value, list):
+        return "[" + ",".join(js_literal(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}:{js_literal(v)}" for k, v in value.items()) + "}"
+    return "null"
+
+
+def make_catalog_payload(count: int, seed: int = 0) -> str:
+    """Full data.action response body for `count` lessons."""
+    return "var lessonJSONs = " + js_literal(make_lessons(count, seed)) + ";\n"
+
+
+def make_enrollment_payload(count: int, seed: int = 0) -> str:
+    """Full queryStdCount.action response body for lesson ids 100000.. (same as make_lessons)."""
+    rng = random.Random(seed + 1)
+    entries = []
+    for i in range(count):
+        lc = rng.choice([30, 60, 90, 120])
+        entries.append(f"'{100000 + i}':{{sc:{rng.randint(0, lc)},lc:{lc}}}")
+    return "window.lessonId2Counts={" + ",".join(entries) + "}"
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from catalog_store import CatalogView, write_catalog
+from config import catalog_cache_dir, catalog_cache_ttl, server_tag
+
+
+class CatalogCacheEntry:
+    """
+    One cached stdElectCourse!data.action result for a (semesterId, profileId) pair,
+    plus the HTTP validators needed to revalidate it with a conditional request.
+    """
+
+    def __init__(self, semester_id: str, profile_id: str, courses: list,
+                 fetched_at: float, etag: str | None = None, last_modified: str | None = None):
+        self.semester_id = str(semester_id)
+        self.profile_id = str(profile_id)
+        self.courses = courses
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl: float = catalog_cache_ttl) -> bool:
+        return self.age < ttl
+
+    def conditional_headers(self) -> dict:
+        """If-None-Match / If-Modified-Since, when the server gave us validators."""
+        cond = {}
+        if self.etag:
+            cond["If-None-Match"] = self.etag
+        if self.last_modified:
+            cond["If-Modified-Since"] = self.last_modified
+        return cond
+
+    def to_dict(self) -> dict:
+        return {
+            "semesterId": self.semester_id,
+            "profileId": self.profile_id,
+            "fetched_at": self.fetched_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "courses": self.courses,
+        }
+
+
+def cache_path(semester_id: str, profile_id: str, suffix: str = ".json") -> Path:
+    """Per server too: catalogs fetched from an emulator are never used for the real server."""
+    return Path(catalog_cache_dir) / f"catalog_{semester_id or 'unknown'}_{profile_id}_{server_tag}{suffix}"
+
+
+def open_catalog_view(semester_id: str, profile_id: str) -> CatalogView | None:
+    """Memory-map the binary copy of a cached catalog, or None if there is none."""
+    path = cache_path(semester_id, profile_id, ".bin")
+    try:
+        return CatalogView(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[Cache] Ignoring unreadable cache file {path}: {e}")
+        return None
+
+
+def load_catalog_cache(semester_id: str, profile_id: str) -> CatalogCacheEntry | None:
+    """Return the cached catalog, or None if missing or unreadable (stale entries are returned too)."""
+    path = cache_path(semester_id, profile_id)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        return CatalogCacheEntry(
+            semester_id=raw["semesterId"],
+            profile_id=raw["profileId"],
+            courses=raw["courses"],
+            fetched_at=float(raw["fetched_at"]),
+            etag=raw.get("etag"),
+            last_modified=raw.get("last_modified"),
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[Cache] Ignoring unreadable cache file {path}: {e}")
+        return None
+
+
+def save_catalog_cache(entry: CatalogCacheEntry) -> bool:
+    """
+    Write atomically (temp file + rename) so an interrupted run never leaves half a file.
+    The JSON file keeps the raw lessons and validators; a columnar .bin copy of the
+    --inquire fields is written next to it for instant loading (see catalog_store).
+    """
+    path = cache_path(entry.semester_id, entry.profile_id)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[Cache] Failed to write {path}: {e}")
+        return False
+    binary_path = cache_path(entry.semester_id, entry.profile_id, ".bin")
+    if not write_catalog(binary_path, entry.courses, entry.fetched_at):
+        binary_path.unlink(missing_ok=True)  # Never leave a binary copy older than the JSON
+    return True
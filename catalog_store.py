@@ -0,0 +1,263 @@
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# Raw data.action keys -> field names used by --inquire
+COURSE_KEY_MAPPING = {
+    "id": "id",
+    "no": "no",
+    "name": "name",
+    "credits": "credits",
+    "courseTypeName": "type",
+    "teachers": "teacher",
+}
+
+# File layout (native byte order, recorded in the header):
+#   header   magic, version, byte order, lesson count, string count, fetched_at
+#   id       int64   x count
+#   credits  float64 x count (NaN == missing)
+#   no, name, type, teacher  uint32 x count each, indexes into the string table
+#   string table: uint32 offsets x (strings + 1), then the UTF-8 blob
+_MAGIC = b"SCAT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIId")
+_BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+_STRING_FIELDS = ("no", "name", "type", "teacher")
+_RAW_KEYS = {new: old for old, new in COURSE_KEY_MAPPING.items()}
+
+
+def write_catalog(path: Path, courses: list, fetched_at: float | None = None) -> bool:
+    """
+    Write raw data.action lessons as a columnar catalog file.
+    Returns False (and writes nothing) if a lesson does not fit the fixed columns,
+    e.g. a non-integer id; callers then keep using the JSON representation.
+    """
+    ids = array("q")
+    credits = array("d")
+    columns = {field: array("I") for field in _STRING_FIELDS}
+    strings: dict[str, int] = {}  # Deduplicated: types and teachers repeat a lot
+
+    try:
+        for course in courses:
+            ids.append(int(course["id"]))
+            value = course.get("credits", "")
+            credits.append(math.nan if value == "" else float(value))
+            for field in _STRING_FIELDS:
+                text = course.get(_RAW_KEYS[field], "")
+                if not isinstance(text, str):
+                    return False
+                index = strings.get(text)
+                if index is None:
+                    index = strings[text] = len(strings)
+                columns[field].append(index)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return False
+
+    offsets = array("I", [0])
+    blob = bytearray()
+    for text in strings:  # Insertion order == index order
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+
+    header = _HEADER.pack(_MAGIC, _VERSION, _BYTE_ORDER, len(ids), len(strings),
+                          time.time() if fetched_at is None else fetched_at)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            ids.tofile(f)
+            credits.tofile(f)
+            for field in _STRING_FIELDS:
+                columns[field].tofile(f)
+            offsets.tofile(f)
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[Cache] Failed to write {path}: {e}")
+        return False
+    return True
+
+
+class CatalogView:
+    """
+    Read-only, memory-mapped view of a catalog file.
+    Opening maps the file and slices the columns without reading them, so it takes
+    constant time whatever the catalog size; strings are decoded on first access.
+    Rows are exposed as CatalogRecord objects with the renamed --inquire fields.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, byte_order, count, string_count, fetched_at = _HEADER.unpack_from(self._mm)
+            if magic != _MAGIC or version != _VERSION or byte_order != _BYTE_ORDER:
+                raise ValueError(f"unsupported catalog file {self.path}")
+            buf = memoryview(self._mm)
+            offset = _HEADER.size
+
+            def take(typecode: str, items: int) -> memoryview:
+                nonlocal offset
+                size = items * struct.calcsize(typecode)
+                view = buf[offset:offset + size].cast(typecode)
+                offset += size
+                return view
+
+            self._ids = take("q", count)
+            self._credits = take("d", count)
+            self._columns = {field: take("I", count) for field in _STRING_FIELDS}
+            self._offsets = take("I", string_count + 1)
+            self._blob = buf[offset:]
+        except Exception:
+            self.close()
+            raise
+        self.count = count
+        self.fetched_at = fetched_at
+        self._strings: dict[int, str] = {}
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.age < ttl
+
+    def value(self, row: int, field: str):
+        if field == "id":
+            return self._ids[row]
+        if field == "credits":
+            credits = self._credits[row]
+            if math.isnan(credits):
+                return ""
+            return int(credits) if credits.is_integer() else credits
+        index = self._columns[field][row]
+        text = self._strings.get(index)
+        if text is None:
+            text = self._strings[index] = bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+        return text
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row: int) -> "CatalogRecord":
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return CatalogRecord(self, row)
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield CatalogRecord(self, row)
+
+    def close(self):
+        """Release the mapping (needed before the file can be replaced on Windows)."""
+        for name in ("_ids", "_credits", "_offsets", "_blob"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        for view in getattr(self, "_columns", {}).values():
+            view.release()
+        self._mm.close()
+
+
+class CatalogRecord:
+    """One lesson row of a CatalogView; behaves like the renamed dict (read-only)."""
+
+    __slots__ = ("_view", "_row")
+
+    def __init__(self, view: CatalogView, row: int):
+        self._view = view
+        self._row = row
+
+    def __getitem__(self, key: str):
+        if key not in COURSE_KEY_MAPPING.values():
+            raise KeyError(key)
+        return self._view.value(self._row, key)
+
+    def get(self, key: str, default=None):
+        if key not in COURSE_KEY_MAPPING.values():
+            return default
+        return self._view.value(self._row, key)
+
+    def keys(self):
+        return COURSE_KEY_MAPPING.values()
+
+    def to_dict(self) -> dict:
+        return {key: self._view.value(self._row, key) for key in COURSE_KEY_MAPPING.values()}
+
+
+class Course:
+    """
+    One lesson with the renamed --inquire fields, held in slots instead of a dict.
+    Read like the renamed dict (get / [] / keys / to_dict), like CatalogRecord.
+    """
+
+    __slots__ = ("id", "no", "name", "credits", "type", "teacher")
+
+    def __init__(self, id, no="", name="", credits="", type="", teacher=""):
+        self.id = id
+        self.no = no
+        self.name = name
+        self.credits = credits
+        self.type = type
+        self.teacher = teacher
+
+    @classmethod
+    def from_lesson(cls, lesson: dict) -> "Course":
+        """Build from a raw data.action lesson; repeated type/teacher strings are shared."""
+        course_type = lesson.get("courseTypeName", "")
+        teacher = lesson.get("teachers", "")
+        return cls(
+            lesson.get("id", ""),
+            lesson.get("no", ""),
+            lesson.get("name", ""),
+            lesson.get("credits", ""),
+            sys.intern(course_type) if isinstance(course_type, str) else course_type,
+            sys.intern(teacher) if isinstance(teacher, str) else teacher,
+        )
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Course):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Course({self.id!r}, {self.name!r})"
+
+
+class MergedCatalog:
+    """Several per-profile catalogs (views or lists of Course) iterated as one."""
+
+    def __init__(self, sources: list):
+        self.sources = sources
+
+    def __len__(self) -> int:
+        return sum(len(source) for source in self.sources)
+
+    def __iter__(self):
+        for source in self.sources:
+            yield from source
@@ -1,30 +1,116 @@
-import asyncio
+import operator
+from array import array
+from itertools import compress
+
 import aiohttp
-from tqdm.asyncio import tqdm
 
 from inquire_course_info import get_enrollment_data
+from enrollment_table import UNKNOWN, EnrollmentTable
 from config_loader import USER_CONFIGS, INQUIRY_USER_DATA
 from utils import build_connector
 
-
-class CourseStatus:
-    def __init__(self, label: str, id: str, success: bool):
-        self.label = label
-        self.id = id
-        self.success = success
-
-
-async def check(label: str, id: str, enrollments: dict):
-    sc = enrollments.get(id, {}).get("sc")
-    lc = enrollments.get(id, {}).get("lc")
-    if sc is None or lc is None:
-        return CourseStatus(label, id, False)
-    try:
-        # API may return numbers as strings, explicitly convert to int before comparison
-        has_slot = int(sc) < int(lc)
-    except (TypeError, ValueError):
-        return CourseStatus(label, id, False)
-    return CourseStatus(label, id, has_slot)
+# Availability of a configured course
+AVAILABLE, FULL, UNKNOWN_ID, NO_COUNTS = range(4)
+STATE_NAMES = ("Available", "Full", "Unknown ID", "No counts")
+
+
+def availability_columns(enrollments: EnrollmentTable) -> tuple[bytes, array]:
+    """
+    State and remaining seats of every table row, plus one extra row (the last) that
+    stands for lessons the table does not list. Computed once per check, whatever the
+    number of users and course IDs joined against it.
+    """
+    remaining = array("i", map(operator.sub, enrollments.lc, enrollments.sc))
+    states = bytearray(len(enrollments))
+    for row, (sc, lc) in enumerate(zip(enrollments.sc, enrollments.lc)):
+        if sc == UNKNOWN or lc == UNKNOWN:
+            states[row] = NO_COUNTS
+            remaining[row] = 0
+        elif remaining[row] <= 0:
+            states[row] = FULL
+            remaining[row] = 0
+    states.append(UNKNOWN_ID)
+    remaining.append(0)
+    return bytes(states), remaining
+
+
+class AvailabilityReport:
+    """
+    Availability of every configured (user, profileId, course_id), as columns in config
+    order; entries of one user table are contiguous and described by `groups`.
+    """
+
+    def __init__(self, user_configs: list, enrollments: EnrollmentTable):
+        self.groups: list[tuple[str, str, int, int]] = []  # (label, profileId, start, end)
+        self.course_ids: list = []
+        for user_config in user_configs:
+            user_label = user_config.get("label", "Unknown_User")
+            for user_table in user_config.get("tables", []):
+                course_ids = user_table.get("course_ids", [])
+                if course_ids:
+                    start = len(self.course_ids)
+                    self.course_ids += course_ids
+                    self.groups.append((user_label, user_table.get("profileId", "?"), start, len(self.course_ids)))
+
+        # Join: one row lookup per configured ID, then gathers from the per-row columns
+        row_states, row_remaining = availability_columns(enrollments)
+        rows = enrollments.rows(self.course_ids, missing=len(enrollments))
+        self.rows = rows
+        self.states = bytes(map(row_states.__getitem__, rows))
+        self.remaining = array("i", map(row_remaining.__getitem__, rows))
+        self._enrollments = enrollments
+
+    def __len__(self) -> int:
+        return len(self.course_ids)
+
+    def count(self, state: int, start: int = 0, end: int | None = None) -> int:
+        return self.states.count(state, start, len(self.states) if end is None else end)
+
+    def seats(self, start: int = 0, end: int | None = None) -> int:
+        """Remaining seats summed over the available entries."""
+        return sum(self.remaining[start:end])
+
+    def counts(self, i: int) -> tuple[int, int] | None:
+        """(sc, lc) behind entry i; None for unknown IDs."""
+        row = self.rows[i]
+        if row >= len(self._enrollments):
+            return None
+        return self._enrollments.sc[row], self._enrollments.lc[row]
+
+    def unavailable(self):
+        """(label, profileId, entry index, state) of every entry that is not available."""
+        for label, profileId, start, end in self.groups:
+            positions = range(start, end)
+            for i in compress(positions, map(AVAILABLE.__ne__, self.states[start:end])):
+                yield label, profileId, i, self.states[i]
+
+
+def print_report(report: AvailabilityReport):
+    available = report.count(AVAILABLE)
+    print("\n--- Courses Checking Summary ---")
+    print(f"Total checked: {len(report)}")
+    print(f"available courses: {available}")
+    print(f"Unavailable courses: {len(report) - available}")
+
+    label_width = max([len("User")] + [len(label) for label, *_ in report.groups])
+    profile_width = max([len("Profile")] + [len(str(profileId)) for _, profileId, *_ in report.groups])
+    print("\n--- Availability by User / Profile ---")
+    print(f"{'User':<{label_width}}  {'Profile':<{profile_width}}  {'Courses':>7}  {'Available':>9}  {'Full':>5}  {'Unknown':>7}  {'Seats left':>10}")
+    for label, profileId, start, end in report.groups:
+        unknown = report.count(UNKNOWN_ID, start, end) + report.count(NO_COUNTS, start, end)
+        print(
+            f"{label:<{label_width}}  {str(profileId):<{profile_width}}  {end - start:>7}  "
+            f"{report.count(AVAILABLE, start, end):>9}  {report.count(FULL, start, end):>5}  {unknown:>7}  {report.seats(start, end):>10}"
+        )
+
+    if available < len(report):
+        print("\n--- Unavailable Courses Details ---")
+        for label, profileId, i, state in report.unavailable():
+            counts = report.counts(i)
+            detail = f" ({counts[0]}/{counts[1]})" if state == FULL and counts else ""
+            print(f"[{STATE_NAMES[state]}] User: {label} ({profileId}) Course: {report.course_ids[i]}{detail}")
+
+    print()
 
 
 async def check_course():
@@ -37,47 +123,11 @@ async def check_course():
             print("Could not fetch enrollment data. Exiting inquiry.")
             return
 
-        all_check_tasks = []
-        print("Collecting courses' id...")
-
-        for user_config in USER_CONFIGS:
-            user_label = user_config.get("label", "Unknown_User")
-            user_tables = user_config.get("tables", [])
-            for user_table in user_tables:
-                user_course_ids = user_table.get("course_ids", [])
-                for course_id in user_course_ids:
-                    all_check_tasks.append(
-                        check(
-                            label=user_label,
-                            id=course_id,
-                            enrollments=enrollments,
-                        )
-                    )
-
-        if not all_check_tasks:
-            print("Cannot find any course to check.")
-            return
-
-        print(f"Starting checking of all {len(all_check_tasks)} courses...\n")
-        results: list[CourseStatus] = await tqdm.gather(*all_check_tasks, desc="Overall Courses Checking Progress")
-
-        print("\nAll courses checking tasks have been processed.")
-        await asyncio.sleep(0.1)
-
-        invalid_results: list[CourseStatus] = []
-
-        for result in results:
-            if not result.success:
-                invalid_results.append(result)
-
-        print("\n--- Courses Checking Summary ---")
-        print(f"Total checked: {len(results)}")
-        print(f"available courses: {len(results) - len(invalid_results)}")
-        print(f"Unavailable courses: {len(invalid_results)}")
-
-        if invalid_results:
-            print("\n--- Unavailable Courses Details ---")
-            for peer in invalid_results:
-                print(f"[Unavailable] User: {peer.label} Course: {peer.id}")
+    print("Collecting courses' id...")
+    report = AvailabilityReport(USER_CONFIGS, enrollments)
+    if not len(report):
+        print("Cannot find any course to check.")
+        return
 
-        print()
+    print(f"Checked all {len(report)} courses of {len(report.groups)} table(s) against {len(enrollments)} lessons.")
+    print_report(report)
@@ -1,4 +1,13 @@
-url = "https://jw.shiep.edu.cn/eams/stdElectCourse!batchOperator.action"
+import hashlib
+import os
+
+# Every EAMS request is built from this; set EAMS_BASE_URL to run against a local emulator (benchmarks/eams_server.py)
+base_url = os.environ.get("EAMS_BASE_URL", "https://jw.shiep.edu.cn").rstrip("/")
+eams_url = f"{base_url}/eams/stdElectCourse"
+# Part of every on-disk state file name (catalog cache, selection journal): emulator runs never share them with real ones
+server_tag = hashlib.sha256(eams_url.encode("utf-8")).hexdigest()[:8]
+
+url = f"{eams_url}!batchOperator.action"
 
 headers = {
     "Accept": "text/html, */*; q=0.01",
@@ -6,8 +15,8 @@ headers = {
     "Connection": "keep-alive",
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
     "Cache-Control": "no-cache",
-    "Origin": "https://jw.shiep.edu.cn",
-    "Referer": "https://jw.shiep.edu.cn/eams/stdElectCourse!defaultPage.action",
+    "Origin": base_url,
+    "Referer": f"{eams_url}!defaultPage.action",
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0",
     "X-Requested-With": "XMLHttpRequest",
 }
@@ -17,6 +26,83 @@ data = {
     "operator0": "???:true:0",
 }
 
-failed_words = ["上限", "已满", "已达", "已经达到", "冲突"]
+# Requests of each account (cookie set) go through a token bucket shared by every request path (one per
+# endpoint if the limit model below measured independent limits). Its rate backs off multiplicatively on throttling ("过快", 429/503) and recovers additively.
+governor_rate = 5.0  # Requests per second to start with
+governor_burst = 1  # Requests that may go out back to back
+governor_rate_min = 0.5
+governor_rate_max = 5.0  # Never faster than the start rate; raising it (opt-in) lets an account ramp up while unthrottled
+governor_increase = 0.5  # Requests/s gained per second of accepted requests
+governor_decrease = 0.5  # Rate multiplier on a throttled response
+# Budget measured by analyze_limits.py (.cache/limit_model.json): when present, governors start within it,
+# per endpoint or one per account if the server shares one pool, burst and rate together never above this share of a measured quota
+limit_model_margin = 0.8
+
+# Pending courses of one profileId packed into one batchOperator request (operator0..operatorN-1).
+# 1 (default) sends one course per request, as the web page does. Larger values are opt-in: fewer round
+# trips, but requests unlike the page's; responses that cannot be split per course fall back to 1.
+batch_operator_size = 1
+
+# Before selecting, skip courses the catalog shows cannot succeed (already selected, time conflict with a
+# selected course, over the table's max_credits in config.toml) and flag clashes between configured courses
+prevalidate_courses = True
+
+# --plan: weight of the wishlist entry at rank r is planner_rank_decay ** r. Close to 0 keeps the top-ranked
+# courses whatever it costs; 1 maximizes the number of planned courses
+planner_rank_decay = 0.8
+
+# batchOperator response markers, matched in one pass by response_classifier.py.
+# Precedence: already selected > full > failed > not open > throttled > error; no marker at all means success.
+already_selected_words = ["已经选过"]
+
+# No seat left: --watch keeps waiting for one, unlike the other failures
+full_words = ["已满", "已经达到选课上限"]
+
+failed_words = ["上限", "已达", "已经达到", "冲突"]
+
+not_open_words = ["当前选课不开放"]
+
+throttle_words = ["过快"]
 
 error_words = ["失败", "错误", "fail", "error", "503", "过快点击"]
+
+# Sessions (cookie sets) that passed the entry page / a profile's defaultPage within this many seconds, in any
+# command, are not warmed up again (.cache/activation.json; cookies are stored hashed). 0 = always activate.
+activation_cache_ttl = 5 * 60
+
+# A 302 during selection re-runs the activation (entry + defaultPage) once for the session, then the queue resumes.
+# A warm-up failing without a redirect is retried this many times with backoff; the session is given up when the
+# entry page redirects (expired cookies) or after this many re-activations in a row whose requests were redirected again.
+session_recovery_attempts = 3  # 0 = never re-activate
+
+# --start / --watch: how long each USER_CONFIGS session lasted is kept in .cache/session_lifetimes_<server_tag>.json, and a warning
+# is printed session_expiry_warning seconds before the median of the recent lifetimes runs out. With session_keepalive,
+# a session without a request for session_keepalive_interval seconds is pinged with the entry page.
+session_keepalive = False
+session_keepalive_interval = 5 * 60
+session_expiry_warning = 10 * 60
+
+# --start / --watch: measure how late the event loop wakes up every loop_lag_interval seconds (what blocking
+# parses or disk writes cost the selection coroutines) and print max / p99 / mean lag when the run ends.
+loop_lag_monitor = False
+loop_lag_interval = 0.05
+
+# On-disk cache of stdElectCourse!data.action per (semesterId, profileId), used by --inquire
+catalog_cache_dir = ".cache"
+catalog_cache_ttl = 30 * 60  # Seconds a cached catalog is used without asking the server
+
+# --start --watch: seconds between queryStdCount.action polls; selection requests go out only for free seats
+watch_interval = 3.0  # Until churn has been observed; then adapted per profile within the bounds below
+watch_interval_min = 1.0
+watch_interval_max = 60.0
+watch_churn_half_life = 10 * 60  # Seconds after which an observed change counts half
+watch_burst_window = 30  # Seconds polled at watch_interval_min after a watched course changed
+
+# --start: every selection outcome is appended to .cache/selection_<semesterId>_<server_tag>.jsonl; a restarted run skips
+# the courses an earlier run selected (or cancelled as an alternative). --journal prints a summary.
+selection_journal = True
+selection_journal_sync = 16  # Records per fsync; each record reaches the OS as soon as it is written
+
+# Enrollment snapshots recorded by --watch (appended to .cache/enrollment_<semesterId>_<server_tag>.hist); kept in memory,
+# and the file is rewritten with only these once it holds twice as many
+enrollment_history_keep = 100
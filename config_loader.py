@@ -121,6 +121,64 @@ def add_course_to_config(label: str, profile_id: str, course_id: str) -> bool:
         return False
 
 
+def set_course_ids(label: str, profile_id: str, course_ids: list, wishlist: list | None = None) -> bool:
+    """
+    Replace the course_ids of a user's table in config.toml.
+
+    Args:
+        label: User label (label in USER_CONFIGS)
+        profile_id: Course table ID (profileId in tables)
+        course_ids: New course ID list, in selection order
+        wishlist: Stored as the table's wishlist if it has none yet, so the full ranked list is kept
+
+    Returns:
+        True if written successfully, False if failed (not found or write error)
+    """
+    try:
+        import tomli_w
+    except ImportError:
+        print("Error: tomli_w not installed. Run: uv sync")
+        return False
+
+    config_path = Path("config.toml")
+    if not config_path.exists():
+        print("Error: config.toml not found.")
+        return False
+
+    try:
+        with open(config_path, "rb") as f:
+            config_data = tomllib.load(f)
+    except Exception as e:
+        print(f"Error reading config.toml: {e}")
+        return False
+
+    target_table = None
+    for user in config_data.get("USER_CONFIGS", []):
+        if user.get("label") == label:
+            for table in user.get("tables", []):
+                if str(table.get("profileId")) == str(profile_id):
+                    target_table = table
+                    break
+            break
+
+    if target_table is None:
+        print(f"Error: Table with profileId '{profile_id}' not found for user '{label}'")
+        return False
+
+    if wishlist is not None and "wishlist" not in target_table:
+        target_table["wishlist"] = list(wishlist)
+    target_table["course_ids"] = list(course_ids)
+
+    try:
+        with open(config_path, "wb") as f:
+            tomli_w.dump(config_data, f)
+        print(f"✓ Successfully wrote {len(course_ids)} course(s) to user '{label}', table '{profile_id}'")
+        return True
+    except Exception as e:
+        print(f"Error writing config.toml: {e}")
+        return False
+
+
 def list_user_configs() -> list[dict]:
     """
     List all users and their tables in USER_CONFIGS for interactive selection.
@@ -0,0 +1,244 @@
+import heapq
+from array import array
+from collections import defaultdict
+
+try:
+    from pypinyin import Style, lazy_pinyin  # Optional (extra "pinyin"): pinyin / initials search
+except ImportError:
+    lazy_pinyin = None
+
+# Fields indexed up front; any other key=value field is indexed on its first query
+INDEXED_FIELDS = ("name", "teacher", "type", "no", "id", "credits")
+GRAM_SIZES = (2, 3)
+FUZZY_LIMIT = 20  # Results returned by a ranked fuzzy query
+
+# Match kinds, best first; ties are broken by edit distance, then display order
+EXACT, INITIALS, PINYIN, EDIT = range(4)
+
+
+def parse_query(keyword: str) -> tuple[str, str, bool]:
+    """
+    Split a search keyword into (field, lowercase value, fuzzy).
+    "value" searches name, "key=value" a field by substring,
+    "key~value" / "~value" a field by pinyin and typo-tolerant ranked matching.
+    """
+    for i, c in enumerate(keyword):
+        if c == "=" or c == "~":
+            key = keyword[:i].strip().lower() or "name"
+            return key, keyword[i + 1:].strip().lower(), c == "~"
+    return "name", keyword.lower(), False
+
+
+def fuzzy_query(keyword: str) -> str:
+    """The ranked fuzzy form of a keyword ("key=value" -> "key~value")."""
+    key, value, _ = parse_query(keyword)
+    return f"{key}~{value}"
+
+
+def sort_key(course) -> tuple:
+    """Display order of search results: type, credits (high first), id."""
+    credits = course.get("credits", "")
+    return (str(course.get("type", "")), -credits if isinstance(credits, (int, float)) else 0, course.get("id", 0))
+
+
+def max_edits(length: int) -> int:
+    """Typos tolerated for a query of `length` characters."""
+    if length >= 8:
+        return 2
+    if length >= 4:
+        return 1
+    return 0
+
+
+def substring_distance(pattern: str, text: str, bound: int) -> int:
+    """
+    Smallest edit distance between `pattern` and any substring of `text`
+    (Sellers' algorithm), or bound + 1 if it exceeds `bound`.
+    Each column is computed only down to the last pattern prefix still within
+    `bound` plus one (Ukkonen's cutoff); the cells below count as bound + 1.
+    """
+    m = len(pattern)
+    too_far = bound + 1
+    previous = list(range(m + 1))
+    last = min(bound, m)  # Deepest row of `previous` within bound
+    best = previous[m]
+    for c in text:
+        current = [0] + [too_far] * m  # A match may start anywhere in text
+        top = min(last + 1, m)
+        for j in range(1, top + 1):
+            cost = previous[j - 1] + (pattern[j - 1] != c)
+            current[j] = min(cost, previous[j] + 1, current[j - 1] + 1)
+        last = top
+        while current[last] > bound:
+            last -= 1
+        if last == m:
+            best = min(best, current[m])
+        previous = current
+    return best if best <= bound else too_far
+
+
+def to_pinyin(text: str) -> tuple[str, str]:
+    """(full pinyin, initials) of a field value; non-Chinese runs are kept as they are."""
+    full = "".join(lazy_pinyin(text))
+    initials = "".join(lazy_pinyin(text, style=Style.FIRST_LETTER))
+    return full.lower(), initials.lower()
+
+
+class _FieldIndex:
+    """Pre-lowered values of one field plus 2-/3-gram posting lists over them."""
+
+    __slots__ = ("values", "grams")
+
+    def __init__(self, values: list[str]):
+        self.values = values
+        self.grams: dict[str, array] = {}
+        for row, text in enumerate(values):
+            seen = set()
+            for size in GRAM_SIZES:
+                for i in range(len(text) - size + 1):
+                    seen.add(text[i:i + size])
+            for gram in seen:
+                postings = self.grams.get(gram)
+                if postings is None:
+                    postings = self.grams[gram] = array("I")
+                postings.append(row)
+
+    def search(self, value: str) -> list[int]:
+        """Rows whose value contains `value` as a substring, in row order."""
+        values = self.values
+        if not value:
+            return list(range(len(values)))
+        if len(value) < GRAM_SIZES[0]:  # Single character: a scan over pre-lowered strings is cheap
+            return [row for row, text in enumerate(values) if value in text]
+
+        # Every n-gram of the query must appear in a match: verify the rarest one's rows only
+        size = min(len(value), GRAM_SIZES[-1])
+        candidates = None
+        for i in range(len(value) - size + 1):
+            postings = self.grams.get(value[i:i + size])
+            if postings is None:
+                return []
+            if candidates is None or len(postings) < len(candidates):
+                candidates = postings
+        if len(value) == size:  # The query is itself an indexed gram: no verification needed
+            return list(candidates)
+        return [row for row in candidates if value in values[row]]
+
+    def approximate(self, value: str, edits: int) -> dict[int, int]:
+        """
+        Rows containing `value` with at most `edits` typos, as {row: distance}.
+        Candidates come from the bigram postings (q-gram lemma: each edit destroys at
+        most two of the query's bigrams), so only rows sharing enough bigrams are checked.
+        """
+        grams = {value[i:i + 2] for i in range(len(value) - 1)}
+        needed = len(grams) - 2 * edits
+        if needed < 1:
+            return {}
+        shared = defaultdict(int)
+        for gram in grams:
+            for row in self.grams.get(gram, ()):
+                shared[row] += 1
+
+        found = {}
+        distances = {}  # Values repeat across sections: compute each once
+        for row, count in shared.items():
+            if count < needed:
+                continue
+            text = self.values[row]
+            distance = distances.get(text)
+            if distance is None:
+                distance = distances[text] = substring_distance(value, text, edits)
+            if distance <= edits:
+                found[row] = distance
+        return found
+
+
+class CourseIndex:
+    """
+    Search index over the --inquire catalog, built once after fetching.
+    Answers the same substring queries as a linear filter_courses scan
+    ("keyword" searches name, "key=value" any field), already in display order,
+    plus ranked "key~value" queries matching pinyin, initials and typos.
+    """
+
+    def __init__(self, courses, fields: tuple = INDEXED_FIELDS):
+        self.courses = list(courses)
+        self._fields: dict[str, _FieldIndex] = {}
+        for field in fields:
+            self.field(field)
+        # Rank of each row in display order, so results sort by a plain int
+        order = sorted(range(len(self.courses)), key=lambda row: sort_key(self.courses[row]))
+        self._rank = array("I", bytes(4 * len(order)))
+        for rank, row in enumerate(order):
+            self._rank[row] = rank
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def field(self, name: str) -> _FieldIndex:
+        index = self._fields.get(name)
+        if index is None:
+            values = [str(course.get(name, "")).lower() for course in self.courses]
+            index = self._fields[name] = _FieldIndex(values)
+        return index
+
+    def pinyin_fields(self, name: str) -> tuple[_FieldIndex, _FieldIndex] | None:
+        """(full pinyin, initials) indexes of a field, built on first use; None without pypinyin."""
+        if lazy_pinyin is None:
+            return None
+        full_key, initials_key = f"{name}#pinyin", f"{name}#initials"
+        if full_key not in self._fields:
+            converted = {}
+            full, initials = [], []
+            for text in self.field(name).values:
+                pair = converted.get(text)
+                if pair is None:
+                    pair = converted[text] = to_pinyin(text)
+                full.append(pair[0])
+                initials.append(pair[1])
+            self._fields[full_key] = _FieldIndex(full)
+            self._fields[initials_key] = _FieldIndex(initials)
+        return self._fields[full_key], self._fields[initials_key]
+
+    def search(self, keyword: str) -> list:
+        """Matching courses for a keyword / key=value / key~value query, sorted for display."""
+        key, value, fuzzy = parse_query(keyword)
+        if fuzzy:
+            return [self.courses[row] for row in self.search_fuzzy(key, value)]
+        rows = self.field(key).search(value)
+        rows.sort(key=self._rank.__getitem__)
+        return [self.courses[row] for row in rows]
+
+    def search_fuzzy(self, key: str, value: str, limit: int = FUZZY_LIMIT) -> list[int]:
+        """
+        Top `limit` rows for a fuzzy query, best first. Exact substring matches rank
+        above pinyin-initial matches, then full-pinyin matches, then typo matches
+        (fewer edits first); display order breaks ties.
+        """
+        scores: dict[int, tuple[int, int]] = {}
+
+        def offer(rows, kind: int, distance: int = 0):
+            for row in rows:
+                score = (kind, distance)
+                if score < scores.get(row, (EDIT + 1, 0)):
+                    scores[row] = score
+
+        field = self.field(key)
+        offer(field.search(value), EXACT)
+        edits = max_edits(len(value))
+        if edits:
+            for row, distance in field.approximate(value, edits).items():
+                offer((row,), EDIT, distance)
+
+        pinyin = self.pinyin_fields(key) if value.isascii() else None
+        if pinyin is not None and value:
+            full, initials = pinyin
+            compact = value.replace(" ", "")
+            offer(initials.search(compact), INITIALS)
+            offer(full.search(compact), PINYIN)
+            if edits:
+                for row, distance in full.approximate(compact, edits).items():
+                    offer((row,), EDIT, distance)
+
+        rank = self._rank
+        return heapq.nsmallest(limit, scores, key=lambda row: (scores[row], rank[row]))
@@ -0,0 +1,314 @@
+import asyncio
+import codecs
+import json
+import re
+from collections.abc import AsyncIterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+try:
+    import pyjson5  # Optional (extra "json5"): C-accelerated parser for JS object literals
+except ImportError:
+    pyjson5 = None
+
+
+# One alternation covering every token that matters to the normalizer.
+# Whitespace, numbers, true/false/null and ':' between tokens are copied by re.sub in bulk.
+_JSON_TOKEN = re.compile(
+    r"""
+    ("[^"\\]*(?:\\.[^"\\]*)*")      # 1: complete double-quoted string, kept verbatim
+  | '([^'\\]*(?:\\.[^'\\]*)*)'      # 2: complete single-quoted string, re-quoted
+  | (["'][\s\S]*)                   # 3: unterminated string, runs to the end
+  | [{,][^"'{}\[\],:]*              # container start / separator plus the key run after it
+  | [\[\]}]
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_KEY_START = re.compile(r"[^\W\d]")
+_KEY_WORD = re.compile(r"\w*")
+_SQ_INNER = re.compile(r'\\.|"', re.DOTALL)
+
+
+def _escape_single_quoted(body: str) -> str:
+    """Keep escape sequences, escape bare double quotes."""
+    if '"' not in body:
+        return body
+    return _SQ_INNER.sub(lambda m: '\\"' if m.group() == '"' else m.group(), body)
+
+
+def _quote_key(run: str) -> str:
+    """Quote the first identifier (starting with a letter or '_') in a key-position run."""
+    m = _KEY_START.search(run)
+    while m is not None and not (m.group().isalpha() or m.group() == "_"):
+        m = _KEY_START.search(run, m.end())
+    if m is None:
+        return run
+    start = m.start()
+    end = _KEY_WORD.match(run, start).end()
+    return run[:start] + '"' + run[start:end] + '"' + run[end:]
+
+
+def fix_nonstandard_json(data_str: str) -> str:
+    """
+    Normalize JSON-like JS object literals into valid JSON.
+    Tokenize with a single precompiled regex, distinguishing "inside strings" from "structure":
+      - String contents are preserved verbatim (single quotes unified to double quotes,
+        inner double quotes escaped), so apostrophes, commas, colons in values are not broken;
+      - Only bare identifiers in "key position" get quotes added;
+      - Bare values like true/false/null/numbers are preserved as-is.
+    Output is identical to the former character-by-character scanner
+    (see benchmarks/bench_normalizer.py), but everything between tokens is copied in C.
+    """
+    stack = []  # Track containing container: '{' or '['
+    keys = {}   # Key runs repeat for every lesson, quote each distinct one once
+
+    def replace(m: re.Match) -> str:
+        tok = m.group()
+        group = m.lastindex
+        if group is None:  # Structure
+            c = tok[0]
+            if c == ",":
+                if not stack or stack[-1] != "{":  # Separator in an array: no key follows
+                    return tok
+            elif c == "{":
+                stack.append("{")
+            elif c == "[":
+                stack.append("[")
+                return tok
+            else:
+                if stack:
+                    stack.pop()
+                return tok
+            run = tok[1:]
+            key = keys.get(run)
+            if key is None:
+                key = keys[run] = _quote_key(run)
+            return c + key
+        if group == 1:
+            return tok
+        if group == 2:
+            return '"' + _escape_single_quoted(m.group(2)) + '"'
+        if tok[0] == '"':  # Unterminated: close it
+            return tok + '"'
+        return '"' + _escape_single_quoted(tok[1:]) + '"'
+
+    return _JSON_TOKEN.sub(replace, data_str)
+
+
+def parse_course_json(data_str: str):
+    try:
+        parsed_data = json.loads(data_str)
+        return parsed_data
+    except json.JSONDecodeError:
+        print("Course data is non-standard JSON data! Attempting to fix.")
+        if pyjson5 is not None:
+            try:
+                return pyjson5.decode(data_str)
+            except pyjson5.Json5Exception:
+                pass  # Fall back to the normalizer below
+        fixed_data = fix_nonstandard_json(data_str)
+        try:
+            parsed_data = json.loads(fixed_data)
+            print("Course data parsed successfully after fixing!")
+            return parsed_data
+        except json.JSONDecodeError as e:
+            print(f"Parsing still failed after attempting to fix: {e}")
+            return None
+
+
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read from the response per parse step
+# Bodies larger than this are parsed as they arrive (LiteralStream), smaller ones whole: streaming
+# saves memory only on large catalogs and costs time at every size (benchmarks/bench_stream.py)
+STREAM_THRESHOLD = 8 * 1024 * 1024
+PARSE_WORKERS = 2
+
+_parse_executor: ThreadPoolExecutor | None = None
+
+# Everything up to the next bracket, with complete string literals skipped in one step.
+# Stops early at a quote whose string is not terminated yet (it continues in the next chunk).
+_SKIP_TO_BRACKET = re.compile(
+    r"""(?:[^"'\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')*""",
+    re.DOTALL,
+)
+
+
+def _parse_literal(text: str, standard: bool | None) -> tuple[object, bool]:
+    """
+    Parse one JSON / JS-literal fragment without console noise.
+    `standard` remembers whether the previous fragment was plain JSON, so a stream
+    of non-standard fragments does not pay for a failing json.loads every time.
+    Returns (value, standard); raises ValueError if the fragment cannot be parsed.
+    """
+    if standard is not False:
+        try:
+            return json.loads(text), True
+        except json.JSONDecodeError:
+            pass
+    if pyjson5 is not None:
+        try:
+            return pyjson5.decode(text), False
+        except pyjson5.Json5Exception:
+            pass
+    return json.loads(fix_nonstandard_json(text)), False
+
+
+class LiteralStream:
+    """
+    Incrementally parse the top-level elements of a JS array / object literal.
+
+    Feed raw response bytes as they arrive; every call returns the elements completed
+    so far, already parsed. Only the unfinished tail is buffered, so memory stays
+    bounded by one chunk plus one element regardless of payload size.
+    Everything before the first opening bracket (e.g. "var lessonJSONs = ") is skipped,
+    as is everything after its matching close.
+
+      LiteralStream("[") -> feed() returns list items (lesson dicts for data.action)
+      LiteralStream("{") -> feed() returns (key, value) pairs (queryStdCount.action)
+
+    Element boundaries are found by tracking bracket depth only; string literals and
+    plain text between brackets are skipped by a single regex match each.
+    """
+
+    def __init__(self, container: str = "["):
+        self.container = container
+        self.started = False  # Saw the opening bracket
+        self.done = False     # Saw its matching close
+        self._close = "]" if container == "[" else "}"
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buf = ""        # Unparsed text, starting right after the last emitted element
+        self._scan = 0        # Where scanning resumes within _buf
+        self._depth = 1       # Nesting depth at _scan, 1 == directly inside the outer container
+        self._standard = None
+
+    def feed(self, chunk: bytes) -> list:
+        """Consume one chunk and return the elements it completed."""
+        if self.done:
+            return []
+        return self._parse(self._cut(self._decoder.decode(chunk)))
+
+    async def feed_async(self, chunk: bytes, executor: Executor) -> list:
+        """feed() on a worker thread of `executor`, without blocking the event loop."""
+        if self.done:
+            return []
+        return await asyncio.get_running_loop().run_in_executor(executor, self.feed, chunk)
+
+    def close(self) -> list:
+        """Flush the decoder; returns any trailing elements (normally none)."""
+        if self.done:
+            return []
+        return self._parse(self._cut(self._decoder.decode(b"", final=True)))
+
+    def _cut(self, text: str) -> str:
+        """Advance over `text`; return the literal holding every element it completed ("" if none)."""
+        if not self.started:
+            start = text.find(self.container)
+            if start < 0:
+                return ""
+            self.started = True
+            text = text[start + 1:]
+
+        buf = self._buf + text
+        pos = self._scan
+        depth = self._depth
+        boundary = 0  # End of the last complete element in buf
+        n = len(buf)
+
+        while True:
+            pos = _SKIP_TO_BRACKET.match(buf, pos).end()
+            if pos >= n or buf[pos] in "\"'":  # Out of text, or a string continues in the next chunk
+                break
+            if buf[pos] in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:  # Outer container closed
+                    self.done = True
+                    self._buf = ""
+                    return self._literal(buf[:pos])
+                if depth == 1:
+                    boundary = pos + 1
+            pos += 1
+
+        self._buf = buf[boundary:]
+        self._scan = pos - boundary
+        self._depth = depth
+        return self._literal(buf[:boundary])
+
+    def _literal(self, text: str) -> str:
+        """Wrap the elements cut from one chunk back into their container."""
+        text = text.strip()
+        if text.startswith(","):  # Separator left over from the previous cut
+            text = text[1:].strip()
+        return self.container + text + self._close if text else ""
+
+    def _parse(self, literal: str) -> list:
+        """Parse all elements completed by one chunk in a single call."""
+        if not literal:
+            return []
+        value, self._standard = _parse_literal(literal, self._standard)
+        return self._items(value)
+
+    def _items(self, value) -> list:
+        return list(value.items()) if self.container == "{" else value
+
+
+def parse_literal_body(body: bytes, container: str = "[") -> list | None:
+    """
+    The elements of the JS literal in a whole response body, parsed in one call: from the
+    first opening bracket to the last matching close. None if the body holds no such literal.
+    """
+    text = body.decode("utf-8", errors="replace")
+    start = text.find(container)
+    end = text.rfind("]" if container == "[" else "}")
+    if start < 0 or end < start:
+        return None
+    value, _ = _parse_literal(text[start:end + 1], None)
+    return list(value.items()) if container == "{" else value
+
+
+async def read_literal(chunks: AsyncIterable[bytes], container: str = "[", size: int | None = None) -> list | None:
+    """
+    The elements of the JS literal in a response body read from `chunks`, parsed off the
+    event loop. A body of up to STREAM_THRESHOLD bytes (by `size`, its Content-Length, or
+    as read so far) is parsed whole; a larger one goes through a LiteralStream from then on,
+    which keeps its memory bounded. None if the body holds no complete literal.
+    """
+    stream = LiteralStream(container) if size and size > STREAM_THRESHOLD else None
+    buffered: list[bytes] = []
+    received = 0
+    items = []
+    async for chunk in chunks:
+        if stream is None:
+            buffered.append(chunk)
+            received += len(chunk)
+            if received <= STREAM_THRESHOLD:
+                continue
+            stream = LiteralStream(container)
+            chunk, buffered = b"".join(buffered), []
+        items.extend(await stream.feed_async(chunk, parse_executor()))
+        if stream.done:
+            break
+    if stream is None:
+        return await asyncio.get_running_loop().run_in_executor(parse_executor(), parse_literal_body, b"".join(buffered), container)
+    items.extend(stream.close())
+    return items if stream.done else None
+
+
+def parse_executor() -> Executor:
+    """
+    The thread pool that parses response bodies, created on first use and shared for
+    the rest of the run. Threads beat a process pool here at every catalog size
+    (benchmarks/bench_loop_lag.py): a worker process pays for pickling the parsed
+    lessons back, which takes longer and lags the loop more than the GIL switches.
+    """
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+    return _parse_executor
+
+
+def shutdown_parse_executor():
+    """Release the parse pool (safe to call when none was created)."""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
@@ -0,0 +1,226 @@
+import math
+
+import aiohttp
+
+from config import planner_rank_decay
+from config_loader import USER_CONFIGS, INQUIRY_USER_DATA, set_course_ids
+from course_validator import lesson_credits, lesson_slots, load_profile_catalog
+from enrollment_table import EnrollmentTable, lesson_key
+from inquire_course_info import get_enrollment_data
+
+from utils import ensure_session_active, build_connector
+
+WEEK_BITS = 64  # Weeks per (weekDay, unit) in a slot mask
+UNITS_PER_DAY = 16
+
+
+def slot_mask(lesson: dict) -> int:
+    """
+    The lesson's timetable as one bitset: WEEK_BITS bits per (weekDay, unit), bit w set when
+    the lesson takes that unit in week w. Two lessons clash iff their masks intersect.
+    Units whose weeks are unknown count as taken every week: a plan never relies on them.
+    """
+    mask = 0
+    week_all = (1 << WEEK_BITS) - 1
+    for (day, unit), weeks in lesson_slots(lesson, unknown_weeks=-1).items():
+        if 1 <= day <= 7 and 0 <= unit < UNITS_PER_DAY:
+            mask |= (weeks & week_all) << (((day - 1) * UNITS_PER_DAY + unit) * WEEK_BITS)
+    return mask
+
+
+class Candidate:
+    """One wishlist entry the planner may pick."""
+
+    __slots__ = ("profileId", "course_id", "rank", "weight", "mask", "credits")
+
+    def __init__(self, profileId: str, course_id, rank: int, mask: int, credits: float, decay: float = planner_rank_decay):
+        self.profileId = profileId
+        self.course_id = course_id
+        self.rank = rank  # Position in its table's wishlist, 0 = most wanted
+        self.weight = decay ** rank
+        self.mask = mask
+        self.credits = 0.0 if math.isnan(credits) else credits
+
+
+def plan(candidates: list[Candidate], max_credits: dict[str, float] | None = None, taken_mask: int = 0) -> list[Candidate]:
+    """
+    The clash-free subset of `candidates` with the highest total weight that keeps every
+    profile within its max_credits; `taken_mask` is the timetable already occupied.
+    Branch and bound over candidates by decreasing weight: a branch is cut when its weight
+    plus that of every later candidate still compatible with it cannot beat the best found.
+    Include-first search makes ties go to the higher-ranked choice.
+    """
+    max_credits = max_credits or {}
+    items = sorted((c for c in candidates if not c.mask & taken_mask), key=lambda c: (-c.weight, c.rank))
+    count = len(items)
+    weights = [c.weight for c in items]
+    # compatible[i]: bitset of the later items that do not clash with item i
+    compatible = []
+    for i, item in enumerate(items):
+        bits = 0
+        for j in range(i + 1, count):
+            if not item.mask & items[j].mask:
+                bits |= 1 << j
+        compatible.append(bits)
+
+    best_weight = -1.0
+    best: list[int] = []
+    chosen: list[int] = []
+    credits = {profileId: 0.0 for profileId in max_credits}
+
+    def bound(open_bits: int) -> float:
+        total = 0.0
+        while open_bits:
+            low = open_bits & -open_bits
+            total += weights[low.bit_length() - 1]
+            open_bits ^= low
+        return total
+
+    def search(open_bits: int, weight: float):
+        nonlocal best_weight, best
+        if weight > best_weight:
+            best_weight, best = weight, list(chosen)
+        if not open_bits or weight + bound(open_bits) <= best_weight:
+            return
+        low = open_bits & -open_bits
+        i = low.bit_length() - 1
+        rest = open_bits ^ low
+        item = items[i]
+        limit = max_credits.get(item.profileId)
+        if limit is None or credits[item.profileId] + item.credits <= limit:
+            chosen.append(i)
+            if limit is not None:
+                credits[item.profileId] += item.credits
+            search(rest & compatible[i], weight + weights[i])
+            if limit is not None:
+                credits[item.profileId] -= item.credits
+            chosen.pop()
+        search(rest, weight)
+
+    search((1 << count) - 1, 0.0)
+    return sorted((items[i] for i in best), key=lambda c: c.rank)
+
+
+def held_lessons(selected: set[int], catalogs: dict[str, dict]) -> tuple[int, dict[str, float]]:
+    """
+    The timetable mask and the credits per profile of the lessons a user already has.
+    A lesson counts towards the profile whose catalog lists it; lessons no catalog lists are ignored.
+    """
+    mask = 0
+    credits: dict[str, float] = {}
+    for key in selected:
+        for profileId, lessons in catalogs.items():
+            lesson = lessons.get(key)
+            if lesson is None:
+                continue
+            mask |= slot_mask(lesson)
+            lesson_credit = lesson_credits(lesson)
+            if not math.isnan(lesson_credit):
+                credits[profileId] = credits.get(profileId, 0.0) + lesson_credit
+            break
+    return mask, credits
+
+
+def user_candidates(user_config: dict, catalogs: dict[str, dict], enrollments: EnrollmentTable,
+                    selected: set[int] = frozenset()) -> tuple[list[Candidate], list[tuple]]:
+    """
+    Candidates from each table's `wishlist` (or its course_ids), plus (profileId, course_id, reason)
+    of the entries left out before planning: already selected, unknown to the catalog, or without a free seat.
+    """
+    candidates, excluded = [], []
+    for table in user_config.get("tables", []):
+        profileId = table.get("profileId")
+        wishlist = table.get("wishlist") or table.get("course_ids", [])
+        lessons = catalogs.get(profileId, {})
+        seen = set()
+        for rank, course_id in enumerate(wishlist):
+            key = lesson_key(course_id)
+            if key in seen:
+                continue
+            seen.add(key)
+            lesson = lessons.get(key)
+            if key in selected:
+                excluded.append((profileId, course_id, "already selected"))
+            elif lesson is None:
+                excluded.append((profileId, course_id, "not in the catalog"))
+            elif not enrollments.has_slot(key):
+                counts = enrollments.get(key)
+                excluded.append((profileId, course_id, f"no free seat ({counts[0]}/{counts[1]})" if counts else "no enrollment data"))
+            else:
+                candidates.append(Candidate(profileId, course_id, rank, slot_mask(lesson), lesson_credits(lesson)))
+    return candidates, excluded
+
+
+async def plan_courses(write: bool | None = None):
+    """
+    Plan every user's course_ids from its ranked wishlists with the current catalog and
+    enrollment counts, around the lessons the user already has (their timetable and credits),
+    print the plan and (after confirmation) write it to config.toml.
+    """
+    inquiry_cookies = INQUIRY_USER_DATA.get("cookies")
+    if not inquiry_cookies:
+        print("Error: Inquiry cookies not found in config.toml (INQUIRY_USER_DATA). Please configure them.")
+        return
+
+    profile_ids = list(dict.fromkeys(t.get("profileId") for u in USER_CONFIGS for t in u.get("tables", []) if t.get("profileId")))
+    if not profile_ids:
+        print("No tables found in USER_CONFIGS.")
+        return
+
+    async with aiohttp.ClientSession(connector=build_connector("Plan")) as session:
+        inquiry_user = {"label": INQUIRY_USER_DATA.get("label", "Inquiry"), "cookies": inquiry_cookies, "profileId": profile_ids}
+        if not await ensure_session_active(session, inquiry_user):
+            print("\n[!] Error: Failed to activate Inquiry Session.\n")
+            return
+        catalogs = {}
+        for profile_id in profile_ids:
+            lessons = await load_profile_catalog(session, profile_id, inquiry_cookies)
+            catalogs[profile_id] = {lesson_key(lesson.get("id")): lesson for lesson in lessons}
+        enrollments = await get_enrollment_data(session, inquiry_cookies)
+        if not enrollments:
+            print("Could not fetch enrollment data. Exiting planner.")
+            return
+        # Lessons each user already has (electedIds of their defaultPage pages)
+        selected_by_user = []
+        for user_config in USER_CONFIGS:
+            selected = set()
+            if not await ensure_session_active(session, user_config, selected):
+                print(f"Warning: could not read the selected lessons of {user_config.get('label', 'Unknown_User')}; "
+                      f"planning as if none were selected.")
+            selected_by_user.append(selected)
+
+    plans = []
+    for user_config, selected in zip(USER_CONFIGS, selected_by_user):
+        label = user_config.get("label", "Unknown_User")
+        candidates, excluded = user_candidates(user_config, catalogs, enrollments, selected)
+        taken_mask, held = held_lessons(selected, catalogs)
+        max_credits = {
+            t["profileId"]: float(t["max_credits"]) - held.get(t["profileId"], 0.0)
+            for t in user_config.get("tables", []) if t.get("max_credits") is not None
+        }
+        chosen = plan(candidates, max_credits, taken_mask)
+        chosen_ids = {(c.profileId, c.course_id) for c in chosen}
+
+        print(f"\n--- Plan for {label} ---")
+        for table in user_config.get("tables", []):
+            profileId = table.get("profileId")
+            course_ids = [c.course_id for c in chosen if c.profileId == profileId]
+            credits = sum(c.credits for c in chosen if c.profileId == profileId)
+            if held.get(profileId):
+                credits_text = f"{credits:g} + {held[profileId]:g} selected"
+            else:
+                credits_text = f"{credits:g}"
+            limit = f" / {float(table['max_credits']):g}" if table.get("max_credits") is not None else ""
+            print(f"Profile {profileId}: {len(course_ids)} course(s), {credits_text}{limit} credits: {course_ids}")
+            plans.append((label, profileId, course_ids, table.get("course_ids", [])))
+        for profileId, course_id, reason in excluded:
+            print(f"  [Left out] ({profileId}) Course ID {course_id}: {reason}")
+        for c in candidates:
+            if (c.profileId, c.course_id) not in chosen_ids:
+                print(f"  [Left out] ({c.profileId}) Course ID {c.course_id}: clashes with the plan or a selected lesson, or exceeds max_credits")
+
+    if write is None:
+        write = input("\nWrite these course_ids to config.toml? [y/N]: ").strip().lower() == "y"
+    if write:
+        for label, profileId, course_ids, original in plans:
+            set_course_ids(label, profileId, course_ids, wishlist=original)
@@ -0,0 +1,197 @@
+import math
+
+import aiohttp
+
+from config_loader import ENROLLMENT_DATA_API_PARAMS
+from catalog_cache import load_catalog_cache
+from enrollment_table import lesson_key
+from inquire_course_info import get_course_data
+
+
+def week_mask(week_state, unknown: int = 0) -> int:
+    """
+    weekState "0111..." (character i == week i) as a bit mask; `unknown` if missing or
+    malformed. By default no week: a lesson whose weeks are unknown never clashes, so the
+    pre-check never skips it.
+    """
+    if not isinstance(week_state, str) or not week_state or week_state.strip("01"):
+        return unknown
+    return int(week_state[::-1], 2)
+
+
+def lesson_slots(lesson: dict, unknown_weeks: int = 0) -> dict[tuple[int, int], int]:
+    """{(weekDay, unit): weeks} the lesson takes, from its arrangeInfo (see week_mask)."""
+    slots: dict[tuple[int, int], int] = {}
+    for arrange in lesson.get("arrangeInfo") or []:
+        try:
+            day, start, end = int(arrange["weekDay"]), int(arrange["startUnit"]), int(arrange["endUnit"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        weeks = week_mask(arrange.get("weekState"), unknown_weeks)
+        for unit in range(start, end + 1):
+            slots[(day, unit)] = slots.get((day, unit), 0) | weeks
+    return slots
+
+
+def lesson_credits(lesson: dict) -> float:
+    try:
+        return float(lesson.get("credits", ""))
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class Timetable:
+    """Weekly slots taken by a set of lessons: {(weekDay, unit): weeks} plus who takes them."""
+
+    def __init__(self):
+        self.slots: dict[tuple[int, int], int] = {}
+        self.owners: dict[tuple[int, int], list[int]] = {}
+
+    def clash(self, slots: dict, lessons: dict[int, dict]) -> int | None:
+        """A lesson of the timetable that shares a slot and week with `slots`, or None."""
+        for slot, weeks in slots.items():
+            if self.slots.get(slot, 0) & weeks:
+                for owner in self.owners[slot]:
+                    if lessons[owner]["slots"].get(slot, 0) & weeks:
+                        return owner
+        return None
+
+    def add(self, lesson_id: int, slots: dict):
+        for slot, weeks in slots.items():
+            self.slots[slot] = self.slots.get(slot, 0) | weeks
+            self.owners.setdefault(slot, []).append(lesson_id)
+
+
+class SelectionValidator:
+    """
+    Predicts selection attempts that cannot succeed from the catalogs of a user's profiles:
+    a lesson already selected, one whose schedule clashes with a selected lesson, or one
+    that would take a profile over its `max_credits` (config.toml, per table).
+    Lessons missing from the catalogs are never judged.
+    """
+
+    def __init__(self, catalogs: dict[str, list], selected: set[int], max_credits: dict[str, float] | None = None):
+        self.lessons: dict[int, dict] = {}
+        for profileId, lessons in catalogs.items():
+            for lesson in lessons:
+                key = lesson_key(lesson.get("id"))
+                if key is not None:
+                    self.lessons[key] = {
+                        "profileId": profileId,
+                        "name": lesson.get("name", ""),
+                        "slots": lesson_slots(lesson),
+                        "credits": lesson_credits(lesson),
+                    }
+        self.max_credits = max_credits or {}
+        self.use_selected(selected)
+
+    def use_selected(self, selected: set[int]):
+        """Start over from these selected lessons (e.g. re-read from the server)."""
+        self.selected: set[int] = set()
+        self.timetable = Timetable()
+        self.credits: dict[str, float] = {}
+        for lesson_id in selected:
+            self.mark_selected(lesson_id)
+
+    def name(self, lesson_id: int) -> str:
+        lesson = self.lessons.get(lesson_id)
+        return f"{lesson_id} {lesson['name']}" if lesson and lesson["name"] else str(lesson_id)
+
+    def mark_selected(self, course_id):
+        """Record a lesson the user now has (selected before, or during this run)."""
+        key = lesson_key(course_id)
+        if key is None or key in self.selected:
+            return
+        self.selected.add(key)
+        lesson = self.lessons.get(key)
+        if lesson is not None:
+            self.timetable.add(key, lesson["slots"])
+            if not math.isnan(lesson["credits"]):
+                self.credits[lesson["profileId"]] = self.credits.get(lesson["profileId"], 0.0) + lesson["credits"]
+
+    def _problem(self, profileId: str, key: int, timetable: Timetable, credits: dict) -> str | None:
+        lesson = self.lessons[key]
+        owner = timetable.clash(lesson["slots"], self.lessons)
+        if owner is not None:
+            return f"time conflict with {self.name(owner)}"
+        limit = self.max_credits.get(profileId)
+        if limit is not None and not math.isnan(lesson["credits"]):
+            total = credits.get(profileId, 0.0) + lesson["credits"]
+            if total > limit:
+                return f"{total:g} credits would exceed max_credits = {limit:g}"
+        return None
+
+    def check(self, profileId: str, course_id) -> str | None:
+        """Why selecting the course cannot succeed given what is selected, or None."""
+        key = lesson_key(course_id)
+        if key is None or key not in self.lessons:
+            return None
+        if key in self.selected:
+            return "already selected"
+        return self._problem(profileId, key, self.timetable, self.credits)
+
+    def impossible(self, tasks) -> list[tuple]:
+        """(task, reason) of the (profileId, course_id) tasks that can no longer succeed."""
+        return [(task, reason) for task in tasks if (reason := self.check(*task)) is not None]
+
+    def review(self, tasks: list[tuple]) -> tuple[list[tuple], list[tuple], list[tuple]]:
+        """
+        Split (profileId, course_id) tasks, given in priority order, into the ones to send,
+        the ones dropped as certain failures and the ones flagged: those clash with a course
+        earlier in the list, so both can only succeed if the earlier one fails.
+        Dropped and flagged entries are (task, reason).
+        """
+        kept, dropped, flagged = [], [], []
+        planned = Timetable()
+        planned_credits = dict(self.credits)
+        for task in tasks:
+            profileId, course_id = task
+            reason = self.check(profileId, course_id)
+            if reason is not None:
+                dropped.append((task, reason))
+                continue
+            kept.append(task)
+            key = lesson_key(course_id)
+            if key not in self.lessons:
+                continue
+            reason = self._problem(profileId, key, planned, planned_credits)
+            if reason is not None:
+                flagged.append((task, f"{reason} (earlier in the queue)"))
+            lesson = self.lessons[key]
+            planned.add(key, lesson["slots"])
+            if not math.isnan(lesson["credits"]):
+                planned_credits[profileId] = planned_credits.get(profileId, 0.0) + lesson["credits"]
+        return kept, dropped, flagged
+
+
+async def load_profile_catalog(session: aiohttp.ClientSession, profile_id: str, cookies: dict) -> list:
+    """
+    Raw data.action lessons of a profile: the on-disk catalog cache while fresh
+    (catalog_cache_ttl), else fetched with the user's session (conditionally, if a stale
+    copy exists, and cached again). Nothing is judged from a catalog that could not be fetched.
+    """
+    cached = load_catalog_cache(ENROLLMENT_DATA_API_PARAMS.get("semesterId", ""), profile_id)
+    if cached is not None and cached.is_fresh():
+        return cached.courses
+    return await get_course_data(session, profile_id, cookies, cached) or []
+
+
+async def build_validator(session: aiohttp.ClientSession, user_config: dict, selected: set[int]) -> SelectionValidator:
+    """A SelectionValidator for one USER_CONFIGS entry, whose session is already active."""
+    catalogs = {}
+    max_credits = {}
+    for table in user_config.get("tables", []):
+        profileId = table.get("profileId")
+        if not profileId or profileId in catalogs:
+            continue
+        catalogs[profileId] = await load_profile_catalog(session, profileId, user_config.get("cookies"))
+        if table.get("max_credits") is not None:
+            max_credits[profileId] = float(table["max_credits"])
+    return SelectionValidator(catalogs, selected, max_credits)
+
+
+def report_review(user_label: str, dropped: list[tuple], flagged: list[tuple] = ()):
+    for (profileId, course_id), reason in dropped:
+        print(f"[Pre-check] User {user_label} ({profileId}) - Course ID {course_id}: skipped, {reason}.")
+    for (profileId, course_id), reason in flagged:
+        print(f"[Pre-check] User {user_label} ({profileId}) - Course ID {course_id}: {reason}.")
@@ -0,0 +1,290 @@
+import operator
+import os
+import struct
+import sys
+import time
+from array import array
+from itertools import compress, repeat
+from pathlib import Path
+
+from config import catalog_cache_dir, enrollment_history_keep, server_tag
+from enrollment_table import UNKNOWN, EnrollmentTable, lesson_key
+
+# File layout (native byte order, recorded in the header), appended one snapshot at a time:
+#   header   magic, version, byte order
+#   record   taken_at, new lesson count, column count
+#            new lesson ids  int64 x new (appended to the lesson index)
+#            sc, lc          int32 x columns each, in lesson index order
+_MAGIC = b"SHST"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_RECORD = struct.Struct("<dII")
+_BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+
+
+class LessonIndex:
+    """Stable lesson ID -> column mapping; lessons are only ever appended, so columns never move."""
+
+    def __init__(self):
+        self.ids = array("q")
+        self._columns: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def column(self, lesson_id: int) -> int | None:
+        return self._columns.get(lesson_id)
+
+    def extend(self, lesson_ids):
+        for lesson_id in lesson_ids:
+            if lesson_id not in self._columns:
+                self._columns[lesson_id] = len(self.ids)
+                self.ids.append(lesson_id)
+
+    def align(self, table: EnrollmentTable) -> tuple[array, array, int]:
+        """
+        sc and lc of the table in column order (UNKNOWN for lessons it does not list),
+        plus how many lessons were new to the index.
+        """
+        known = len(self.ids)
+        if table.ids[:known] == self.ids:
+            # Usual case: the server lists lessons in the same order every time
+            self.extend(table.ids[known:])
+            return array("i", table.sc), array("i", table.lc), len(self.ids) - known
+
+        self.extend(table.ids)
+        sc = array("i", repeat(UNKNOWN, len(self.ids)))
+        lc = array("i", sc)
+        columns = self._columns
+        for row, lesson_id in enumerate(table.ids):
+            column = columns[lesson_id]
+            sc[column] = table.sc[row]
+            lc[column] = table.lc[row]
+        return sc, lc, len(self.ids) - known
+
+
+class Snapshot:
+    """One enrollment table, as sc / lc columns aligned on a LessonIndex."""
+
+    __slots__ = ("taken_at", "sc", "lc")
+
+    def __init__(self, taken_at: float, sc: array, lc: array):
+        self.taken_at = taken_at
+        self.sc = sc
+        self.lc = lc
+
+    def padded(self, columns: int) -> tuple[array, array]:
+        """sc / lc extended with UNKNOWN up to `columns` (lessons indexed after this snapshot)."""
+        missing = columns - len(self.sc)
+        if missing <= 0:
+            return self.sc, self.lc
+        pad = array("i", repeat(UNKNOWN, missing))
+        return self.sc + pad, self.lc + pad
+
+
+_BLOCK = 512  # Columns compared per memcmp when looking for changes
+
+
+def changed_columns(old: array, new: array) -> list[int]:
+    """
+    Columns where two equally long arrays differ. Equal blocks are skipped with one C-level
+    comparison each; inside a differing block, map / compress find the columns without
+    running Python code per element.
+    """
+    if old == new:
+        return []
+    changed = []
+    ne = operator.ne
+    for start in range(0, len(old), _BLOCK):
+        old_block = old[start:start + _BLOCK]
+        new_block = new[start:start + _BLOCK]
+        if old_block != new_block:
+            changed.extend(compress(range(start, start + len(old_block)), map(ne, old_block, new_block)))
+    return changed
+
+
+def _free(sc: int, lc: int) -> int | None:
+    return None if sc == UNKNOWN or lc == UNKNOWN else lc - sc
+
+
+class EnrollmentDiff:
+    """
+    What changed between two snapshots. Changed columns are located with C-level passes
+    over the arrays (see changed_columns); only those few columns are then looked at one by one.
+    """
+
+    def __init__(self, index: LessonIndex, old: Snapshot, new: Snapshot):
+        columns = max(len(old.sc), len(new.sc))
+        old_sc, old_lc = old.padded(columns)
+        new_sc, new_lc = new.padded(columns)
+        changed = changed_columns(old_sc, new_sc)
+        lc_changed = changed_columns(old_lc, new_lc)  # Limits rarely change: usually one comparison
+        if lc_changed:
+            changed = sorted(set(changed).union(lc_changed))
+
+        self.interval = new.taken_at - old.taken_at
+        self.changed: list[int] = []  # Lesson ids whose sc or lc changed
+        self.seats_freed: list[tuple[int, int, int]] = []  # (id, free seats before, after), more free seats now
+        self.limits_raised: list[tuple[int, int, int]] = []  # (id, lc before, after)
+        self.newly_full: list[int] = []  # Had a free seat, has none now
+        ids = index.ids
+        for column in changed:
+            lesson_id = ids[column]
+            self.changed.append(lesson_id)
+            before = _free(old_sc[column], old_lc[column])
+            after = _free(new_sc[column], new_lc[column])
+            if after is not None and after > 0 and (before is None or after > before):
+                self.seats_freed.append((lesson_id, before, after))
+            if old_lc[column] != UNKNOWN and new_lc[column] > old_lc[column]:
+                self.limits_raised.append((lesson_id, old_lc[column], new_lc[column]))
+            if before is not None and before > 0 and after is not None and after <= 0:
+                self.newly_full.append(lesson_id)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed)
+
+
+class EnrollmentHistory:
+    """
+    Snapshots of queryStdCount results over time, aligned on a stable lesson index.
+    The latest `keep` snapshots stay in memory; with a path, every snapshot is also
+    appended to an on-disk file that load() replays. The file is rewritten with the
+    kept snapshots when it is loaded holding more, or once it holds twice as many.
+    """
+
+    def __init__(self, path: Path | None = None, keep: int = enrollment_history_keep):
+        self.path = Path(path) if path else None
+        self.keep = max(1, keep)
+        self.index = LessonIndex()
+        self.snapshots: list[Snapshot] = []
+        self.records = 0  # Snapshots in the file
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    @property
+    def latest(self) -> Snapshot | None:
+        return self.snapshots[-1] if self.snapshots else None
+
+    def append(self, table: EnrollmentTable, taken_at: float | None = None) -> EnrollmentDiff | None:
+        """Store a fetched table; returns its diff against the previous snapshot (None for the first)."""
+        known = len(self.index)
+        sc, lc, added = self.index.align(table)
+        snapshot = Snapshot(time.time() if taken_at is None else taken_at, sc, lc)
+        self._keep(snapshot)
+        if self.path is not None:
+            self._write(snapshot, self.index.ids[known:known + added])
+            if self.records >= 2 * self.keep:
+                self.compact()
+        if len(self.snapshots) < 2:
+            return None
+        return EnrollmentDiff(self.index, self.snapshots[-2], snapshot)
+
+    def diff(self, old: int = -2, new: int = -1) -> EnrollmentDiff:
+        """Diff between two kept snapshots (by position, default: the last two)."""
+        return EnrollmentDiff(self.index, self.snapshots[old], self.snapshots[new])
+
+    def counts(self, lesson_id) -> tuple[int, int] | None:
+        """(sc, lc) of a lesson in the latest snapshot."""
+        column = self.index.column(lesson_key(lesson_id))
+        latest = self.latest
+        if column is None or latest is None or column >= len(latest.sc):
+            return None
+        return latest.sc[column], latest.lc[column]
+
+    def _keep(self, snapshot: Snapshot):
+        self.snapshots.append(snapshot)
+        if len(self.snapshots) > self.keep:
+            del self.snapshots[: len(self.snapshots) - self.keep]
+
+    def _write(self, snapshot: Snapshot, new_ids: array):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(_HEADER.pack(_MAGIC, _VERSION, _BYTE_ORDER))
+                f.write(_RECORD.pack(snapshot.taken_at, len(new_ids), len(snapshot.sc)))
+                new_ids.tofile(f)
+                snapshot.sc.tofile(f)
+                snapshot.lc.tofile(f)
+        except OSError as e:
+            print(f"[History] Failed to write {self.path}: {e}")
+            self.path = None  # Keep recording in memory only
+            return
+        self.records += 1
+
+    def compact(self):
+        """Rewrite the file with the kept snapshots only, atomically."""
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, _BYTE_ORDER))
+                indexed = 0
+                for snapshot in self.snapshots:
+                    # The first kept snapshot carries the lessons the dropped ones introduced
+                    columns = len(snapshot.sc)
+                    new_ids = self.index.ids[indexed:max(indexed, columns)]
+                    f.write(_RECORD.pack(snapshot.taken_at, len(new_ids), columns))
+                    new_ids.tofile(f)
+                    snapshot.sc.tofile(f)
+                    snapshot.lc.tofile(f)
+                    indexed += len(new_ids)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[History] Failed to compact {self.path}: {e}")
+            return
+        self.records = len(self.snapshots)
+
+    @classmethod
+    def load(cls, path: Path, keep: int = enrollment_history_keep, read_only: bool = False) -> "EnrollmentHistory":
+        """
+        Replay a history file; a missing, foreign or truncated file yields what could be read.
+        With `read_only` the file is never truncated or compacted (a running --watch may be
+        appending to it) and new snapshots stay in memory.
+        """
+        history = cls(None if read_only else path, keep)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return history
+        except OSError as e:
+            print(f"[History] Failed to read {path}: {e}")
+            return history
+
+        if len(data) < _HEADER.size or _HEADER.unpack_from(data) != (_MAGIC, _VERSION, _BYTE_ORDER):
+            print(f"[History] Ignoring {path}: not a history file of this version.")
+            history.path = None  # Do not append to a foreign file
+            return history
+        offset = _HEADER.size
+        while offset + _RECORD.size <= len(data):
+            taken_at, added, columns = _RECORD.unpack_from(data, offset)
+            end = offset + _RECORD.size + 8 * added + 8 * columns
+            if end > len(data):
+                break  # Interrupted write
+            offset += _RECORD.size
+            new_ids = array("q", data[offset:offset + 8 * added])
+            offset += 8 * added
+            sc = array("i", data[offset:offset + 4 * columns])
+            offset += 4 * columns
+            lc = array("i", data[offset:offset + 4 * columns])
+            offset += 4 * columns
+            history.index.extend(new_ids)
+            history._keep(Snapshot(taken_at, sc, lc))
+            history.records += 1
+        if history.path is None:
+            return history
+        if offset < len(data):
+            # Drop the partial record so later appends stay readable
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        if history.records > history.keep:
+            history.compact()
+        return history
+
+
+def history_path(semester_id: str) -> Path:
+    """Per semester and server: emulator polls never mix with the real server's history."""
+    return Path(catalog_cache_dir) / f"enrollment_{semester_id or 'default'}_{server_tag}.hist"
@@ -0,0 +1,93 @@
+from array import array
+
+UNKNOWN = -1  # sc / lc missing or not a number
+
+
+def lesson_key(lesson_id) -> int | None:
+    """Integer key of a lesson ID given as int or string (config and server use both)."""
+    if isinstance(lesson_id, int):
+        return lesson_id
+    try:
+        return int(str(lesson_id).strip())
+    except ValueError:
+        return None
+
+
+def _count(value) -> int:
+    # API may return numbers as strings
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return UNKNOWN
+    return count if 0 <= count < 2**31 else UNKNOWN
+
+
+class EnrollmentTable:
+    """
+    queryStdCount results ({lessonId: {sc, lc}}) as parallel int columns.
+    Rows are looked up by integer lesson ID, so "12345" from config.toml and
+    12345 from the catalog hit the same row; counts that are missing or
+    non-numeric are stored as UNKNOWN.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.sc = array("i")
+        self.lc = array("i")
+        self._rows: dict[int, int] = {}
+
+    @classmethod
+    def from_counts(cls, counts: dict) -> "EnrollmentTable":
+        table = cls()
+        table.update(counts.items())
+        return table
+
+    def update(self, pairs):
+        """Add or overwrite rows from (lessonId, {"sc": .., "lc": ..}) pairs."""
+        for lesson_id, counts in pairs:
+            key = lesson_key(lesson_id)
+            if key is None:
+                continue
+            if not isinstance(counts, dict):
+                counts = {}
+            sc, lc = _count(counts.get("sc")), _count(counts.get("lc"))
+            row = self._rows.get(key)
+            if row is None:
+                self._rows[key] = len(self.ids)
+                self.ids.append(key)
+                self.sc.append(sc)
+                self.lc.append(lc)
+            else:
+                self.sc[row] = sc
+                self.lc[row] = lc
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, lesson_id) -> bool:
+        return lesson_key(lesson_id) in self._rows
+
+    def row(self, lesson_id) -> int | None:
+        key = lesson_key(lesson_id)
+        return None if key is None else self._rows.get(key)
+
+    def rows(self, lesson_ids, missing: int = -1) -> array:
+        """Row of each lesson ID, `missing` for IDs that are not listed (or not numeric)."""
+        keys = {lesson_id: lesson_key(lesson_id) for lesson_id in set(lesson_ids)}  # Each distinct ID parsed once
+        row_of = {lesson_id: self._rows.get(key, missing) for lesson_id, key in keys.items()}
+        return array("q", map(row_of.__getitem__, lesson_ids))
+
+    def get(self, lesson_id) -> tuple[int, int] | None:
+        """(sc, lc) of a lesson, either possibly UNKNOWN; None if the lesson is not listed."""
+        row = self.row(lesson_id)
+        if row is None:
+            return None
+        return self.sc[row], self.lc[row]
+
+    def has_slot(self, lesson_id) -> bool:
+        """True if the lesson is listed with known counts and sc < lc."""
+        counts = self.get(lesson_id)
+        if counts is None:
+            return False
+        sc, lc = counts
+        return sc != UNKNOWN and lc != UNKNOWN and sc < lc
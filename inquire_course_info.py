@@ -1,161 +1,94 @@
 import asyncio
 import csv
 import os
+import time
 import aiohttp
-import json
-import re
 import warnings
 from urllib3.exceptions import InsecureRequestWarning
 
-from config import headers
+from config import eams_url, headers, catalog_cache_ttl
 from config_loader import INQUIRY_USER_DATA, ENROLLMENT_DATA_API_PARAMS
+from catalog_cache import CatalogCacheEntry, load_catalog_cache, open_catalog_view, save_catalog_cache
+from catalog_store import Course, MergedCatalog
+from course_index import CourseIndex, fuzzy_query, parse_query, sort_key
+from course_parser import STREAM_CHUNK_SIZE, read_literal
+from enrollment_table import UNKNOWN, EnrollmentTable
+from rate_governor import governor_for
 
 from utils import ensure_session_active, build_connector
 
 warnings.simplefilter("ignore", InsecureRequestWarning)
 
 
-def fix_nonstandard_json(data_str: str) -> str:
+async def get_course_data(
+    session: aiohttp.ClientSession,
+    profile_id: str,
+    inquiry_cookies: dict,
+    cached: CatalogCacheEntry | None = None,
+) -> list | None:
     """
-    Normalize JSON-like JS object literals into valid JSON.
-    Scan character by character, distinguishing "inside strings" from "structure":
-      - String contents are preserved verbatim (single quotes unified to double quotes,
-        inner double quotes escaped), so apostrophes, commas, colons in values are not broken;
-      - Only bare identifiers in "key position" get quotes added;
-      - Bare values like true/false/null/numbers are preserved as-is.
+    Fetch and parse the lesson catalog of one profile, and store it in the on-disk cache.
+    With a (stale) `cached` entry the request is conditional; a 304 reuses its courses.
     """
-    out = []
-    i = 0
-    n = len(data_str)
-    stack = []          # Track containing container: '{' or '['
-    expect_key = False  # Whether current position expects an object key
-
-    while i < n:
-        c = data_str[i]
-
-        # String literal: copy verbatim, unify quote style
-        if c == '"' or c == "'":
-            quote = c
-            out.append('"')
-            i += 1
-            while i < n:
-                ch = data_str[i]
-                if ch == "\\" and i + 1 < n:        # Preserve escape sequence
-                    out.append(ch)
-                    out.append(data_str[i + 1])
-                    i += 2
-                    continue
-                if ch == quote:                     # Hit matching closing quote
-                    i += 1
-                    break
-                if ch == '"':                       # Bare double quote inside single-quoted string -> escape
-                    out.append('\\"')
-                    i += 1
-                    continue
-                out.append(ch)
-                i += 1
-            out.append('"')
-            expect_key = False
-            continue
-
-        if c == "{":
-            stack.append("{")
-            out.append(c)
-            expect_key = True
-            i += 1
-            continue
-        if c == "[":
-            stack.append("[")
-            out.append(c)
-            expect_key = False
-            i += 1
-            continue
-        if c == "}" or c == "]":
-            if stack:
-                stack.pop()
-            out.append(c)
-            expect_key = False
-            i += 1
-            continue
-        if c == ",":
-            out.append(c)
-            expect_key = bool(stack) and stack[-1] == "{"
-            i += 1
-            continue
-        if c == ":":
-            out.append(c)
-            expect_key = False
-            i += 1
-            continue
-        if c.isspace():
-            out.append(c)
-            i += 1
-            continue
-
-        # Bare identifier in key position -> add quotes
-        if expect_key and (c.isalpha() or c == "_"):
-            j = i
-            while j < n and (data_str[j].isalnum() or data_str[j] == "_"):
-                j += 1
-            out.append('"' + data_str[i:j] + '"')
-            i = j
-            expect_key = False
-            continue
-
-        # Other bare values (numbers / true / false / null) preserved as-is
-        out.append(c)
-        i += 1
-
-    return "".join(out)
-
-
-def parse_course_json(data_str: str):
-    try:
-        parsed_data = json.loads(data_str)
-        return parsed_data
-    except json.JSONDecodeError:
-        print("Course data is non-standard JSON data! Attempting to fix.")
-        fixed_data = fix_nonstandard_json(data_str)
-        try:
-            parsed_data = json.loads(fixed_data)
-            print("Course data parsed successfully after fixing!")
-            return parsed_data
-        except json.JSONDecodeError as e:
-            print(f"Parsing still failed after attempting to fix: {e}")
-            return None
-
-
-async def get_course_data(session: aiohttp.ClientSession, profile_id: str, inquiry_cookies: dict) -> list | None:
-    url = f"https://jw.shiep.edu.cn/eams/stdElectCourse!data.action?profileId={profile_id}"
+    url = f"{eams_url}!data.action?profileId={profile_id}"
+    request_headers = (headers | cached.conditional_headers()) if cached else headers
+    governor = governor_for(inquiry_cookies, "data")
     try:
+        await governor.acquire()
         async with session.get(
             url=url,
-            headers=headers,
+            headers=request_headers,
             cookies=inquiry_cookies,
             timeout=10,
             ssl=False,
             allow_redirects=False,
         ) as response:
+            governor.feedback_status(response.status)
+            if response.status == 304 and cached is not None:
+                # Unchanged on the server: reuse the cached catalog and restart its TTL
+                cached.fetched_at = time.time()
+                save_catalog_cache(cached)
+                return cached.courses
             response.raise_for_status()
-            raw_data = await response.text(encoding="utf-8")
-            raw_data = raw_data.strip()
-            json_data_match = re.search(r"\[.*\]", raw_data, re.DOTALL)
-            if json_data_match:
-                return parse_course_json(json_data_match.group())
-            else:
+            # Parsed off the event loop so concurrent selection loops keep their timing;
+            # a large catalog chunk by chunk while the body is still downloading
+            courses = await read_literal(response.content.iter_chunked(STREAM_CHUNK_SIZE), "[", response.content_length)
+            if courses is None:
                 print("Failed to retrieve valid JSON course data from response.")
                 return None
+            save_catalog_cache(
+                CatalogCacheEntry(
+                    semester_id=ENROLLMENT_DATA_API_PARAMS.get("semesterId", ""),
+                    profile_id=profile_id,
+                    courses=courses,
+                    fetched_at=time.time(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            )
+            return courses
     except aiohttp.ClientError as e:
         print(f"Failed to retrieve course data due to client error: {e}")
         return None
+    except ValueError as e:
+        print(f"Failed to parse course data: {e}")
+        return None
     except Exception as e:
         print(f"An unexpected error occurred in get_course_data: {e}")
         return None
 
 
-async def get_enrollment_data(session: aiohttp.ClientSession, inquiry_cookies: dict):
-    base_url = "https://jw.shiep.edu.cn/eams/stdElectCourse!queryStdCount.action"
+async def get_enrollment_data(session: aiohttp.ClientSession, inquiry_cookies: dict) -> EnrollmentTable | None:
+    enrollments, _ = await fetch_enrollment_data(session, inquiry_cookies)
+    return enrollments
+
+
+async def fetch_enrollment_data(session: aiohttp.ClientSession, inquiry_cookies: dict) -> tuple[EnrollmentTable | None, bool]:
+    """get_enrollment_data, also telling whether the request was redirected (the session lost its context)."""
+    base_url = f"{eams_url}!queryStdCount.action"
+    governor = governor_for(inquiry_cookies, "queryStdCount")
     try:
+        await governor.acquire()
         async with session.get(
             url=base_url,
             headers=headers,
@@ -165,63 +98,98 @@ async def get_enrollment_data(session: aiohttp.ClientSession, inquiry_cookies: d
             ssl=False,
             allow_redirects=False,
         ) as response:
+            governor.feedback_status(response.status)
+            if 300 <= response.status < 400:
+                print("Enrollment data request was redirected: the inquiry session is not active.")
+                return None, True
             response.raise_for_status()
-            raw_data = await response.text(encoding="utf-8")
-            json_data_match = re.search(r"\{.*\}", raw_data, re.DOTALL)
-            if json_data_match:
-                return parse_course_json(json_data_match.group())
-            else:
+            # {lessonId: {sc, lc}} entries
+            entries = await read_literal(response.content.iter_chunked(STREAM_CHUNK_SIZE), "{", response.content_length)
+            if entries is None:
                 print("Failed to retrieve valid JSON enrollment data from response.")
-                return None
+                return None, False
+            enrollments = EnrollmentTable()
+            enrollments.update(entries)
+            return enrollments, False
     except aiohttp.ClientError as e:
         print(f"Failed to retrieve enrollment data due to client error: {e}")
-        return None
+        return None, False
+    except ValueError as e:
+        print(f"Failed to parse enrollment data: {e}")
+        return None, False
     except Exception as e:
         print(f"An unexpected error occurred in get_enrollment_data: {e}")
-        return None
+        return None, False
 
 
-def filter_courses(courses: list, keyword: str, enrollments: dict):
-    filtered_courses_list = []
-    # Check if keyword is in "key=value" format
-    if "=" in keyword:
-        key, value = keyword.split("=", 1)
-        key = key.strip().lower()
-        value = value.strip().lower()
+def rename_courses(courses: list) -> list[Course]:
+    """Keep only the --inquire fields of raw data.action lessons, as Course records."""
+    return [Course.from_lesson(course) for course in courses]
+
+
+class CourseMatch:
+    """A search result: the course plus its enrollment counts ("N/A" when unknown)."""
+
+    __slots__ = ("course", "enrolled", "limit")
+    FIELDS = ("id", "no", "name", "credits", "type", "teacher", "enrolled", "limit")
+
+    def __init__(self, course, enrolled, limit):
+        self.course = course
+        self.enrolled = enrolled
+        self.limit = limit
+
+    def __getitem__(self, key: str):
+        if key == "enrolled":
+            return self.enrolled
+        if key == "limit":
+            return self.limit
+        return self.course[key]
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self.FIELDS}
+
+
+def filter_courses(courses, keyword: str, enrollments: EnrollmentTable) -> list[CourseMatch]:
+    """
+    Courses matching a keyword (name) or "key=value" query, sorted for display,
+    or the best-ranked matches of a "key~value" pinyin/typo-tolerant query.
+    Pass a CourseIndex to answer from the prebuilt index; any other iterable is scanned.
+    """
+    key, value, fuzzy = parse_query(keyword)
+    if isinstance(courses, CourseIndex):
+        matches = courses.search(keyword)
+    elif fuzzy:  # Ranking needs the gram and pinyin indexes
+        matches = CourseIndex(courses, fields=(key,)).search(keyword)
     else:
-        key = "name"  # Default to searching name
-        value = keyword.lower()
-    for course in courses:
-        search_field = str(course.get(key, "")).lower()
-        if value in search_field:
-            lesson_id = str(course["id"])
-            sc = enrollments.get(lesson_id, {}).get("sc", "N/A")
-            lc = enrollments.get(lesson_id, {}).get("lc", "N/A")
-            filtered_courses_list.append(
-                {
-                    "id": course["id"],
-                    "no": course["no"],
-                    "name": course["name"],
-                    "credits": course["credits"],
-                    "type": course["type"],
-                    "teacher": course["teacher"],
-                    "enrolled": sc,
-                    "limit": lc,
-                }
-            )
+        matches = [course for course in courses if value in str(course.get(key, "")).lower()]
+        matches.sort(key=sort_key)
+
+    filtered_courses_list = []
+    for course in matches:
+        counts = enrollments.get(course["id"]) or (UNKNOWN, UNKNOWN)
+        sc, lc = ("N/A" if count == UNKNOWN else count for count in counts)
+        filtered_courses_list.append(CourseMatch(course, sc, lc))
     return filtered_courses_list
 
 
-async def inquire_course_info():
+async def inquire_course_info(refresh: bool = False):
     connector = build_connector("Inquiry")
 
     async with aiohttp.ClientSession(connector=connector) as session:
-        # !important
-        is_active = await ensure_session_active(session, INQUIRY_USER_DATA)
-        if not is_active:
-            print("\n[!] Error: Failed to activate Inquiry Session.")
-            print("    Please check if INQUIRY_USER_DATA cookies are valid and network is connected.\n")
-            return
+        active = False
+
+        async def activate() -> bool:
+            """Activate the session (!important) before the first request that needs it; cache hits send none."""
+            nonlocal active
+            if not active:
+                active = await ensure_session_active(session, INQUIRY_USER_DATA)
+                if not active:
+                    print("\n[!] Error: Failed to activate Inquiry Session.")
+                    print("    Please check if INQUIRY_USER_DATA cookies are valid and network is connected.\n")
+            return active
 
         inquiry_cookies = INQUIRY_USER_DATA.get("cookies")
 
@@ -235,51 +203,73 @@ async def inquire_course_info():
             print("Error: profileId list cannot be empty.")
             return
 
-        all_courses = []
+        catalogs = []
         print(f"Fetching course data for profileIds: {profile_ids}...")
 
+        semester_id = ENROLLMENT_DATA_API_PARAMS.get("semesterId", "")
         for profile_id in profile_ids:
+            # Fast path: memory-map the columnar copy of a fresh cached catalog
+            view = None if refresh else open_catalog_view(semester_id, profile_id)
+            if view is not None:
+                if view.is_fresh(catalog_cache_ttl):
+                    print(f"Using cached course data for profileId: {profile_id} ({int(view.age)}s old).")
+                    catalogs.append(view)
+                    continue
+                view.close()  # Stale: the file is about to be replaced
+
+            cached = None if refresh else load_catalog_cache(semester_id, profile_id)
+            if cached and cached.is_fresh():
+                print(f"Using cached course data for profileId: {profile_id} ({int(cached.age)}s old).")
+                catalogs.append(rename_courses(cached.courses))
+                continue
+
+            if not await activate():
+                return
             print(f"Fetching course data for profileId: {profile_id}...")
-            courses = await get_course_data(session, profile_id, inquiry_cookies)
+            fetch_started = time.time()
+            courses = await get_course_data(session, profile_id, inquiry_cookies, cached)
             if not courses:
                 print(f"Could not fetch course data for profileId: {profile_id}. Skipping.")
                 continue
-            all_courses.extend(courses)
-
-            if len(profile_ids) > 1:
-                await asyncio.sleep(0.2)
+            view = open_catalog_view(semester_id, profile_id)
+            if view is not None and view.fetched_at >= fetch_started:
+                catalogs.append(view)
+            else:
+                if view is not None:
+                    view.close()
+                catalogs.append(rename_courses(courses))
 
+        # Per-profile catalogs (memory-mapped views or Course lists) searched as one
+        all_courses = MergedCatalog(catalogs)
         if not all_courses:
             print("Could not fetch any course data. Exiting inquiry.")
             return
-
-        # Rename keys in course data
-        key_mapping = {
-            "id": "id",
-            "no": "no",
-            "name": "name",
-            "credits": "credits",
-            "courseTypeName": "type",
-            "teachers": "teacher",
-        }
-        all_courses = [{new_key: course.get(old_key, "") for old_key, new_key in key_mapping.items()} for course in all_courses]
+        course_index = CourseIndex(all_courses)
 
         print("Fetching enrollment data...")
         enrollments = await get_enrollment_data(session, inquiry_cookies)
+        if not enrollments and not active:
+            # The session may need the activation sequence first
+            if not await activate():
+                return
+            enrollments = await get_enrollment_data(session, inquiry_cookies)
         if not enrollments:
             print("Could not fetch enrollment data. Exiting inquiry.")
             return
 
         print("\n--- Course Inquiry Ready ---")
         while True:
-            keyword = input("\nInput course name keyword or 'key=value' to search by field ('q' to quit): ").strip().lower()
+            keyword = input("\nInput course name keyword, 'key=value' to search by field or 'key~value' for fuzzy/pinyin ('q' to quit): ").strip().lower()
             if keyword == "q":
                 print("Exiting course inquiry.")
                 break
 
-            filtered = filter_courses(all_courses, keyword, enrollments)
+            filtered = filter_courses(course_index, keyword, enrollments)
+            if not filtered and "~" not in keyword:
+                filtered = filter_courses(course_index, fuzzy_query(keyword), enrollments)
+                if filtered:
+                    print("No exact match; showing the closest courses instead.")
             if filtered:
-                filtered.sort(key=lambda x: (x["type"], -x["credits"], x["id"]))
                 print("\nThe matching course information is as follows:")
                 for course_item in filtered:
                     print(
@@ -301,7 +291,7 @@ async def inquire_course_info():
                         with open(file_path, "w", newline="", encoding="utf-8-sig") as csvfile:
                             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                             writer.writeheader()
-                            writer.writerows(filtered)
+                            writer.writerows(item.to_dict() for item in filtered)
                         print(f"Successfully exported {len(filtered)} filtered courses to {file_path}\n")
                     except Exception as e:
                         print(f"Error writing to file {file_path}: {str(e)}\n")
@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+from config import catalog_cache_dir, eams_url, limit_model_margin
+
+MODEL_VERSION = 1
+
+
+class EndpointLimit:
+    """At most `quota` accepted requests in any `window` seconds."""
+
+    __slots__ = ("quota", "window")
+
+    def __init__(self, quota: int, window: float):
+        self.quota = max(1, int(quota))
+        self.window = max(0.001, float(window))
+
+    @property
+    def rate(self) -> float:
+        return self.quota / self.window
+
+    def budget(self, margin: float = limit_model_margin) -> tuple[float, float]:
+        """
+        (rate, burst) of a token bucket that stays within the limit: a bucket lets
+        burst + rate * window requests through in any window, and the two together are
+        kept at `margin` of the quota, (1 - margin) of it as burst (at least one request).
+        A quota too small to leave room beyond that one request (margin * quota <= 1)
+        gets a trickle of a tenth of the quota per window on top of it.
+        """
+        allowed = margin * self.quota
+        burst = max(1.0, math.floor((1.0 - margin) * allowed))
+        rate = (allowed - burst if allowed > burst else 0.1 * self.quota) / self.window
+        return rate, burst
+
+    def to_dict(self) -> dict:
+        return {"quota": self.quota, "window": round(self.window, 3)}
+
+    def __repr__(self) -> str:
+        return f"{self.quota}/{self.window:.1f}s"
+
+
+class LimitModel:
+    """
+    Request limits of the server for one account, as measured by analyze_limits.py:
+    a limit per probed endpoint (entry, defaultPage, data, ...) and, when the server
+    counts them together, the shared pool. A shared pool is assumed to cover every
+    endpoint, including the ones that were not probed (batchOperator).
+    """
+
+    def __init__(self, endpoints: dict[str, EndpointLimit], shared: bool = False, pool: EndpointLimit | None = None,
+                 measured_at: float | None = None, base_url: str = ""):
+        self.endpoints = endpoints
+        self.shared = shared and pool is not None
+        self.pool = pool if self.shared else None
+        self.measured_at = time.time() if measured_at is None else measured_at
+        self.base_url = base_url
+
+    def pool_key(self, endpoint: str | None) -> str | None:
+        """The pool an endpoint's requests count against: None for the account-wide one."""
+        if self.shared or endpoint not in self.endpoints:
+            return None
+        return endpoint
+
+    def limit_for(self, endpoint: str | None) -> EndpointLimit | None:
+        if self.shared:
+            return self.pool
+        return self.endpoints.get(endpoint)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_VERSION,
+            "measured_at": self.measured_at,
+            "base_url": self.base_url,
+            "shared": self.shared,
+            "pool": self.pool.to_dict() if self.pool else None,
+            "endpoints": {name: limit.to_dict() for name, limit in self.endpoints.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LimitModel":
+        pool = data.get("pool")
+        return cls(
+            {name: EndpointLimit(limit["quota"], limit["window"]) for name, limit in data.get("endpoints", {}).items()},
+            bool(data.get("shared")),
+            EndpointLimit(pool["quota"], pool["window"]) if pool else None,
+            data.get("measured_at"),
+            data.get("base_url", ""),
+        )
+
+    def describe(self) -> str:
+        endpoints = ", ".join(f"{name} {limit!r}" for name, limit in self.endpoints.items())
+        return f"shared pool {self.pool!r} ({endpoints})" if self.shared else f"independent ({endpoints})"
+
+
+def infer_limit_model(baselines: dict[str, EndpointLimit], cycle_hits: int, cycle_window: float | None = None,
+                      base_url: str = "") -> LimitModel:
+    """
+    The model behind the probe results: `baselines` are the limits of each endpoint hit
+    alone (after a cooldown), `cycle_hits` the requests accepted while cycling over all of
+    them in turn. Independent limits let every endpoint reach its own quota in the cycle,
+    so the cycle takes at least (smallest quota) * endpoints hits; fewer means one pool
+    counted them all, and its quota is the cycle's hits.
+    """
+    if not baselines:
+        return LimitModel({}, base_url=base_url)
+    smallest = min(limit.quota for limit in baselines.values())
+    if cycle_hits >= smallest * len(baselines):
+        return LimitModel(baselines, base_url=base_url)
+    window = cycle_window if cycle_window is not None else max(limit.window for limit in baselines.values())
+    return LimitModel(baselines, True, EndpointLimit(cycle_hits, window), base_url=base_url)
+
+
+def limit_model_path() -> Path:
+    return Path(catalog_cache_dir) / "limit_model.json"
+
+
+def save_limit_model(model: LimitModel, path: Path | None = None) -> bool:
+    path = path or limit_model_path()
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(model.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[Limits] Failed to write {path}: {e}")
+        return False
+    return True
+
+
+def load_limit_model(path: Path | None = None, base_url: str = eams_url) -> LimitModel | None:
+    """The saved model, or None if there is none, it cannot be read or it was measured on another server than `base_url`."""
+    path = path or limit_model_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[Limits] Ignoring unreadable limit model {path}: {e}")
+        return None
+    if data.get("version") != MODEL_VERSION:
+        print(f"[Limits] Ignoring {path}: not a limit model of this version.")
+        return None
+    if data.get("base_url") != base_url:
+        print(f"[Limits] Ignoring {path}: measured on {data.get('base_url') or 'an unknown server'}, not {base_url}. "
+              f"Run analyze_limits.py again to pace by this server's limits.")
+        return None
+    try:
+        return LimitModel.from_dict(data)
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"[Limits] Ignoring malformed limit model {path}: {e}")
+        return None
@@ -0,0 +1,96 @@
+import asyncio
+from collections import deque
+
+from config import loop_lag_interval, loop_lag_monitor
+
+RUN_SAMPLES_KEPT = 100_000  # Samples a --start / --watch monitor keeps for its percentiles
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop responsiveness.
+
+    A background task asks to wake up every `interval` seconds and records how late
+    it actually ran. Anything that blocks the loop (CPU-bound parsing, sync I/O) shows
+    up directly as lag, the same delay every selection coroutine would see.
+    With `keep`, only the latest `keep` samples are kept (long --watch runs); the
+    maximum still covers the whole run.
+
+    Usage:
+        monitor = LoopLagMonitor()
+        monitor.start()
+        ...  # work to observe
+        await monitor.stop()
+        print(monitor.report("Catalog fetch"))
+    """
+
+    def __init__(self, interval: float = 0.01, keep: int | None = None):
+        self.interval = interval
+        self.samples: deque[float] = deque(maxlen=keep)
+        self.worst = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def reset(self):
+        self.samples.clear()
+        self.worst = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            self.worst = max(self.worst, lag)
+
+    @property
+    def max_lag(self) -> float:
+        return self.worst
+
+    @property
+    def mean_lag(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def report(self, title: str = "Event loop") -> str:
+        return (
+            f"{title}: lag max {self.max_lag * 1000:.1f}ms, "
+            f"p99 {self.percentile(99) * 1000:.1f}ms, "
+            f"mean {self.mean_lag * 1000:.2f}ms over {len(self.samples)} samples"
+        )
+
+
+def start_run_monitor() -> LoopLagMonitor | None:
+    """The event-loop monitor of a --start / --watch run, started, if loop_lag_monitor is on (config.py)."""
+    if not loop_lag_monitor:
+        return None
+    monitor = LoopLagMonitor(loop_lag_interval, keep=RUN_SAMPLES_KEPT)
+    monitor.start()
+    return monitor
+
+
+async def stop_run_monitor(monitor: LoopLagMonitor | None):
+    """Stop a start_run_monitor() monitor and print what it measured."""
+    if monitor is None:
+        return
+    await monitor.stop()
+    print(f"\n[Loop] {monitor.report('Event loop')}")
@@ -5,7 +5,12 @@ from main_select_courses import main_select_courses
 from inquire_course_info import inquire_course_info
 from verify_cookie_validity import verify_cookie_validity
 from check_course import check_course
+from watch_courses import watch_courses
+from poll_schedule import report_poll_schedule
+from course_planner import plan_courses
+from selection_journal import report_journal
 from config_loader import add_courses_directly
+from course_parser import shutdown_parse_executor
 
 
 def display_help():
@@ -16,10 +21,15 @@ def display_help():
     print("Commands:")
     print("  --start    : Select courses for all users")
     print("               [--endless] Retry indefinitely until successful")
+    print("               [--watch] Poll enrollment counts and only submit when a seat is free")
     print("  --inquire  : Inquire course info")
+    print("               [--refresh] Ignore the on-disk catalog cache")
     print("  --add      : Add known course IDs to config")
+    print("  --plan     : Plan conflict-free course_ids from each table's ranked wishlist")
     print("  --validate : Batch validate cookie validity")
     print("  --check    : Verify course availability")
+    print("  --schedule : Show the polling schedule --watch learned from enrollment history")
+    print("  --journal  : Summarize the selection outcomes recorded by --start")
     print("  --help     : Show this help message and exit")
 
 
@@ -35,16 +45,26 @@ async def main():
             if len(args) > 2 and args[2].lower() == "--endless":
                 print("Entering ENDLESS mode.")
                 await main_select_courses(endless=True)
+            elif len(args) > 2 and args[2].lower() == "--watch":
+                print("Entering WATCH mode.")
+                await watch_courses()
             else:
                 await main_select_courses()
         case "--inquire":
-            await inquire_course_info()
+            refresh = len(args) > 2 and args[2].lower() == "--refresh"
+            await inquire_course_info(refresh=refresh)
         case "--add":
             add_courses_directly()
+        case "--plan":
+            await plan_courses()
         case "--validate":
             await verify_cookie_validity()
         case "--check":
             await check_course()
+        case "--schedule":
+            report_poll_schedule()
+        case "--journal":
+            report_journal()
         case "--help" | "-h":
             display_help()
         case _:
@@ -58,4 +78,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\nProgram interrupted by user.")
     finally:
+        shutdown_parse_executor()
         print("Exiting application.")
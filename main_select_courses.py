@@ -1,12 +1,19 @@
 import asyncio
 import aiohttp
 import warnings
-from collections import deque
 from tqdm.asyncio import tqdm
 from urllib3.exceptions import InsecureRequestWarning
 
-from config import url, headers, data as base_data_payload, failed_words, error_words
+from config import url, headers, data as base_data_payload, batch_operator_size, prevalidate_courses, selection_journal
 from config_loader import USER_CONFIGS
+from course_validator import build_validator, report_review
+from loop_monitor import start_run_monitor, stop_run_monitor
+from rate_governor import governor_for
+from selection_journal import SelectionJournal, open_journal
+from session_keepalive import SessionKeepalive
+from session_recovery import recovery_for
+from task_scheduler import TaskScheduler
+from response_classifier import Outcome, classify_response, split_operation_results
 
 from utils import ensure_session_active, build_connector
 
@@ -15,6 +22,43 @@ warnings.simplefilter("ignore", InsecureRequestWarning)
 ENDLESS = False
 
 
+def classify_selection_response(status: int, body: bytes, location: str | None = None, charset: str | None = "utf-8") -> tuple[str, str]:
+    """
+    Classify a batchOperator response as "success", "full", "failed", "redirect" or "error",
+    together with the message to print for it. The body is only decoded for messages that quote it.
+    """
+    return describe_outcome(classify_response(status, body, charset), status, body, location, charset)
+
+
+def describe_outcome(outcome: Outcome, status: int, body: bytes, location: str | None = None, charset: str | None = "utf-8") -> tuple[str, str]:
+    """classify_selection_response for a response already classified as `outcome`."""
+    match outcome:
+        case Outcome.SUCCESS:
+            message = "Selection Succeeded!"
+        case Outcome.ALREADY_SELECTED:
+            message = "Already selected."
+        case Outcome.FULL | Outcome.FAILED:
+            message = f"Failed (reason: {_decode(body, charset)})."
+        case Outcome.NOT_OPEN:
+            message = "Failed (error: 操作失败:当前选课不开放)."
+        case Outcome.THROTTLED:
+            message = "Failed (error: 请不要过快点击)."
+        case Outcome.ERROR:
+            message = f"Failed (error: {_decode(body, charset)})."
+        case Outcome.REDIRECT:
+            message = f"Non-200 Status 302. Please check your cookies!!!\nStatus 302 redirecting to {location}"
+        case _:
+            message = f"Non-200 Status {status} (response: {_decode(body, charset)})."
+    return outcome.status, message
+
+
+def _decode(body: bytes, charset: str | None) -> str:
+    try:
+        return body.decode(charset or "utf-8", errors="replace").strip()
+    except LookupError:
+        return body.decode("utf-8", errors="replace").strip()
+
+
 async def attempt_single_course_selection(
     session: aiohttp.ClientSession,
     course_id: str,
@@ -41,36 +85,18 @@ async def attempt_single_course_selection(
     }
 
     profileId = user_params.get("profileId", "N/A")
+    governor = governor_for(user_cookies, "batchOperator")
 
     try:
+        await governor.acquire()
         async with session.post(url, **request_kwargs) as response:
-            response_text = await response.text()
+            body = await response.read()
+            outcome = classify_response(response.status, body, response.charset)  # Once, for the governor and the status
+            governor.feedback_outcome(response.status, outcome)
             print(f"User {user_label} ({profileId}) - Course ID {course_id}: Status {response.status}")
-
-            if response.status == 200:
-                if "已经选过" in response_text or not (any(word in response_text for word in failed_words) or any(word in response_text for word in error_words)):
-                    if "已经选过" in response_text:
-                        print(f"User {user_label} ({profileId}) - Course ID {course_id}: Already selected.\n")
-                    else:
-                        print(f"User {user_label} ({profileId}) - Course ID {course_id}: Selection Succeeded!\n")
-                    return "success"
-                elif any(word in response_text for word in failed_words):
-                    print(f"User {user_label} ({profileId}) - Course ID {course_id}: Failed (reason: {response_text.strip()}).\n")
-                    return "failed"
-                elif "当前选课不开放" in response_text:
-                    print(f"User {user_label} ({profileId}) - Course ID {course_id}: Failed (error: 操作失败:当前选课不开放).\n")
-                elif "过快" in response_text:
-                    print(f"User {user_label} ({profileId}) - Course ID {course_id}: Failed (error: 请不要过快点击).\n")
-                elif any(word in response_text for word in error_words):
-                    print(f"User {user_label} ({profileId}) - Course ID {course_id}: Failed (error: {response_text.strip()}).\n")
-                else:
-                    print(f"User {user_label} ({profileId}) - Course ID {course_id}: 200 OK, outcome unclear (response: {response_text.strip()}).\n")
-            elif response.status == 302:
-                print(f"User {user_label} ({profileId}) - Course ID {course_id}: Non-200 Status 302. Please check your cookies!!!")
-                print(f"Status 302 redirecting to {response.headers.get('Location')}\n")
-                return "redirect"
-            else:
-                print(f"User {user_label} ({profileId}) - Course ID {course_id}: Non-200 Status {response.status} (response: {response_text.strip()}).\n")
+            status, message = describe_outcome(outcome, response.status, body, response.headers.get("Location"), response.charset)
+            print(f"User {user_label} ({profileId}) - Course ID {course_id}: {message}\n")
+            return status
 
     except asyncio.TimeoutError:
         print(f"User {user_label} ({profileId}) - Course ID {course_id}: Request timed out.\n")
@@ -82,7 +108,137 @@ async def attempt_single_course_selection(
     return "error"
 
 
-async def run_loop_for_single_user(user_config: dict):
+def classify_batch_response(
+    status: int, body: bytes, operations: int, location: str | None = None, charset: str | None = "utf-8",
+    outcome: Outcome | None = None,
+) -> list[tuple[str, str]] | None:
+    """
+    (status, message) of each operation of a multi-operation batchOperator response.
+    A response that answers for the whole request (302, not open, throttled, ...) applies
+    to every operation. Returns None if the result lines cannot be matched to the operations.
+    `outcome` is the whole body's classification, if the caller already has it.
+    """
+    lines = split_operation_results(body) if status == 200 else []
+    if len(lines) == operations:
+        return [classify_selection_response(200, line, None, charset) for line in lines]
+    if outcome is None:
+        outcome = classify_response(status, body, charset)
+    if len(lines) <= 1 and outcome not in (Outcome.SUCCESS, Outcome.ALREADY_SELECTED, Outcome.FULL, Outcome.FAILED):
+        return [describe_outcome(outcome, status, body, location, charset)] * operations
+    return None
+
+
+async def attempt_batch_course_selection(
+    session: aiohttp.ClientSession,
+    course_ids: list,
+    user_cookies: dict,
+    user_params: dict,
+    user_label: str,
+) -> list[str] | None:
+    """
+    Select several courses of one profileId in one request (operator0..operatorN-1).
+    Returns the status of each course in order, or None if the response could not be
+    split per course; those courses should then be attempted one by one.
+    """
+    current_data_payload = {key: value for key, value in base_data_payload.items() if not key.startswith("operator")}
+    for i, course_id in enumerate(course_ids):
+        current_data_payload[f"operator{i}"] = f"{course_id}:true:0"
+
+    request_kwargs = {
+        "headers": headers,
+        "cookies": user_cookies,
+        "params": user_params,
+        "data": current_data_payload,
+        "timeout": 1.5,
+        "ssl": False,  # disables SSL cert verification
+        "allow_redirects": False,
+    }
+
+    profileId = user_params.get("profileId", "N/A")
+    joined_ids = ", ".join(map(str, course_ids))
+    governor = governor_for(user_cookies, "batchOperator")
+
+    try:
+        await governor.acquire()
+        async with session.post(url, **request_kwargs) as response:
+            body = await response.read()
+            outcome = classify_response(response.status, body, response.charset)  # Whole body: the governor's feedback
+            governor.feedback_outcome(response.status, outcome)
+            print(f"User {user_label} ({profileId}) - Course IDs {joined_ids}: Status {response.status}")
+            results = classify_batch_response(
+                response.status, body, len(course_ids), response.headers.get("Location"), response.charset, outcome
+            )
+            if results is None:
+                print(f"User {user_label} ({profileId}) - Course IDs {joined_ids}: Could not match the response to the courses "
+                      f"({_decode(body, response.charset)}).\n")
+                return None
+            for course_id, (_, message) in zip(course_ids, results):
+                print(f"User {user_label} ({profileId}) - Course ID {course_id}: {message}")
+            print()
+            return [status for status, _ in results]
+
+    except asyncio.TimeoutError:
+        print(f"User {user_label} ({profileId}) - Course IDs {joined_ids}: Request timed out.\n")
+    except aiohttp.ClientError as e:
+        print(f"User {user_label} ({profileId}) - Course IDs {joined_ids}: Network ClientError: {e}\n")
+    except Exception as e:
+        print(f"User {user_label} ({profileId}) - Course IDs {joined_ids}: Exception: {e}\n")
+
+    return ["error"] * len(course_ids)
+
+
+class CourseSelector:
+    """
+    Sends a user's selection attempts, packing courses of the same profileId into one
+    batchOperator request up to `batch_size`. Once a batch response cannot be split per
+    course, this user falls back to one course per request.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, user_cookies: dict, user_label: str, batch_size: int | None = None):
+        self.session = session
+        self.user_cookies = user_cookies
+        self.user_label = user_label
+        self.batch_size = max(1, batch_operator_size if batch_size is None else batch_size)
+        self.governor = governor_for(user_cookies, "batchOperator")  # Paces this account's selection requests
+        self.requests = 0
+
+    async def select(self, profileId: str, course_ids: list) -> list[str]:
+        """Status of each course; courses beyond batch_size go out in further requests."""
+        statuses = []
+        for start in range(0, len(course_ids), self.batch_size):
+            chunk = course_ids[start:start + self.batch_size]
+            statuses += await self._select_chunk(profileId, chunk)
+            if statuses[-1] == "redirect":  # Neither would the remaining chunks get through
+                return statuses + ["redirect"] * (len(course_ids) - len(statuses))
+        return statuses
+
+    async def _select_chunk(self, profileId: str, course_ids: list) -> list[str]:
+        if len(course_ids) > 1 and self.batch_size > 1:
+            self.requests += 1
+            statuses = await attempt_batch_course_selection(self.session, course_ids, self.user_cookies, {"profileId": profileId}, self.user_label)
+            if statuses is not None:
+                return statuses
+            print(f"[!] User {self.user_label}: Falling back to one course per request.\n")
+            self.batch_size = 1
+
+        statuses = []
+        for course_id in course_ids:
+            self.requests += 1
+            status = await attempt_single_course_selection(
+                session=self.session,
+                course_id=course_id,
+                user_cookies=self.user_cookies,
+                user_params={"profileId": profileId},
+                user_label=self.user_label,
+            )
+            statuses.append(status)
+            if status == "redirect":  # The session is gone: the others would be redirected too
+                statuses += ["redirect"] * (len(course_ids) - len(statuses))
+                break
+        return statuses
+
+
+async def run_loop_for_single_user(user_config: dict, journal: SelectionJournal | None = None):
     user_label = user_config.get("label", "Unknown_User")
     user_cookies = user_config.get("cookies")
     user_tables = user_config.get("tables")
@@ -92,14 +248,14 @@ async def run_loop_for_single_user(user_config: dict):
 
     async with aiohttp.ClientSession(connector=connector) as session:
         # !important
-        is_active = await ensure_session_active(session, user_config)
+        selected = set()
+        is_active = await ensure_session_active(session, user_config, selected)
         if not is_active:
             print(f"\n[!] User {user_label}: Session activation failed (Entry/DefaultPage/Data Error).")
             print("    Skipping all tasks for this user to avoid illegal parameter errors.\n")
             return failed_courses
 
-        task_queue = deque()
-        task_data_map = {}
+        tasks = []
 
         # Interleaved append tasks
         max_length = max(len(table.get("course_ids", [])) for table in user_tables if table.get("profileId")) or 0
@@ -111,59 +267,111 @@ async def run_loop_for_single_user(user_config: dict):
                     print(f"Missing parameter in {user_label}'s table: profileId={profileId}, course_ids={course_ids}")
                     continue
                 if i < len(course_ids):
-                    course_id = course_ids[i]
-                    task_key = (profileId, course_id)
-                    task_data = {
-                        "session": session,
-                        "course_id": course_id,
-                        "user_cookies": user_cookies,
-                        "user_params": {"profileId": profileId},
-                        "user_label": user_label,
-                    }
-                    task_queue.append(task_key)
-                    task_data_map[task_key] = task_data
-
-        if not task_queue:
+                    task_key = (profileId, course_ids[i])
+                    if task_key not in tasks:
+                        tasks.append(task_key)
+
+        def note(task_key: tuple, status: str, detail: str = ""):
+            if journal is not None:
+                journal.record(user_label, task_key[0], task_key[1], status, detail)
+
+        if journal is not None and tasks:
+            # Courses an earlier (crashed or interrupted) run finished are not sent again
+            tasks, finished = journal.resume(user_label, user_tables, tasks)
+            for (profileId, course_id), reason in finished:
+                print(f"[Journal] User {user_label} ({profileId}) - Course ID {course_id}: skipped, {reason}.")
+
+        def give_up(task_key: tuple, status: str = "gave up", detail: str = ""):
+            note(task_key, status, detail)
+            failed_courses.append(
+                {
+                    "user_label": user_label,
+                    "profileId": task_key[0],
+                    "course_id": task_key[1],
+                }
+            )
+
+        validator = None
+        if prevalidate_courses and tasks:
+            # No request is spent on a course the catalog shows cannot be selected
+            validator = await build_validator(session, user_config, selected)
+            if any(validator.check(*task) == "already selected" for task in tasks):
+                # The activation cache may be minutes old: read the selected lessons again before skipping any
+                selected = set()
+                if not await ensure_session_active(session, user_config, selected, force=True):
+                    selected = set()  # Unconfirmed: nothing is skipped as already selected
+                validator.use_selected(selected)
+            tasks, dropped, flagged = validator.review(tasks)
+            report_review(user_label, dropped, flagged)
+            for task_key, reason in dropped:
+                if reason != "already selected":
+                    give_up(task_key, "skipped", reason)
+                else:
+                    note(task_key, "success", reason)
+
+        if not tasks:
             print(f"No valid tasks found for user: {user_label}. Exiting selection process.")
             return failed_courses
 
-        print(f"\nStarting selection for {len(task_queue)} course(s) for user {user_label}...\n")
-
-        while True:
-            task_key = task_queue.popleft()
-            task_data: dict = task_data_map[task_key]
-            status = await attempt_single_course_selection(**task_data)
-            # print(status + "\n")
-
-            match status:
-                case "success":
-                    del task_data_map[task_key]
-                case "failed" | "redirect":
-                    if ENDLESS:
-                        task_queue.append(task_key)
-                    else:
-                        print(f"Failed completely - ({task_key[0]}, {task_key[1]}) of {user_label}")
-                        failed_courses.append(
-                            {
-                                "user_label": user_label,
-                                "profileId": task_key[0],
-                                "course_id": task_key[1],
-                            }
-                        )
-                        del task_data_map[task_key]
-                case "error" | _:
-                    if task_queue:
-                        top_task = task_queue.popleft()
-                        task_queue.appendleft(task_key)
-                        task_queue.appendleft(top_task)
-                    else:
-                        task_queue.append(task_key)
-
-            if task_queue:
-                await asyncio.sleep(0.2)
-            else:
+        print(f"\nStarting selection for {len(tasks)} course(s) for user {user_label}...\n")
+        selector = CourseSelector(session, user_cookies, user_label)
+        scheduler = TaskScheduler.from_tables(user_tables, tasks)
+        recovery = recovery_for(user_cookies)
+
+        while scheduler:
+            for task_key in scheduler.expire():
+                print(f"User {user_label} ({task_key[0]}) - Course ID {task_key[1]}: Deadline passed.")
+                give_up(task_key, "expired")
+
+            batch, wait = scheduler.next_batch(selector.batch_size)
+            if not batch:
+                if scheduler:
+                    await asyncio.sleep(wait)  # Every profile with tasks left is pacing
+                continue
+            throttled_before = selector.governor.throttled
+            generation = recovery.generation
+            statuses = await selector.select(batch[0][0], [course_id for _, course_id in batch])
+            throttled = selector.governor.throttled > throttled_before
+            recovered = None
+            if statuses[0] != "redirect":
+                recovery.alive()
+            if "redirect" in statuses:
+                # One warm-up for the session, however many courses were redirected
+                recovered = await recovery.recover(session, user_config, generation)
+
+            for task_key, status in zip(batch, statuses):
+                note(task_key, status)
+                if status == "redirect":
+                    # Never reached the course: resend it in its place with the re-activated session, or
+                    # behind the others while the warm-up keeps failing
+                    status = "retry" if recovered else "error"
+                requeued, cancelled = scheduler.finish(task_key, status, ENDLESS, throttled)
+                if not requeued and status != "success":
+                    print(f"Failed completely - ({task_key[0]}, {task_key[1]}) of {user_label}")
+                    give_up(task_key)
+                for sibling in cancelled:
+                    print(f"User {user_label} ({sibling[0]}) - Course ID {sibling[1]}: Cancelled, alternative {task_key[1]} selected.")
+                    note(sibling, "cancelled", f"alternative {task_key[1]} selected")
+                if status == "success" and validator is not None:
+                    validator.mark_selected(task_key[1])
+
+            if recovery.dead:
+                # The cookies have expired: nothing of this user can succeed any more
+                for task_key in list(scheduler):
+                    scheduler.remove(task_key)
+                    print(f"Failed completely - ({task_key[0]}, {task_key[1]}) of {user_label}")
+                    give_up(task_key, "gave up", "session expired")
                 break
 
+            if validator is not None and "success" in statuses:
+                # Courses clashing with what was just selected can no longer succeed
+                impossible = validator.impossible(scheduler)
+                report_review(user_label, impossible)
+                for task_key, reason in impossible:
+                    scheduler.remove(task_key)
+                    if reason != "already selected":
+                        give_up(task_key, "skipped", reason)
+
     print(f"User {user_label} - Course selection processes has concluded.")
     return failed_courses
 
@@ -178,6 +386,7 @@ async def main_select_courses(endless=False):
 
     peer_selection_tasks = []
     print("Preparing course selection tasks for all users...")
+    journal = open_journal() if selection_journal else None
 
     for peer_config in USER_CONFIGS:
         if not peer_config.get("cookies") or not peer_config.get("tables"):
@@ -186,11 +395,20 @@ async def main_select_courses(endless=False):
             continue
 
         peer_selection_tasks.append(
-            run_loop_for_single_user(peer_config),
+            run_loop_for_single_user(peer_config, journal),
         )
 
     print(f"\nStarting selection for {len(peer_selection_tasks)} user(s)...\n")
-    per_user_results = await tqdm.gather(*peer_selection_tasks, desc="Total Course Selection Progress")
+    keepalive = SessionKeepalive(USER_CONFIGS)  # Keeps idle sessions warm, warns before they expire
+    keepalive.start()
+    monitor = start_run_monitor()
+    try:
+        per_user_results = await tqdm.gather(*peer_selection_tasks, desc="Total Course Selection Progress")
+    finally:
+        await stop_run_monitor(monitor)
+        await keepalive.stop()
+        if journal is not None:
+            journal.close()
 
     # Aggregate failed course lists from all users (early-exit users return empty list)
     failed_courses = [failure for user_failures in per_user_results for failure in (user_failures or [])]
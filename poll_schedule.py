@@ -0,0 +1,186 @@
+import time
+
+from config import (
+    watch_interval,
+    watch_interval_min,
+    watch_interval_max,
+    watch_churn_half_life,
+    watch_burst_window,
+)
+from config_loader import USER_CONFIGS, ENROLLMENT_DATA_API_PARAMS
+from enrollment_history import EnrollmentDiff, EnrollmentHistory, history_path
+from enrollment_table import lesson_key
+
+# Aim for this many expected sc/lc changes of a profile's lessons between two polls
+CHANGES_PER_POLL = 0.5
+# Seconds of made-up observation at the rate watch_interval is tuned for: without this,
+# the first quiet poll would estimate zero churn and jump straight to watch_interval_max
+PRIOR_EXPOSURE = 60.0
+
+
+class LessonChurn:
+    """Change record of one watched lesson."""
+
+    __slots__ = ("events", "changes", "last_change")
+
+    def __init__(self):
+        self.events = 0.0  # Changes, discounted by age
+        self.changes = 0  # Changes seen in total
+        self.last_change: float | None = None
+
+
+class PollSchedule:
+    """
+    Learns how often sc / lc of the watched lessons change and derives a polling interval
+    per profile from it: quiet profiles are polled rarely (up to `maximum` seconds apart),
+    busy ones often, and right after one of a profile's lessons changed it is polled every
+    `minimum` seconds for `burst_window` seconds.
+    Churn is a Poisson rate estimate where older observations count less (halved every
+    `half_life` seconds).
+    """
+
+    def __init__(
+        self,
+        lesson_ids,
+        default: float = watch_interval,
+        minimum: float = watch_interval_min,
+        maximum: float = watch_interval_max,
+        half_life: float = watch_churn_half_life,
+        burst_window: float = watch_burst_window,
+    ):
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.half_life = half_life
+        self.burst_window = burst_window
+        self.lessons: dict[int, LessonChurn] = {}
+        for lesson_id in lesson_ids:
+            key = lesson_key(lesson_id)
+            if key is not None:
+                self.lessons.setdefault(key, LessonChurn())
+        self.exposure = 0.0  # Seconds observed, discounted like the events
+        self.observed = 0.0  # Seconds observed in total
+        self.polls = 0
+        self.last_poll: float | None = None
+
+    def observe(self, diff: EnrollmentDiff, taken_at: float):
+        """Account one poll: `diff` against the previous one, taken at `taken_at`."""
+        self.polls += 1
+        self.last_poll = taken_at
+        interval = diff.interval
+        if interval <= 0:
+            return
+        decay = 0.5 ** (interval / self.half_life)
+        for churn in self.lessons.values():
+            churn.events *= decay
+        if interval > 4 * self.maximum:
+            # A gap in the history (watch mode was not running): it only ages what was learned
+            self.exposure *= decay
+            return
+        self.exposure = self.exposure * decay + interval
+        self.observed += interval
+        for lesson_id in diff.changed:
+            churn = self.lessons.get(lesson_id)
+            if churn is not None:
+                churn.events += 1
+                churn.changes += 1
+                churn.last_change = taken_at
+
+    def rate(self, course_ids) -> float:
+        """Estimated sc / lc changes per second over the given lessons."""
+        events = sum(self.lessons[key].events for key in map(lesson_key, course_ids) if key in self.lessons)
+        prior_events = CHANGES_PER_POLL / self.default * PRIOR_EXPOSURE
+        return (events + prior_events) / (self.exposure + PRIOR_EXPOSURE)
+
+    def interval_for(self, course_ids, now: float | None = None) -> float:
+        """Seconds to wait before polling again for these lessons."""
+        now = time.time() if now is None else now
+        for key in map(lesson_key, course_ids):
+            churn = self.lessons.get(key)
+            if churn is not None and churn.last_change is not None and now - churn.last_change < self.burst_window:
+                return self.minimum
+        rate = self.rate(course_ids)
+        if rate <= 0:
+            return self.maximum
+        return min(self.maximum, max(self.minimum, CHANGES_PER_POLL / rate))
+
+    def plan(self, profiles: dict[str, list], now: float | None = None) -> dict[str, float]:
+        """{profileId: interval} for profiles with lessons left to watch."""
+        now = time.time() if now is None else now
+        return {profileId: self.interval_for(course_ids, now) for profileId, course_ids in profiles.items() if course_ids}
+
+    def next_interval(self, profiles: dict[str, list], now: float | None = None) -> float:
+        """
+        queryStdCount returns every lesson at once, so one poll serves all profiles:
+        the profile that is due first decides when to poll next.
+        """
+        return min(self.plan(profiles, now).values(), default=self.default)
+
+    @classmethod
+    def from_history(cls, history: EnrollmentHistory, lesson_ids, **kwargs) -> "PollSchedule":
+        """Replay the snapshots kept by a history."""
+        schedule = cls(lesson_ids, **kwargs)
+        for i in range(1, len(history.snapshots)):
+            schedule.observe(history.diff(i - 1, i), history.snapshots[i].taken_at)
+        return schedule
+
+
+def watched_profiles(user_configs: list) -> dict[str, list]:
+    """{profileId: course_ids} over all users, in config order."""
+    profiles: dict[str, list] = {}
+    for user_config in user_configs:
+        for table in user_config.get("tables", []):
+            profileId = table.get("profileId")
+            if profileId:
+                course_ids = profiles.setdefault(profileId, [])
+                course_ids += [c for c in table.get("course_ids", []) if c not in course_ids]
+    return profiles
+
+
+def _ago(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s ago"
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.0f} min ago"
+    return f"{seconds / 3600:.1f} h ago"
+
+
+def report_poll_schedule(user_configs: list | None = None):
+    """Print the polling schedule --start --watch would use, learned from the recorded history."""
+    user_configs = USER_CONFIGS if user_configs is None else user_configs
+    profiles = watched_profiles(user_configs)
+    if not profiles:
+        print("No courses configured in USER_CONFIGS.")
+        return
+
+    path = history_path(ENROLLMENT_DATA_API_PARAMS.get("semesterId", ""))
+    history = EnrollmentHistory.load(path, read_only=True)  # A running --watch may be appending to it
+    lesson_ids = [course_id for course_ids in profiles.values() for course_id in course_ids]
+    schedule = PollSchedule.from_history(history, lesson_ids)
+    now = time.time()
+
+    if len(history) < 2:
+        print(f"Not enough enrollment history in {path} yet (run --start --watch first).")
+        print(f"Every profile is polled every {schedule.default}s until churn has been observed.\n")
+    else:
+        span = history.snapshots[-1].taken_at - history.snapshots[0].taken_at
+        print(f"Polling schedule learned from {len(history)} snapshots ({span / 60:.0f} min of history, "
+              f"{schedule.observed / 60:.0f} min observed, last {_ago(now - history.snapshots[-1].taken_at)}):\n")
+
+    plan = schedule.plan(profiles, now)
+    for profileId, course_ids in profiles.items():
+        if not course_ids:
+            continue
+        print(f"Profile {profileId}: {len(course_ids)} course(s), {schedule.rate(course_ids) * 3600:.1f} changes/h "
+              f"-> poll every {plan[profileId]:.1f}s")
+        for course_id in course_ids:
+            churn = schedule.lessons.get(lesson_key(course_id))
+            if churn is None:
+                print(f"  Course ID {course_id}: not a lesson ID")
+                continue
+            last = f", last {_ago(now - churn.last_change)}" if churn.last_change is not None else ""
+            counts = history.counts(course_id)
+            seats = f", {counts[0]}/{counts[1]}" if counts else ""
+            print(f"  Course ID {course_id}: {churn.changes} change(s){last}{seats}")
+    if plan:
+        print(f"\nNext poll interval: {min(plan.values()):.1f}s (queryStdCount serves every profile at once).")
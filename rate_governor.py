@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+from config import governor_burst, governor_decrease, governor_increase, governor_rate, governor_rate_max, governor_rate_min
+from limit_model import EndpointLimit, LimitModel, load_limit_model
+from response_classifier import Outcome
+
+# HTTP statuses the server uses to say "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+
+class RateGovernor:
+    """
+    Paces the requests of one account with a token bucket of `burst` tokens refilled at
+    `rate` per second. The rate adapts AIMD-style to the server: each throttled response
+    ("过快", 429/503) multiplies it by `decrease` (at most once per request interval, so the
+    replies of one burst count once) and empties the bucket; each accepted response adds
+    `increase` / rate, about `increase` requests/s per second of accepted traffic.
+    Waiting callers reserve their token up front, so they are served first come first served.
+    """
+
+    def __init__(
+        self,
+        rate: float = governor_rate,
+        burst: float = governor_burst,
+        minimum: float = governor_rate_min,
+        maximum: float = governor_rate_max,
+        increase: float = governor_increase,
+        decrease: float = governor_decrease,
+        clock=time.monotonic,
+    ):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.rate = min(max(rate, self.minimum), self.maximum)
+        self.burst = max(1.0, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.last_decrease = float("-inf")
+        self.requests = 0
+        self.throttled = 0
+
+    @classmethod
+    def within(cls, limit: EndpointLimit) -> "RateGovernor":
+        """A governor that never leaves the budget of a measured limit (see EndpointLimit.budget)."""
+        rate, burst = limit.budget()
+        maximum = min(governor_rate_max, rate)
+        return cls(rate=min(governor_rate, maximum), burst=burst, minimum=min(governor_rate_min, maximum), maximum=maximum)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before sending (0 when one was available)."""
+        now = self.clock()
+        self._refill(now)
+        self.tokens -= 1.0
+        self.requests += 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        """Wait for this account's turn to send a request."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        self.rate = min(self.maximum, self.rate + self.increase / self.rate)
+
+    def on_throttle(self):
+        now = self.clock()
+        self.throttled += 1
+        if now - self.last_decrease < 1.0 / self.rate:
+            return  # Same burst as the last decrease
+        self._refill(now)
+        self.rate = max(self.minimum, self.rate * self.decrease)
+        self.tokens = min(self.tokens, 0.0)
+        self.last_decrease = now
+
+    def feedback(self, throttled: bool):
+        if throttled:
+            self.on_throttle()
+        else:
+            self.on_success()
+
+    def feedback_status(self, status: int, page: str = ""):
+        """Feedback from a response: a throttle status or a "过快" page slows this account down."""
+        self.feedback(status in THROTTLE_STATUSES or "过快" in page)
+
+    def feedback_outcome(self, status: int, outcome: Outcome):
+        """Feedback from a classified batchOperator response: a throttle status or a throttled outcome."""
+        self.feedback(status in THROTTLE_STATUSES or outcome is Outcome.THROTTLED)
+
+
+# One governor per account (cookie set) and pool, shared by every request path of the process
+GOVERNORS: dict[tuple, RateGovernor] = {}
+LIMIT_MODEL: LimitModel | None = None
+_model_loaded = False
+
+
+def limit_model() -> LimitModel | None:
+    """The measured limit model (.cache/limit_model.json), loaded on first use."""
+    global LIMIT_MODEL, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        LIMIT_MODEL = load_limit_model()
+        if LIMIT_MODEL is not None:
+            print(f"[Limits] Pacing requests by the measured limits: {LIMIT_MODEL.describe()}")
+    return LIMIT_MODEL
+
+
+def use_limit_model(model: LimitModel | None):
+    """Pace by `model` instead of the saved one (None: no model); resets every governor."""
+    global LIMIT_MODEL, _model_loaded
+    LIMIT_MODEL, _model_loaded = model, True
+    GOVERNORS.clear()
+
+
+def governor_key(cookies: dict | None, endpoint: str | None = None) -> tuple:
+    model = limit_model()
+    return tuple(sorted((cookies or {}).items())), model.pool_key(endpoint) if model else None
+
+
+def governor_for(cookies: dict | None, endpoint: str | None = None) -> RateGovernor:
+    """The governor of an account's requests to `endpoint` (entry, defaultPage, data, queryStdCount, batchOperator)."""
+    key = governor_key(cookies, endpoint)
+    governor = GOVERNORS.get(key)
+    if governor is None:
+        model = limit_model()
+        limit = model.limit_for(endpoint) if model else None
+        governor = GOVERNORS[key] = RateGovernor.within(limit) if limit else RateGovernor()
+    return governor
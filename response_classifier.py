@@ -0,0 +1,146 @@
+import re
+from enum import Enum
+
+from config import already_selected_words, error_words, failed_words, full_words, not_open_words, throttle_words
+
+
+class Outcome(Enum):
+    """What a batchOperator response means for the selection attempt."""
+
+    SUCCESS = "success"
+    ALREADY_SELECTED = "already selected"
+    FULL = "full"  # No seat left: one may free up later
+    FAILED = "failed"  # Credit limit, time conflict: retrying cannot help
+    NOT_OPEN = "not open"
+    THROTTLED = "throttled"
+    ERROR = "error"
+    REDIRECT = "redirect"  # 302: session expired or cookies invalid
+    HTTP_ERROR = "http error"
+
+    @property
+    def status(self) -> str:
+        """The run-loop status: "success", "full", "failed", "redirect" or "error"."""
+        if self in (Outcome.SUCCESS, Outcome.ALREADY_SELECTED):
+            return "success"
+        if self in (Outcome.FULL, Outcome.FAILED, Outcome.REDIRECT):
+            return self.value
+        return "error"
+
+
+# Marker groups, highest precedence first; a 200 response with no marker is a success
+_PRECEDENCE = (Outcome.ALREADY_SELECTED, Outcome.FULL, Outcome.FAILED, Outcome.NOT_OPEN, Outcome.THROTTLED, Outcome.ERROR)
+# Above this size the C substring search beats the regex scan: markers are then looked up one by one
+LARGE_BODY = 2048
+
+# Outcome for every combination of matched groups (bit i == _PRECEDENCE[i]): the lowest set bit wins
+_OUTCOME_BY_MASK = [Outcome.SUCCESS] + [_PRECEDENCE[(m & -m).bit_length() - 1] for m in range(1, 1 << len(_PRECEDENCE))]
+
+
+class ResponseClassifier:
+    """
+    Classifies batchOperator responses in a single scan of the raw body.
+    All markers are compiled into one alternation regex, longest first; markers contained
+    in a longer one (e.g. "过快" in "过快点击") are credited when the longer one matches.
+    Bodies are matched as bytes, with the markers encoded in the response charset.
+    Bodies above LARGE_BODY bytes are searched marker by marker in precedence order instead,
+    which gives the same outcome and is faster for them.
+    """
+
+    def __init__(self, markers: dict[Outcome, list[str]]):
+        self.markers = {outcome: list(markers.get(outcome, ())) for outcome in _PRECEDENCE}
+        self._patterns: dict[str | None, tuple] = {}
+
+    @classmethod
+    def from_config(cls) -> "ResponseClassifier":
+        return cls(
+            {
+                Outcome.ALREADY_SELECTED: already_selected_words,
+                Outcome.FULL: full_words,
+                Outcome.FAILED: failed_words,
+                Outcome.NOT_OPEN: not_open_words,
+                Outcome.THROTTLED: throttle_words,
+                Outcome.ERROR: error_words,
+            }
+        )
+
+    def _compile(self, charset: str) -> tuple:
+        """
+        For one charset: the pattern, {encoded marker: bit mask of its groups}
+        and the encoded markers per group in precedence order.
+        """
+        masks: dict[bytes, int] = {}
+        ordered = []
+        for bit, outcome in enumerate(_PRECEDENCE):
+            encoded_words = tuple(word.encode(charset) for word in self.markers[outcome])
+            ordered.append((outcome, encoded_words))
+            for encoded in encoded_words:
+                masks[encoded] = masks.get(encoded, 0) | (1 << bit)
+        # A match hides the markers inside it (e.g. "过快" in "过快点击"): fold their groups in
+        for encoded in list(masks):
+            for other, mask in masks.items():
+                if other in encoded:
+                    masks[encoded] |= mask
+        # A marker may also start inside another one's match ("已经选过" + "过快"); that only
+        # matters if the first one does not already decide the outcome (the top group does)
+        overlapping = any(
+            encoded.endswith(other[:i])
+            for encoded, mask in masks.items() if not mask & 1
+            for other in masks if other not in encoded
+            for i in range(1, min(len(encoded), len(other)))
+        )
+        alternation = b"|".join(re.escape(m) for m in sorted(masks, key=len, reverse=True))
+        if overlapping:  # Match at every position instead (slower, rarely needed)
+            return re.compile(b"(?=(" + alternation + b"))"), masks, ordered
+        return re.compile(b"(" + alternation + b")"), masks, ordered
+
+    def _compile_for(self, charset: str | None) -> tuple:
+        try:
+            return self._compile((charset or "utf-8").lower())
+        except (LookupError, UnicodeEncodeError):  # Unknown charset: assume UTF-8
+            return self._compile("utf-8")
+
+    def classify(self, status: int, body: bytes, charset: str | None = "utf-8") -> Outcome:
+        if status == 302:
+            return Outcome.REDIRECT
+        if status != 200:
+            return Outcome.HTTP_ERROR
+
+        compiled = self._patterns.get(charset)
+        if compiled is None:
+            compiled = self._patterns[charset] = self._compile_for(charset)
+        pattern, masks, ordered = compiled
+
+        if len(body) > LARGE_BODY:
+            for outcome, encoded_words in ordered:
+                for encoded in encoded_words:
+                    if encoded in body:
+                        return outcome
+            return Outcome.SUCCESS
+
+        found = 0
+        for marker in pattern.findall(body):
+            found |= masks[marker]
+        return _OUTCOME_BY_MASK[found]
+
+
+# batchOperator answers each operation on its own line: "<name> 选课成功</br>"
+_RESULT_SEPARATOR = re.compile(rb"<br\s*/?>|</br>", re.IGNORECASE)
+_TAG = re.compile(rb"<[^>]*>")
+
+
+def split_operation_results(body: bytes) -> list[bytes]:
+    """The per-operation result lines of a batchOperator response, in operation order, without markup."""
+    lines = []
+    for part in _RESULT_SEPARATOR.split(body):
+        text = _TAG.sub(b"", part).strip()
+        if text:
+            lines.append(text)
+    return lines
+
+
+default_classifier = ResponseClassifier.from_config()
+
+
+def classify_response(status: int, body: bytes, charset: str | None = "utf-8") -> Outcome:
+    """Classify a batchOperator response with the markers configured in config.py."""
+    return default_classifier.classify(status, body, charset)
@@ -0,0 +1,239 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from config import catalog_cache_dir, selection_journal_sync, server_tag
+from config_loader import ENROLLMENT_DATA_API_PARAMS
+from task_scheduler import TableOptions
+
+# Last statuses after which a course is never sent again
+DONE = ("success", "cancelled")
+# The file is rewritten with one record per course once it holds COMPACT_RATIO times as many records
+# (and at least COMPACT_MIN): endless retries would otherwise grow it without bound
+COMPACT_RATIO = 4
+COMPACT_MIN = 1024
+
+
+class JournalEntry:
+    """Outcome so far of one (user, profileId, course_id)."""
+
+    __slots__ = ("status", "detail", "attempts", "first_at", "last_at")
+
+    def __init__(self, at: float):
+        self.status = ""
+        self.detail = ""
+        self.attempts = 0
+        self.first_at = at
+        self.last_at = at
+
+
+class SelectionJournal:
+    """
+    Append-only JSONL log of selection outcomes, one record per attempt or decision:
+        {"t": epoch, "user": label, "profileId": .., "course_id": .., "status": .., "detail": ..}
+    Status is a run-loop status ("success", "full", "failed", "redirect", "error") or one of
+    "gave up", "cancelled" (an alternative was selected), "skipped" (pre-check) and "expired".
+    Each record is handed to the OS as it is written, so a crashed process loses nothing;
+    fsync is batched every `sync_every` records (and on close) against power loss.
+    Compaction rewrites the file with the last record of each course, carrying its
+    "attempts" and "first" (time of the first record) along.
+    """
+
+    def __init__(self, path: Path | None = None, sync_every: int = selection_journal_sync):
+        self.path = Path(path) if path else None
+        self.sync_every = max(1, sync_every)
+        self.entries: dict[tuple[str, str, str], JournalEntry] = {}
+        self._file = None
+        self._unsynced = 0
+        self.records = 0  # Records in the file
+
+    def __enter__(self) -> "SelectionJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _apply(self, record: dict):
+        key = (str(record["user"]), str(record["profileId"]), str(record["course_id"]))
+        at = float(record.get("t", 0.0))
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = JournalEntry(at)
+        entry.status = record["status"]
+        entry.detail = record.get("detail", "")
+        entry.last_at = at
+        if "attempts" in record:  # Compacted
+            entry.attempts = int(record["attempts"])
+            entry.first_at = float(record.get("first", at))
+        elif entry.status in ("success", "full", "failed", "redirect", "error"):
+            entry.attempts += 1
+
+    def record(self, user: str, profileId: str, course_id, status: str, detail: str = ""):
+        record = {"t": round(time.time(), 3), "user": user, "profileId": profileId, "course_id": str(course_id), "status": status}
+        if detail:
+            record["detail"] = detail
+        self._apply(record)
+        if self.path is None:
+            return
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            self.records += 1
+            if self._unsynced >= self.sync_every:
+                self.sync()
+        except OSError as e:
+            print(f"[Journal] Failed to write {self.path}: {e}")
+            self.path = None  # Keep recording in memory only
+            return
+        if self.records >= max(COMPACT_MIN, COMPACT_RATIO * len(self.entries)):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file with one record per course (its last status), atomically."""
+        if self.path is None:
+            return
+        self.close()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for (user, profileId, course_id), entry in self.entries.items():
+                    record = {"t": entry.last_at, "user": user, "profileId": profileId, "course_id": course_id,
+                              "status": entry.status, "attempts": entry.attempts, "first": entry.first_at}
+                    if entry.detail:
+                        record["detail"] = entry.detail
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Journal] Failed to compact {self.path}: {e}")
+            return
+        self.records = len(self.entries)
+
+    def sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self.sync()
+                self._file.close()
+            except OSError as e:
+                print(f"[Journal] Failed to write {self.path}: {e}")
+            self._file = None
+
+    def get(self, user: str, profileId: str, course_id) -> JournalEntry | None:
+        return self.entries.get((user, str(profileId), str(course_id)))
+
+    def resume(self, user: str, user_tables: list, tasks: list[tuple]) -> tuple[list[tuple], list[tuple]]:
+        """
+        Split a user's (profileId, course_id) tasks into the outstanding ones and (task, reason)
+        of those finished by an earlier run: selected, or an alternative of a selected course.
+        """
+        options = {table.get("profileId"): TableOptions(table) for table in user_tables if table.get("profileId")}
+        done_groups = {}
+        for profileId, course_id in tasks:
+            table_options = options.get(profileId)
+            group = table_options.group_of(course_id) if table_options else None
+            entry = self.get(user, profileId, course_id)
+            if group is not None and entry is not None and entry.status == "success":
+                done_groups[group] = course_id
+
+        kept, skipped = [], []
+        for task in tasks:
+            profileId, course_id = task
+            entry = self.get(user, profileId, course_id)
+            table_options = options.get(profileId)
+            group = table_options.group_of(course_id) if table_options else None
+            if entry is not None and entry.status == "success":
+                skipped.append((task, "selected in an earlier run"))
+            elif group in done_groups:
+                skipped.append((task, f"alternative {done_groups[group]} selected in an earlier run"))
+            elif entry is not None and entry.status == "cancelled":
+                skipped.append((task, "cancelled in an earlier run"))
+            else:
+                kept.append(task)
+        return kept, skipped
+
+    @classmethod
+    def load(cls, path: Path, sync_every: int = selection_journal_sync, read_only: bool = False) -> "SelectionJournal":
+        """
+        Replay a journal file; a missing file is empty and an interrupted last line is dropped.
+        With `read_only` the file is only read: never truncated or compacted (a running --start
+        may be appending to it), and the journal records in memory only.
+        """
+        journal = cls(None if read_only else path, sync_every)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return journal
+        except OSError as e:
+            print(f"[Journal] Failed to read {path}: {e}")
+            journal.path = None  # Do not append to a file that could not be replayed
+            return journal
+
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            journal.records += 1
+            try:
+                journal._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                print(f"[Journal] Ignoring malformed record in {path}: {line[:80]!r}")
+        if read_only:
+            return journal
+        if end < len(data):
+            # Drop the partial record so later appends stay readable
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        if journal.records >= max(COMPACT_MIN, COMPACT_RATIO * len(journal.entries)):
+            journal.compact()
+        return journal
+
+
+def journal_path(semester_id: str) -> Path:
+    """Per semester and server: a run against an emulator never marks courses of the real server done."""
+    return Path(catalog_cache_dir) / f"selection_{semester_id or 'default'}_{server_tag}.jsonl"
+
+
+def open_journal() -> SelectionJournal:
+    """The journal of the configured semester, replayed and ready to append to."""
+    return SelectionJournal.load(journal_path(ENROLLMENT_DATA_API_PARAMS.get("semesterId", "")))
+
+
+def report_journal():
+    """Print the last outcome of every course in the journal, per user and profile."""
+    path = journal_path(ENROLLMENT_DATA_API_PARAMS.get("semesterId", ""))
+    journal = SelectionJournal.load(path, read_only=True)  # A running --start may be appending to it
+    if not journal.entries:
+        print(f"No selection recorded in {path}.")
+        return
+
+    by_user: dict[str, list] = {}
+    for (user, profileId, course_id), entry in journal.entries.items():
+        by_user.setdefault(user, []).append((profileId, course_id, entry))
+
+    print(f"\n--- Selection Journal ({path}) ---")
+    for user, rows in by_user.items():
+        done = sum(entry.status in DONE for _, _, entry in rows)
+        print(f"\n{user}: {done} of {len(rows)} course(s) done")
+        print(f"  {'Profile':<10}  {'Course ID':<12}  {'Status':<10}  {'Attempts':>8}  {'Last':<19}  Detail")
+        for profileId, course_id, entry in sorted(rows, key=lambda row: (row[0], row[1])):
+            last = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.last_at))
+            print(f"  {profileId:<10}  {course_id:<12}  {entry.status:<10}  {entry.attempts:>8}  {last:<19}  {entry.detail}")
+
+    statuses: dict[str, int] = {}
+    for entry in journal.entries.values():
+        statuses[entry.status] = statuses.get(entry.status, 0) + 1
+    print("\nLast status: " + ", ".join(f"{status} {count}" for status, count in sorted(statuses.items())))
+    print()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import aiohttp
+
+from config import eams_url, headers, session_expiry_warning, session_keepalive, session_keepalive_interval
+from activation_cache import activation_cache, session_key
+from rate_governor import governor_for
+from session_lifetimes import format_duration, session_lifetimes
+from utils import build_connector
+
+
+class SessionKeepalive:
+    """
+    Background upkeep of the user sessions of a --start / --watch run.
+
+    Every `tick` seconds each session is checked. With `ping`, one that has not been seen
+    working for `interval` seconds gets a single entry page request (no redirects followed,
+    paced by the account's governor): 200 keeps it warm, a redirect means the cookies
+    expired. A session whose predicted expiry (SessionLifetimes) is less than `warning`
+    seconds away is reported once, so the cookies can be refreshed before selections fail.
+
+    Usage:
+        keepalive = SessionKeepalive(USER_CONFIGS)
+        keepalive.start()
+        ...  # selection or watch run
+        await keepalive.stop()
+    """
+
+    def __init__(self, user_configs: list, interval: float = session_keepalive_interval, warning: float = session_expiry_warning,
+                 ping: bool = session_keepalive):
+        users = {}
+        for user_config in user_configs:
+            cookies = user_config.get("cookies")
+            if cookies:
+                users.setdefault(session_key(cookies), (user_config.get("label", "Unknown"), cookies))
+        self.users = list(users.values())
+        self.interval = max(1e-3, interval)
+        self.warning = warning
+        self.ping = ping
+        self.tick = min(self.interval if ping else warning, 120.0) / 2
+        self.pings = 0
+        self.expired: set[str] = set()  # Labels of the sessions found expired
+        self.warned: set[str] = set()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None and self.users and self.tick > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        session_lifetimes().save()
+
+    async def _run(self):
+        lifetimes = session_lifetimes()
+        async with aiohttp.ClientSession(connector=build_connector("Keepalive")) as session:
+            while True:
+                await asyncio.sleep(self.tick)
+                for label, cookies in self.users:
+                    if label in self.expired:
+                        continue
+                    last_seen = lifetimes.last_seen(cookies)
+                    if self.ping and (last_seen is None or time.time() - last_seen >= self.interval):
+                        await self._ping(session, label, cookies)
+                    self._check(label, cookies)
+                lifetimes.save()
+
+    async def _ping(self, session: aiohttp.ClientSession, label: str, cookies: dict):
+        governor = governor_for(cookies, "entry")
+        await governor.acquire()
+        try:
+            async with session.get(f"{eams_url}.action", headers=headers, cookies=cookies, ssl=False, timeout=5, allow_redirects=False) as r:
+                status = r.status
+                page = await r.text()
+                governor.feedback_status(status, page)
+        except Exception as e:
+            print(f"[Keepalive] {label}: ping failed: {e}")
+            return
+        self.pings += 1
+        if 300 <= status < 400:
+            self.expired.add(label)
+            lifetime = session_lifetimes().expired(cookies)
+            activation_cache().invalidate(cookies)
+            lasted = f" after {format_duration(lifetime)}" if lifetime else ""
+            print(f"[Session] {label}: the cookies have expired{lasted}. Update them in config.toml.")
+        elif status == 200 and "过快" not in page:
+            session_lifetimes().seen(cookies)
+
+    def _check(self, label: str, cookies: dict):
+        if label in self.warned or label in self.expired:
+            return
+        lifetimes = session_lifetimes()
+        remaining = lifetimes.remaining(cookies)
+        if remaining is None or remaining > self.warning:
+            return
+        self.warned.add(label)
+        when = f"in about {format_duration(remaining)}" if remaining > 0 else "any moment now"
+        print(f"[Session] {label}: the cookies are {format_duration(lifetimes.age(cookies))} old and sessions have lasted "
+              f"{format_duration(lifetimes.predicted())} (median of {len(lifetimes.lifetimes)}); expected to expire {when}. Refresh them in config.toml.")
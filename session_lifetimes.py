@@ -0,0 +1,127 @@
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+from config import catalog_cache_dir, server_tag
+from activation_cache import session_key
+
+LIFETIMES_KEPT = 20  # Expired sessions the prediction looks at
+FORGET_AFTER = 7 * 24 * 3600  # Seconds after which a session never seen expiring is dropped
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return f"{seconds:.0f}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m"
+
+
+class SessionLifetimes:
+    """
+    How long sessions (cookie sets) last. For each live session: when it was first and
+    last seen working; for the sessions that expired: their lifetime, first to last seen
+    (a lower bound: the server may have dropped them a little later). The median of the
+    recent lifetimes predicts when the current cookies run out, so one odd session does
+    not move the prediction. Only expiries a redirect confirmed are recorded.
+    Stored as JSON in .cache/session_lifetimes_<server_tag>.json, keyed like the activation cache.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else None
+        self.sessions: dict[str, dict] = {}
+        self.lifetimes: list[float] = []
+
+    @classmethod
+    def load(cls, path: Path) -> "SessionLifetimes":
+        lifetimes = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return lifetimes
+        except (OSError, ValueError) as e:
+            print(f"[Session] Ignoring unreadable session lifetimes {path}: {e}")
+            return lifetimes
+        if isinstance(data, dict):
+            now = time.time()
+            sessions = data.get("sessions", {})
+            lifetimes.sessions = {key: entry for key, entry in sessions.items() if now - entry.get("last", 0) < FORGET_AFTER}
+            lifetimes.lifetimes = [float(seconds) for seconds in data.get("lifetimes", [])][-LIFETIMES_KEPT:]
+        return lifetimes
+
+    def seen(self, cookies: dict, now: float | None = None):
+        """A request of this session got through."""
+        now = time.time() if now is None else now
+        entry = self.sessions.setdefault(session_key(cookies), {"first": now, "last": now})
+        entry["last"] = now
+
+    def last_seen(self, cookies: dict) -> float | None:
+        entry = self.sessions.get(session_key(cookies))
+        return entry["last"] if entry else None
+
+    def age(self, cookies: dict, now: float | None = None) -> float | None:
+        """Seconds since the session was first seen working."""
+        entry = self.sessions.get(session_key(cookies))
+        if entry is None:
+            return None
+        return (time.time() if now is None else now) - entry["first"]
+
+    def expired(self, cookies: dict) -> float | None:
+        """The server dropped this session (it redirected to the login page): remember how long it lasted (returned)."""
+        entry = self.sessions.pop(session_key(cookies), None)
+        if entry is None:
+            return None
+        lifetime = entry["last"] - entry["first"]
+        if lifetime > 0:
+            self.lifetimes = (self.lifetimes + [lifetime])[-LIFETIMES_KEPT:]
+        self.save()
+        return lifetime
+
+    def predicted(self) -> float | None:
+        """The lifetime to expect of a session: the median of the recent ones."""
+        return statistics.median(self.lifetimes) if self.lifetimes else None
+
+    def remaining(self, cookies: dict, now: float | None = None) -> float | None:
+        """Seconds the session is expected to last, if anything is known."""
+        predicted, age = self.predicted(), self.age(cookies, now)
+        if predicted is None or age is None:
+            return None
+        return predicted - age
+
+    def save(self) -> bool:
+        if self.path is None:
+            return False
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"sessions": self.sessions, "lifetimes": self.lifetimes}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Session] Failed to write {self.path}: {e}")
+            return False
+        return True
+
+
+def session_lifetimes_path() -> Path:
+    return Path(catalog_cache_dir) / f"session_lifetimes_{server_tag}.json"
+
+
+_lifetimes: SessionLifetimes | None = None
+
+
+def session_lifetimes() -> SessionLifetimes:
+    """The process-wide lifetimes, loaded from disk on first use."""
+    global _lifetimes
+    if _lifetimes is None:
+        _lifetimes = SessionLifetimes.load(session_lifetimes_path())
+    return _lifetimes
+
+
+def use_session_lifetimes(lifetimes: SessionLifetimes):
+    """Use `lifetimes` instead of the on-disk ones (e.g. SessionLifetimes(): nothing is written)."""
+    global _lifetimes
+    _lifetimes = lifetimes
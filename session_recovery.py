@@ -0,0 +1,87 @@
+import asyncio
+
+from aiohttp import ClientSession
+
+from config import session_recovery_attempts
+from activation_cache import activation_cache
+from session_lifetimes import session_lifetimes
+from utils import ACTIVE, EXPIRED, activate_session
+
+RETRY_DELAY = 1.0  # Seconds before retrying a warm-up that failed without a redirect; doubled each time
+
+
+class SessionRecovery:
+    """
+    Re-activates a session whose election context the server dropped (302 mid-run).
+    Callers read `generation` before sending a request and pass it to recover() if the
+    request was redirected: whoever comes first runs the activation sequence, the others
+    wait for it and find the generation moved on, so one context loss costs one warm-up
+    however many courses (or concurrent loops) saw it.
+    The session is given up (`dead`) only when the entry page itself redirects (the
+    cookies expired) or after `attempts` warm-ups in a row whose requests were redirected
+    again. A warm-up that fails otherwise (timeout, "过快") is retried up to `attempts`
+    times with backoff, and then left to the next redirect.
+    """
+
+    def __init__(self, attempts: int = session_recovery_attempts, cookies: dict | None = None):
+        self.attempts = attempts
+        self.cookies = cookies
+        self.generation = 0  # Activations so far; requests sent before one are stale
+        self.failures = 0  # Warm-ups since a request last got through
+        self.recoveries = 0
+        self.dead = False
+        self._lock = asyncio.Lock()
+
+    def alive(self):
+        """A request of this session got through: the last warm-up worked."""
+        self.failures = 0
+        if self.cookies:
+            session_lifetimes().seen(self.cookies)
+
+    async def recover(self, session: ClientSession, user_config: dict, generation: int) -> bool:
+        """Whether the session is usable again after a redirect seen at `generation`."""
+        async with self._lock:
+            if self.dead:
+                return False
+            if generation != self.generation:
+                return True  # Re-activated since that request was sent
+            label = user_config.get("label", "Unknown")
+            cookies = user_config.get("cookies")
+            if self.failures >= self.attempts:
+                print(f"[Session] {label}: still redirected after {self.failures} re-activation(s), giving up on the session.")
+                activation_cache().invalidate(cookies)
+                self.dead = True
+                return False
+            self.failures += 1
+            print(f"[Session] {label}: election context lost (302), re-activating ({self.failures}/{self.attempts})...")
+            delay = RETRY_DELAY
+            for attempt in range(1, self.attempts + 1):
+                state = await activate_session(session, user_config, force=True)
+                if state == ACTIVE:
+                    self.generation += 1
+                    self.recoveries += 1
+                    return True
+                if state == EXPIRED:
+                    print(f"[Session] {label}: the cookies have expired. Update them in config.toml.")
+                    session_lifetimes().expired(cookies)
+                    self.dead = True
+                    return False
+                if attempt < self.attempts:
+                    print(f"[Session] {label}: re-activation failed, retrying in {delay:g}s...")
+                    await asyncio.sleep(delay)
+                    delay *= 2
+            print(f"[Session] {label}: re-activation keeps failing, trying again at the next redirect.")
+            self.failures -= 1  # No warm-up got through, so none was redirected again
+            return False
+
+
+RECOVERIES: dict[tuple, SessionRecovery] = {}
+
+
+def recovery_for(cookies: dict | None) -> SessionRecovery:
+    """The recovery state of an account's session, shared by every loop that uses its cookies."""
+    key = tuple(sorted((cookies or {}).items()))
+    recovery = RECOVERIES.get(key)
+    if recovery is None:
+        recovery = RECOVERIES[key] = SessionRecovery(cookies=cookies)
+    return recovery
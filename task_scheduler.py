@@ -0,0 +1,244 @@
+import heapq
+import time
+from datetime import datetime, date
+
+
+def parse_deadline(value) -> float | None:
+    """A table's deadline (TOML datetime or ISO string; naive means local time) as epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            print(f"Warning: Ignoring deadline {value!r}: not an ISO date/time.")
+            return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    print(f"Warning: Ignoring deadline {value!r}: not a date/time.")
+    return None
+
+
+def parse_priorities(value) -> dict[str, int]:
+    """A table's priority table ({course_id: int}); entries that are not integers are ignored with a warning."""
+    priorities = {}
+    for course_id, priority in (value or {}).items():
+        try:
+            priorities[str(course_id)] = int(priority)
+        except (TypeError, ValueError):
+            print(f"Warning: Ignoring priority {priority!r} of course {course_id}: not an integer.")
+    return priorities
+
+
+def parse_interval(value) -> float | None:
+    """A table's interval in seconds, or None if missing or not a number."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        print(f"Warning: Ignoring interval {value!r}: not a number of seconds.")
+        return None
+
+
+class TableOptions:
+    """
+    Scheduling settings of one config.toml table:
+        priority = { "COURSE_ID" = 10 }        higher goes first (default 0, then course_ids order)
+        alternatives = [["ID_1", "ID_2"]]      sections of which one is enough
+        interval = 0.5                         minimum seconds between requests of this profile
+        deadline = 2026-01-01T12:00:00+08:00   no requests for this profile afterwards
+    """
+
+    def __init__(self, table: dict):
+        self.profileId = table.get("profileId")
+        self.priority = parse_priorities(table.get("priority"))
+        self.groups: dict[str, str] = {}
+        for i, group in enumerate(table.get("alternatives") or []):
+            for course_id in group:
+                self.groups[str(course_id)] = f"{self.profileId}#{i}"
+        self.interval = parse_interval(table.get("interval"))
+        self.deadline = parse_deadline(table.get("deadline"))
+
+    def priority_of(self, course_id) -> int:
+        return self.priority.get(str(course_id), 0)
+
+    def group_of(self, course_id) -> str | None:
+        return self.groups.get(str(course_id))
+
+
+class ProfileState:
+    __slots__ = ("heap", "interval", "deadline", "next_allowed")
+
+    def __init__(self):
+        self.heap: list[tuple] = []  # (-priority, seq, task_key)
+        self.interval: float | None = None
+        self.deadline: float | None = None
+        self.next_allowed = 0.0
+
+
+class TaskScheduler:
+    """
+    Per-user selection queue. Ready tasks are taken highest priority first (ties in the
+    order they were added, retried tasks behind the others of their priority). A profile
+    is paced by its interval, and every request of the user is at least `request_gap`
+    seconds after the previous one (0 by default: the account's RateGovernor paces it).
+    Tasks of a profile past its deadline are dropped, and selecting one course of an
+    alternative group cancels its siblings.
+    """
+
+    def __init__(self, request_gap: float = 0.0, clock=time.time):
+        self.request_gap = request_gap
+        self.clock = clock
+        self.profiles: dict[str, ProfileState] = {}
+        self.priority: dict[tuple, int] = {}
+        self.group: dict[tuple, str] = {}
+        self.members: dict[str, list[tuple]] = {}
+        self._entry: dict[tuple, int] = {}  # Queued task -> seq of its live heap entry
+        self._taken: dict[tuple, int] = {}  # Task out in a request -> its seq
+        self._seq = 0
+        self._next_request = 0.0
+
+    @classmethod
+    def from_tables(cls, user_tables: list, tasks: list[tuple], **kwargs) -> "TaskScheduler":
+        """A scheduler over (profileId, course_id) tasks, configured from their tables."""
+        scheduler = cls(**kwargs)
+        options = {table.get("profileId"): TableOptions(table) for table in user_tables if table.get("profileId")}
+        for profileId, table_options in options.items():
+            scheduler.configure_profile(profileId, table_options.interval, table_options.deadline)
+        for profileId, course_id in tasks:
+            table_options = options.get(profileId)
+            if table_options is None:
+                scheduler.add(profileId, course_id)
+            else:
+                scheduler.add(profileId, course_id, table_options.priority_of(course_id), table_options.group_of(course_id))
+        return scheduler
+
+    def configure_profile(self, profileId: str, interval: float | None = None, deadline: float | None = None):
+        state = self.profiles.setdefault(profileId, ProfileState())
+        state.interval = interval
+        state.deadline = deadline
+
+    def add(self, profileId: str, course_id, priority: int = 0, group: str | None = None):
+        task_key = (profileId, course_id)
+        if task_key in self._entry:
+            return
+        self.priority[task_key] = priority
+        if group is not None:
+            self.group[task_key] = group
+            self.members.setdefault(group, []).append(task_key)
+        self._push(task_key)
+
+    def _push(self, task_key: tuple, seq: int | None = None):
+        if seq is None:
+            self._seq += 1
+            seq = self._seq
+        self._entry[task_key] = seq
+        heapq.heappush(self.profiles.setdefault(task_key[0], ProfileState()).heap, (-self.priority[task_key], seq, task_key))
+
+    def _top(self, state: ProfileState) -> tuple | None:
+        heap = state.heap
+        while heap and self._entry.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)  # Finished, removed or re-queued since
+        return heap[0] if heap else None
+
+    def __len__(self) -> int:
+        return len(self._entry)
+
+    def __contains__(self, task_key) -> bool:
+        return task_key in self._entry
+
+    def __iter__(self):
+        """Queued task keys, best first."""
+        return iter(sorted(self._entry, key=lambda key: (-self.priority[key], self._entry[key])))
+
+    def remove(self, task_key: tuple):
+        self._entry.pop(task_key, None)
+
+    def expire(self) -> list[tuple]:
+        """Drop and return the tasks whose profile deadline has passed."""
+        now = self.clock()
+        expired = []
+        for profileId, state in self.profiles.items():
+            if state.deadline is not None and now >= state.deadline:
+                while (top := self._top(state)) is not None:
+                    heapq.heappop(state.heap)
+                    self.remove(top[2])
+                    expired.append(top[2])
+        return expired
+
+    def next_batch(self, size: int = 1) -> tuple[list[tuple], float]:
+        """
+        Up to `size` ready tasks of one profile, best first (never two of one alternative group),
+        or ([], seconds until the next task is ready). Taken tasks leave the queue until finish().
+        """
+        now = self.clock()
+        best_state, best_top, wait = None, None, None
+        for state in self.profiles.values():
+            top = self._top(state)
+            if top is None:
+                continue
+            ready_at = max(state.next_allowed, self._next_request)
+            if ready_at > now:
+                wait = ready_at - now if wait is None else min(wait, ready_at - now)
+            elif best_top is None or top[:2] < best_top[:2]:
+                best_state, best_top = state, top
+        if best_state is None:
+            return [], wait if wait is not None else 0.0
+
+        batch, skipped, groups = [], [], set()
+        heap = best_state.heap
+        while heap and len(batch) < size:
+            top = self._top(best_state)
+            if top is None:
+                break
+            entry = heapq.heappop(heap)
+            task_key = entry[2]
+            group = self.group.get(task_key)
+            if group is not None and group in groups:
+                skipped.append(entry)  # A sibling is already in this request
+                continue
+            if group is not None:
+                groups.add(group)
+            self._taken[task_key] = self._entry.pop(task_key)
+            batch.append(task_key)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+        self._next_request = now + self.request_gap
+        best_state.next_allowed = now + (best_state.interval if best_state.interval is not None else self.request_gap)
+        return batch, 0.0
+
+    def finish(self, task_key: tuple, status: str, endless: bool, throttled: bool = False) -> tuple[bool, list[tuple]]:
+        """
+        Account the outcome of a taken task. Returns whether it is queued again, and the
+        siblings cancelled because it was selected. A task whose request the server
+        throttled keeps its place: the refusal says nothing about the course, nor does a
+        "retry" (its request was redirected and the session has been re-activated).
+        """
+        seq = self._taken.pop(task_key, None)
+        match status:
+            case "success":
+                cancelled = []
+                group = self.group.get(task_key)
+                for sibling in self.members.get(group, ()):
+                    if sibling != task_key and sibling in self._entry:
+                        self.remove(sibling)
+                        cancelled.append(sibling)
+                return False, cancelled
+            case "full" | "failed" | "redirect":
+                if endless:
+                    self._push(task_key)
+                    return True, []
+                return False, []
+            case "retry":
+                self._push(task_key, seq)
+                return True, []
+            case "error" if throttled:
+                self._push(task_key, seq)
+                return True, []
+            case "error" | _:
+                self._push(task_key)  # Behind the other tasks of its priority
+                return True, []
@@ -1,8 +1,12 @@
-from asyncio import sleep
+import re
+import time
 from aiohttp import ClientSession
 
-from config import headers
+from config import eams_url, headers
 from config_loader import USE_PROXY, proxies
+from activation_cache import activation_cache
+from session_lifetimes import session_lifetimes
+from rate_governor import governor_for
 
 try:
     from aiohttp_socks import ProxyConnector
@@ -10,6 +14,15 @@ except ImportError:
     ProxyConnector = None
 
 
+# defaultPage marks the lessons the student already has as electedIds["l<lessonId>"] = true
+ELECTED_ID_PATTERN = re.compile(r"""electedIds\[\s*["']l(\d+)["']\s*\]\s*=\s*true""")
+
+
+def parse_elected_ids(page: str) -> set[int]:
+    """Lesson IDs already selected, from a stdElectCourse!defaultPage.action body."""
+    return {int(lesson_id) for lesson_id in ELECTED_ID_PATTERN.findall(page)}
+
+
 def build_connector(label: str = ""):
     """
     Build aiohttp connector based on proxy config.
@@ -31,11 +44,24 @@ def build_connector(label: str = ""):
     return ProxyConnector.from_url(proxy_url)
 
 
-async def ensure_session_active(session: ClientSession, user_config: dict):
+# activate_session() outcomes
+ACTIVE = "active"
+EXPIRED = "expired"  # The server redirected to the login page: the cookies are no longer valid
+FAILED = "failed"  # Connection error, throttling or an unexpected page: may work on a later try
+
+
+async def ensure_session_active(session: ClientSession, user_config: dict, selected: set | None = None, force: bool = False) -> bool:
     """
     Adaptively activate session state.
     Compatible with Selection users (with tables) and Inquiry users (with profileId list).
+    With `selected`, the lesson IDs the defaultPage pages list as already selected are added to it.
+    Steps this session passed within activation_cache_ttl (any command) are skipped unless `force`.
     """
+    return await activate_session(session, user_config, selected, force) == ACTIVE
+
+
+async def activate_session(session: ClientSession, user_config: dict, selected: set | None = None, force: bool = False) -> str:
+    """ensure_session_active, telling expired cookies (EXPIRED) from failures worth retrying (FAILED)."""
     label = user_config.get("label", "Unknown")
     cookies = user_config.get("cookies")
 
@@ -48,38 +74,70 @@ async def ensure_session_active(session: ClientSession, user_config: dict):
 
     # Activate EAMS session state in order to ensure subsequent requests are valid.
     # Order: Entry -> Default Page -> Data Page
-    base = "https://jw.shiep.edu.cn/eams/stdElectCourse"
-
-    try:
-        async with session.get(f"{base}.action", headers=headers, cookies=cookies, ssl=False, timeout=5) as r:
-            if r.status != 200:
-                print(f"[Warning] {label}: Entry portal access failed.")
-                return False
-            if "过快" in await r.text():
-                print(f"[Rate Limit] Rate limit triggered for user {label}")
-                return False
-    except Exception as e:
-        print(f"[Error] {label}: Connection error at Entry: {e}")
-        return False
+    base = eams_url
+    cache = activation_cache()
+    if force:
+        cache.invalidate(cookies)
 
+    # Warm profiles (selected lessons as of their activation) need no request
+    missing = []
     for pid in pids:
+        entry = cache.fresh(cookies, pid)
+        if entry is None:
+            missing.append(pid)
+            continue
+        if selected is not None:
+            selected.update(entry.get("elected", ()))
+        print(f"[Success] {label}: Session already active for profile {pid} ({time.time() - entry['at']:.0f}s ago)")
+    if not missing and cache.fresh(cookies) is not None:
+        return ACTIVE
+
+    if cache.fresh(cookies) is None:  # The entry page was not visited recently
+        try:
+            governor = governor_for(cookies, "entry")
+            await governor.acquire()
+            async with session.get(f"{base}.action", headers=headers, cookies=cookies, ssl=False, timeout=5, allow_redirects=False) as r:
+                page = await r.text()
+                governor.feedback_status(r.status, page)
+                if 300 <= r.status < 400:
+                    print(f"[Warning] {label}: Entry portal redirects to {r.headers.get('Location', 'the login page')}: the cookies have expired.")
+                    return EXPIRED
+                if r.status != 200:
+                    print(f"[Warning] {label}: Entry portal access failed.")
+                    return FAILED
+                if "过快" in page:
+                    print(f"[Rate Limit] Rate limit triggered for user {label}")
+                    return FAILED
+            cache.record(cookies)
+            session_lifetimes().seen(cookies)
+        except Exception as e:
+            print(f"[Error] {label}: Connection error at Entry: {e}")
+            return FAILED
+
+    for pid in missing:
         url = f"{base}!defaultPage.action?electionProfile.id={pid}"
 
         try:
+            governor = governor_for(cookies, "defaultPage")
+            await governor.acquire()  # Paces the pages of several profiles
             async with session.get(url, headers=headers, cookies=cookies, ssl=False, timeout=5) as r:
+                page = await r.text()
+                governor.feedback_status(r.status, page)
                 if r.status != 200:
                     print(f"[Warning] {label}: DefaultPage failed for PID {pid}")
-                    return False
-                if "过快" in await r.text():
+                    return FAILED
+                if "过快" in page:
                     print(f"[Rate Limit] Rate limit triggered for user {label} (PID: {pid})")
-                    return False
+                    return FAILED
+                elected = parse_elected_ids(page)
+                if selected is not None:
+                    selected |= elected
+                cache.record(cookies, pid, elected)
                 print(f"[Success] {label}: Session activated for profile {pid}")
 
-            if len(pids) > 1:
-                await sleep(0.2)
-
         except Exception as e:
             print(f"[Error] {label}: Connection error at PID {pid}: {e}")
-            return False
+            return FAILED
 
-    return True
+    cache.save()
+    return ACTIVE
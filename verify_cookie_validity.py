@@ -2,11 +2,11 @@ import asyncio
 import aiohttp
 from tqdm.asyncio import tqdm
 
-from config import headers
+from config import eams_url, headers
 from config_loader import USER_CONFIGS, INQUIRY_USER_DATA
 from utils import build_connector
 
-check_url = "https://jw.shiep.edu.cn/eams/stdElectCourse.action"
+check_url = f"{eams_url}.action"
 
 
 class CheckResult:
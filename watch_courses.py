@@ -0,0 +1,305 @@
+import asyncio
+import contextlib
+import time
+import aiohttp
+import warnings
+from urllib3.exceptions import InsecureRequestWarning
+
+from config_loader import USER_CONFIGS, INQUIRY_USER_DATA, ENROLLMENT_DATA_API_PARAMS
+from enrollment_history import EnrollmentHistory, history_path
+from enrollment_table import EnrollmentTable, lesson_key
+from loop_monitor import start_run_monitor, stop_run_monitor
+from inquire_course_info import fetch_enrollment_data
+from config import prevalidate_courses, selection_journal
+from course_validator import build_validator, report_review
+from main_select_courses import CourseSelector
+from poll_schedule import PollSchedule
+from selection_journal import SelectionJournal, open_journal
+from session_keepalive import SessionKeepalive
+from session_recovery import recovery_for
+from task_scheduler import TableOptions
+
+from utils import ensure_session_active, build_connector
+
+warnings.simplefilter("ignore", InsecureRequestWarning)
+
+
+class WatchedUser:
+    """One USER_CONFIGS entry in watch mode: its session and the (profileId, course_id) pairs still to select."""
+
+    def __init__(self, label: str, cookies: dict, session: aiohttp.ClientSession, pending: list[tuple], tables: list | None = None,
+                 journal: SelectionJournal | None = None):
+        self.label = label
+        self.cookies = cookies
+        self.session = session
+        self.tables = tables or []
+        self.options = {table.get("profileId"): TableOptions(table) for table in tables or [] if table.get("profileId")}
+        # Highest priority first; sorting is stable, so ties keep the interleaved order
+        self.pending = sorted(pending, key=lambda task_key: -self._priority(task_key))
+        self.failed: list[dict] = []
+        self.selector = CourseSelector(session, cookies, label)
+        self.recovery = recovery_for(cookies)  # Re-activates the session after a 302
+        self.validator = None  # SelectionValidator, with prevalidate_courses
+        self.journal = journal
+
+    def note(self, task_key: tuple, status: str, detail: str = ""):
+        if self.journal is not None:
+            self.journal.record(self.label, task_key[0], task_key[1], status, detail)
+
+    def drop(self, impossible: list[tuple]):
+        """Stop watching courses that cannot succeed any more ((task_key, reason) pairs)."""
+        for task_key, reason in impossible:
+            if reason == "already selected":
+                self.pending.remove(task_key)
+                self.note(task_key, "success", reason)
+            else:
+                self.give_up(task_key, "skipped", reason)
+
+    def give_up(self, task_key: tuple, status: str = "gave up", detail: str = ""):
+        self.pending.remove(task_key)
+        self.note(task_key, status, detail)
+        self.failed.append({"user_label": self.label, "profileId": task_key[0], "course_id": task_key[1]})
+
+    def _priority(self, task_key: tuple) -> int:
+        options = self.options.get(task_key[0])
+        return options.priority_of(task_key[1]) if options else 0
+
+    def group_of(self, task_key: tuple) -> str | None:
+        options = self.options.get(task_key[0])
+        return options.group_of(task_key[1]) if options else None
+
+    def cancel_siblings(self, task_key: tuple) -> list[tuple]:
+        """Stop watching the other sections of a just-selected course's alternative group."""
+        group = self.group_of(task_key)
+        if group is None:
+            return []
+        siblings = [key for key in self.pending if key[0] == task_key[0] and self.group_of(key) == group]
+        for sibling in siblings:
+            self.pending.remove(sibling)
+            self.note(sibling, "cancelled", f"alternative {task_key[1]} selected")
+        return siblings
+
+    def expire(self) -> list[tuple]:
+        """Give up the courses of profiles whose deadline has passed."""
+        now = time.time()
+        expired = [
+            task_key for task_key in self.pending
+            if (options := self.options.get(task_key[0])) and options.deadline is not None and now >= options.deadline
+        ]
+        for task_key in expired:
+            self.give_up(task_key, "expired")
+        return expired
+
+
+def interleaved_tasks(user_tables: list, user_label: str) -> list[tuple]:
+    """(profileId, course_id) pairs, taking one course of each table in turn like --start does."""
+    tasks = []
+    max_length = max((len(table.get("course_ids", [])) for table in user_tables if table.get("profileId")), default=0)
+    for i in range(max_length):
+        for table in user_tables:
+            profileId = table.get("profileId")
+            course_ids = table.get("course_ids", [])
+            if not profileId or not course_ids:
+                if i == 0:
+                    print(f"Missing parameter in {user_label}'s table: profileId={profileId}, course_ids={course_ids}")
+                continue
+            if i < len(course_ids):
+                tasks.append((profileId, course_ids[i]))
+    return tasks
+
+
+async def submit_open_courses(user: WatchedUser, enrollments: EnrollmentTable):
+    """Try every pending course of the user that currently has a free seat."""
+    open_tasks, groups = [], set()
+    for task_key in user.pending:  # Best first; one section per alternative group
+        group = user.group_of(task_key)
+        if enrollments.has_slot(task_key[1]) and (group is None or group not in groups):
+            open_tasks.append(task_key)
+            groups.add(group)
+    by_profile: dict[str, list] = {}
+    for profileId, course_id in open_tasks:
+        by_profile.setdefault(profileId, []).append(course_id)
+
+    for profileId, course_ids in by_profile.items():
+        course_ids = [course_id for course_id in course_ids if (profileId, course_id) in user.pending]
+        if not course_ids:
+            continue  # Dropped after a selection of another profile
+        for course_id in course_ids:
+            sc, lc = enrollments.get(course_id)
+            print(f"[Watch] {user.label} ({profileId}) - Course ID {course_id}: seat free ({sc}/{lc}), submitting.")
+        generation = user.recovery.generation
+        statuses = await user.selector.select(profileId, course_ids)
+        if statuses[0] != "redirect":
+            user.recovery.alive()
+        for course_id, status in zip(course_ids, statuses):
+            user.note((profileId, course_id), status)
+            match status:
+                case "success":
+                    user.pending.remove((profileId, course_id))
+                    for sibling in user.cancel_siblings((profileId, course_id)):
+                        print(f"[Watch] {user.label} ({profileId}) - Course ID {sibling[1]}: cancelled, alternative {course_id} selected.")
+                    if user.validator is not None:
+                        user.validator.mark_selected(course_id)
+                case "redirect":
+                    config = {"label": user.label, "cookies": user.cookies, "tables": user.tables}
+                    if await user.recovery.recover(user.session, config, generation) or not user.recovery.dead:
+                        return  # Re-activated, or worth another try: the courses are still pending for the next poll
+                    # Session expired: nothing of this user can succeed any more
+                    print(f"[Watch] {user.label}: session redirected, giving up its remaining courses.")
+                    for pending_key in list(user.pending):
+                        user.give_up(pending_key, "gave up", "session expired")
+                    return
+                case "failed":
+                    # Time conflict, credit limit, ...: no free seat will change that
+                    print(f"[Watch] {user.label} ({profileId}) - Course ID {course_id}: selection failed, no longer watched.")
+                    user.give_up((profileId, course_id), "gave up", "selection failed")
+                case _:
+                    pass  # Seat taken in the meantime, throttled, ...: keep watching
+        if user.validator is not None and "success" in statuses:
+            # Courses clashing with what was just selected can no longer succeed
+            impossible = user.validator.impossible(user.pending)
+            report_review(user.label, impossible)
+            user.drop(impossible)
+
+
+def report_changes(diff, watched: set[int]):
+    """Print what changed for the watched lessons since the previous poll."""
+    for lesson_id, before, after in diff.seats_freed:
+        if lesson_id in watched:
+            print(f"[Watch] Course ID {lesson_id}: free seats {before} -> {after}.")
+    for lesson_id, before, after in diff.limits_raised:
+        if lesson_id in watched:
+            print(f"[Watch] Course ID {lesson_id}: limit raised {before} -> {after}.")
+    for lesson_id in diff.newly_full:
+        if lesson_id in watched:
+            print(f"[Watch] Course ID {lesson_id}: now full.")
+
+
+def pending_profiles(users: list[WatchedUser]) -> dict[str, list]:
+    """{profileId: course_ids} still waited for, over all users."""
+    profiles: dict[str, list] = {}
+    for user in users:
+        for profileId, course_id in user.pending:
+            profiles.setdefault(profileId, []).append(course_id)
+    return profiles
+
+
+async def watch_courses(interval: float | None = None, user_configs: list | None = None, inquiry_user: dict | None = None):
+    """
+    Enrollment-driven selection: poll queryStdCount.action and submit batchOperator
+    requests only for configured courses that show sc < lc.
+    Polls every `interval` seconds if given, otherwise at the per-profile intervals a
+    PollSchedule learns from the enrollment history.
+    Users and the polling account default to USER_CONFIGS / INQUIRY_USER_DATA.
+    """
+    user_configs = USER_CONFIGS if user_configs is None else user_configs
+    inquiry_user = INQUIRY_USER_DATA if inquiry_user is None else inquiry_user
+    inquiry_cookies = inquiry_user.get("cookies")
+    if not inquiry_cookies:
+        print("Error: Watch mode polls enrollment data with INQUIRY_USER_DATA cookies. Please configure them.")
+        return
+
+    async with contextlib.AsyncExitStack() as stack:
+        inquiry_session = await stack.enter_async_context(aiohttp.ClientSession(connector=build_connector("Watch")))
+        if not await ensure_session_active(inquiry_session, inquiry_user):
+            print("\n[!] Error: Failed to activate Inquiry Session for polling.\n")
+            return
+
+        journal = stack.enter_context(open_journal()) if selection_journal else None
+        keepalive = SessionKeepalive(user_configs)  # Keeps idle sessions warm, warns before they expire
+        keepalive.start()
+        stack.push_async_callback(keepalive.stop)
+        stack.push_async_callback(stop_run_monitor, start_run_monitor())
+        users: list[WatchedUser] = []
+        for user_config in user_configs:
+            label = user_config.get("label", "Unknown_User")
+            if not user_config.get("cookies") or not user_config.get("tables"):
+                print(f"Skipping {label}: Missing cookies or tables")
+                continue
+            pending = interleaved_tasks(user_config["tables"], label)
+            if journal is not None:
+                pending, finished = journal.resume(label, user_config["tables"], pending)
+                for (profileId, course_id), reason in finished:
+                    print(f"[Journal] {label} ({profileId}) - Course ID {course_id}: skipped, {reason}.")
+            if not pending:
+                continue
+            session = await stack.enter_async_context(aiohttp.ClientSession(connector=build_connector(f"User {label}")))
+            selected = set()
+            if not await ensure_session_active(session, user_config, selected):
+                print(f"\n[!] User {label}: Session activation failed. Skipping this user.\n")
+                continue
+            user = WatchedUser(label, user_config["cookies"], session, pending, user_config["tables"], journal)
+            if prevalidate_courses:
+                user.validator = await build_validator(session, user_config, selected)
+                _, dropped, flagged = user.validator.review(pending)
+                report_review(label, dropped, flagged)
+                user.drop(dropped)
+            users.append(user)
+
+        if not users:
+            print("No valid tasks found. Exiting watch mode.")
+            return
+
+        history = EnrollmentHistory.load(history_path(ENROLLMENT_DATA_API_PARAMS.get("semesterId", "")))
+        schedule = PollSchedule.from_history(history, [course_id for user in users for _, course_id in user.pending])
+        polling = f"every {interval}s" if interval is not None else f"every {schedule.next_interval(pending_profiles(users)):.1f}s (adaptive)"
+        print(f"\nWatching {sum(len(u.pending) for u in users)} course(s) of {len(users)} user(s), polling {polling}...\n")
+        polls = 0
+        warned_unknown = set()
+        last_delay = None
+        inquiry_recovery = recovery_for(inquiry_cookies)  # Shared with a selection user of the same cookies
+        while any(user.pending for user in users):
+            for user in users:
+                for profileId, course_id in user.expire():
+                    print(f"[Watch] {user.label} ({profileId}) - Course ID {course_id}: deadline passed, giving up.")
+            if not any(user.pending for user in users):
+                break
+            generation = inquiry_recovery.generation
+            enrollments, redirected = await fetch_enrollment_data(inquiry_session, inquiry_cookies)
+            polls += 1
+            if enrollments:
+                inquiry_recovery.alive()
+                diff = history.append(enrollments)
+                if diff is not None:
+                    schedule.observe(diff, history.latest.taken_at)
+                if diff:
+                    report_changes(diff, {lesson_key(course_id) for user in users for _, course_id in user.pending})
+                for user in users:
+                    for profileId, course_id in user.pending:
+                        if course_id not in enrollments and course_id not in warned_unknown:
+                            warned_unknown.add(course_id)
+                            print(f"[Watch] Course ID {course_id} ({user.label}, {profileId}) is not listed by queryStdCount.")
+                await asyncio.gather(*(submit_open_courses(user, enrollments) for user in users if user.pending))
+            elif redirected:
+                if await inquiry_recovery.recover(inquiry_session, inquiry_user, generation):
+                    continue  # Poll again with the re-activated session
+                if inquiry_recovery.dead:
+                    # Without enrollment data nothing can be submitted any more
+                    print("[Watch] The inquiry session has expired, giving up the remaining courses. Update INQUIRY_USER_DATA in config.toml.")
+                    for user in users:
+                        for pending_key in list(user.pending):
+                            user.give_up(pending_key, "gave up", "inquiry session expired")
+                    break
+                print("[Watch] Could not re-activate the inquiry session, retrying.")
+            else:
+                print("[Watch] Could not fetch enrollment data, retrying.")
+
+            if any(user.pending for user in users):
+                if interval is not None:
+                    await asyncio.sleep(interval)
+                    continue
+                delay = schedule.next_interval(pending_profiles(users))
+                if last_delay is None or abs(delay - last_delay) > 0.25 * last_delay:  # Only notable changes
+                    print(f"[Watch] Polling every {delay:.1f}s.")
+                    last_delay = delay
+                await asyncio.sleep(delay)
+
+    failed_courses = [failure for user in users for failure in user.failed]
+    print(f"\nWatch mode finished: {polls} enrollment poll(s), {sum(u.selector.requests for u in users)} selection request(s).")
+    if failed_courses:
+        print("\nSummary of failed course selections:")
+        for failure in failed_courses:
+            print(f"User {failure['user_label']} ({failure['profileId']}) - Course ID {failure['course_id']}: Failed.")
+    else:
+        print("\nNo failed course selections.")
+    return failed_courses